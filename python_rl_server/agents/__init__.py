@@ -1,10 +1,41 @@
 """
 RL Agents Module
 PPO, Rule-based ve diğer agent implementasyonları
+
+torch/SB3 gerektiren backend'ler (PPOAgent, ServingAgent, export_policy)
+ilk erişimde import edilir; rule-based ve NumPy agent'ları kullanan
+process'ler torch'u hiç yüklemez.
 """
 
-from .base_agent import BaseAgent
-from .ppo_agent import PPOAgent
+import importlib
+
+from .base_agent import BaseAgent, info_rows
 from .rule_based import RuleBasedAgent
+from .rule_table import RuleDecisionTable
+from .numpy_policy import NumpyPolicyAgent, export_numpy_policy
+
+# İsim -> tanımlandığı modül (lazy)
+_LAZY_IMPORTS = {
+    "PPOAgent": ".ppo_agent",
+    "ServingAgent": ".serving_agent",
+    "export_policy": ".serving_agent"
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
-__all__ = ["BaseAgent", "PPOAgent", "RuleBasedAgent"]
+__all__ = [
+    "BaseAgent", "PPOAgent", "RuleBasedAgent", "RuleDecisionTable", "ServingAgent", "NumpyPolicyAgent",
+    "export_policy", "export_numpy_policy", "info_rows"
+]
@@ -4,10 +4,46 @@ TÜBİTAK İP-2 AI Bot System
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 
 
+# Aksiyon isimleri (aksiyon uzayı boyutuna göre)
+# MockCombatEnv: 9 aksiyon
+COMBAT_ACTION_NAMES = (
+    "IDLE", "ATTACK", "TAKE_COVER", "FLEE", "RELOAD",
+    "PATROL", "INVESTIGATE", "SUPPORT", "FLANK"
+)
+# CalypsoMockEnv (CalypsoAction): 16 aksiyon; 7-9 MockCombatEnv'den farklı sıralıdır
+CALYPSO_ACTION_NAMES = (
+    "IDLE", "ATTACK", "TAKE_COVER", "FLEE", "RELOAD",
+    "PATROL", "INVESTIGATE", "ADVANCE",
+    "FLANK", "SUPPORT", "SUPPRESS", "PEEK_FIRE",
+    "TARGET_WEAK_POINT", "EVADE_EXPLOSIVE", "COUNTER_SHIELD", "COORDINATE_ATTACK"
+)
+ACTION_NAMES_BY_DIM = {
+    len(COMBAT_ACTION_NAMES): COMBAT_ACTION_NAMES,
+    len(CALYPSO_ACTION_NAMES): CALYPSO_ACTION_NAMES
+}
+
+
+def action_names(action_dim: int) -> Tuple[str, ...]:
+    """
+    action_dim boyutlu aksiyon uzayının isimleri.
+
+    Bilinmeyen boyutlarda MockCombatEnv isimleri, onların dışında kalan
+    aksiyonlar için ACTION_<n> kullanılır (isimler her zaman tekildir).
+    """
+    names = ACTION_NAMES_BY_DIM.get(action_dim, COMBAT_ACTION_NAMES)
+    return tuple(names[i] if i < len(names) else f"ACTION_{i}" for i in range(action_dim))
+
+
+def info_rows(info: Dict[str, np.ndarray], num_rows: int) -> List[Dict[str, Any]]:
+    """Kolon bazlı info'yu (select_actions) satır başına dict listesine çevir."""
+    columns = [(key, column.tolist()) for key, column in info.items()]
+    return [{key: values[i] for key, values in columns} for i in range(num_rows)]
+
+
 class BaseAgent(ABC):
     """
     Tüm agent'ların inherit edeceği abstract base class.
@@ -47,6 +83,34 @@ class BaseAgent(ABC):
         """
         pass
 
+    def select_actions(
+        self,
+        observations: np.ndarray,
+        deterministic: bool = False
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        N observation için toplu aksiyon seçimi.
+
+        Varsayılan implementasyon select_action'ı satır satır çağırır;
+        PPOAgent ve RuleBasedAgent tek seferde hesaplar.
+
+        Args:
+            observations: N x observation_dim
+            deterministic: True ise exploitation, False ise exploration
+
+        Returns:
+            actions: N uzunluğunda int64 dizi
+            info: Kolon bazlı ek bilgiler (anahtar -> N uzunluğunda dizi)
+        """
+        observations = np.asarray(observations).reshape(-1, self.observation_dim)
+        actions = np.empty(len(observations), dtype=np.int64)
+        columns: Dict[str, list] = {}
+        for i, obs in enumerate(observations):
+            actions[i], row = self.select_action(obs, deterministic=deterministic)
+            for key, value in row.items():
+                columns.setdefault(key, [None] * len(observations))[i] = value
+        return actions, {key: np.asarray(values) for key, values in columns.items()}
+
     @abstractmethod
     def update(
         self,
@@ -99,16 +163,8 @@ class BaseAgent(ABC):
         return self._step_count
 
     def get_action_name(self, action: int) -> str:
-        """Aksiyon numarasından isim döndür."""
-        action_names = {
-            0: "IDLE",
-            1: "ATTACK",
-            2: "TAKE_COVER",
-            3: "FLEE",
-            4: "RELOAD",
-            5: "PATROL",
-            6: "INVESTIGATE",
-            7: "SUPPORT",
-            8: "FLANK"
-        }
-        return action_names.get(action, "UNKNOWN")
+        """Aksiyon numarasından isim döndür (aksiyon uzayı action_dim'e göre)."""
+        names = ACTION_NAMES_BY_DIM.get(self.action_dim, COMBAT_ACTION_NAMES)
+        if 0 <= action < len(names):
+            return names[action]
+        return f"ACTION_{action}"
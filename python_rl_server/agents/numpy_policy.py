@@ -0,0 +1,290 @@
+"""
+NumPy Policy - torch'suz küçük MLP inference
+TÜBİTAK İP-2 AI Bot System
+
+Batch 1 ve 2x256'lık bir ağda torch dispatch maliyeti matmul'lerden
+büyüktür. Bu modül SB3 politikasının ağırlıklarını (pi/vf trunk'ları,
+action ve value head'leri) contiguous float32 dizileri olarak npz'ye
+yazar ve forward pass'i önceden ayrılmış scratch buffer'larla NumPy'de
+çalıştırır. Modül torch import etmez; yalnızca export_numpy_policy
+yüklenmiş bir PPOAgent'ın tensor'larını okur.
+
+npz içeriği:
+    metadata              JSON (obs_dim, action_names, aktivasyonlar, ...)
+    pi_W{i}, pi_b{i}      Actor trunk katmanları (W: in x out)
+    vf_W{i}, vf_b{i}      Critic trunk katmanları
+    action_W, action_b    Logit head'i
+    value_W, value_b      Value head'i
+"""
+
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base_agent import BaseAgent
+
+
+NUMPY_FORMAT_VERSION = 1
+
+# SB3 aktivasyon modülü -> isim
+_ACTIVATIONS = {"Tanh": "tanh", "ReLU": "relu", "Identity": "identity"}
+
+
+def _to_numpy(tensor) -> np.ndarray:
+    return tensor.detach().cpu().numpy()
+
+
+def _extract_trunk(sequential, prefix: str) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """Linear + aktivasyon dizisini (W transpoze) dizilere çevir."""
+    arrays: Dict[str, np.ndarray] = {}
+    activations: List[str] = []
+    for module in sequential:
+        kind = type(module).__name__
+        if kind == "Linear":
+            i = len(activations)
+            arrays[f"{prefix}_W{i}"] = np.ascontiguousarray(_to_numpy(module.weight).T, dtype=np.float32)
+            arrays[f"{prefix}_b{i}"] = np.ascontiguousarray(_to_numpy(module.bias), dtype=np.float32)
+            activations.append("identity")
+        elif kind in _ACTIVATIONS and activations and activations[-1] == "identity":
+            activations[-1] = _ACTIVATIONS[kind]
+        else:
+            raise ValueError(f"Unsupported layer in {prefix} trunk: {kind}")
+    return arrays, activations
+
+
+def export_numpy_policy(agent, path: str, version: str = "") -> Dict:
+    """
+    PPOAgent politikasının ağırlıklarını npz olarak kaydet.
+
+    Args:
+        agent: Yüklenmiş PPOAgent (model.policy olmalı)
+        path: Çıktı dosyası (.npz)
+        version: Model versiyon etiketi (metadata'ya yazılır)
+
+    Returns:
+        Yazılan metadata
+    """
+    if getattr(agent, "model", None) is None:
+        raise RuntimeError("Model not initialized.")
+
+    policy = agent.model.policy
+    for extractor in (policy.pi_features_extractor, policy.vf_features_extractor):
+        if type(extractor).__name__ != "FlattenExtractor":
+            raise ValueError(f"Unsupported features extractor: {type(extractor).__name__}")
+
+    pi_arrays, pi_activations = _extract_trunk(policy.mlp_extractor.policy_net, "pi")
+    vf_arrays, vf_activations = _extract_trunk(policy.mlp_extractor.value_net, "vf")
+    arrays = {**pi_arrays, **vf_arrays}
+    for name, head in (("action", policy.action_net), ("value", policy.value_net)):
+        arrays[f"{name}_W"] = np.ascontiguousarray(_to_numpy(head.weight).T, dtype=np.float32)
+        arrays[f"{name}_b"] = np.ascontiguousarray(_to_numpy(head.bias), dtype=np.float32)
+
+    metadata = {
+        "format_version": NUMPY_FORMAT_VERSION,
+        "version": version,
+        "observation_dim": agent.observation_dim,
+        "action_dim": agent.action_dim,
+        "action_names": [agent.get_action_name(i) for i in range(agent.action_dim)],
+        "pi_activations": pi_activations,
+        "vf_activations": vf_activations,
+        "param_bytes": int(sum(a.nbytes for a in arrays.values())),
+        "exported_at": int(time.time())
+    }
+    with open(path, "wb") as f:
+        np.savez(f, metadata=np.array(json.dumps(metadata)), **arrays)
+    print(f"[export_numpy_policy] Exported policy to: {path}")
+    return metadata
+
+
+class _Scratch(threading.local):
+    """Thread başına forward buffer'ları (batch kapasitesi ikiye katlanarak büyür)."""
+
+    def __init__(self):
+        self.capacity = 0
+        self.buffers: List[np.ndarray] = []
+
+
+class NumpyPolicyAgent(BaseAgent):
+    """
+    NumPy forward pass ile PPO politikası inference.
+
+    Eğitim yapmaz; select_action/select_actions PPOAgent ile aynı info
+    anahtarlarını döndürür. Sampling agent'ın kendi Generator'ı ile
+    yapılır (seed verilirse tekrarlanabilir).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        name: str = "NumpyPolicyAgent",
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            path: export_numpy_policy çıktısı (.npz); None ise load() çağrılmalı
+            name: Agent ismi
+            seed: Stochastic sampling için seed
+        """
+        super().__init__(name)
+        self.rng = np.random.default_rng(seed)
+        self.metadata: Dict = {}
+        self._layers: Tuple = ()
+        self._action_names: Tuple[str, ...] = ()
+        self._scratch = _Scratch()
+        if path is not None:
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        """Export edilmiş ağırlıkları yükle."""
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data["metadata"]))
+            if metadata.get("format_version") != NUMPY_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported numpy policy format {metadata.get('format_version')} in {path}, "
+                    f"expected {NUMPY_FORMAT_VERSION}"
+                )
+            arrays = {key: np.ascontiguousarray(data[key], dtype=np.float32) for key in data.files if key != "metadata"}
+
+        def trunk(prefix: str, activations: List[str]):
+            return tuple(
+                (arrays[f"{prefix}_W{i}"], arrays[f"{prefix}_b{i}"], activation)
+                for i, activation in enumerate(activations)
+            )
+
+        # (pi trunk, vf trunk, action head, value head); tek atamayla değişir
+        # (ModelSlots kopyası aktif agent'ı etkilemez)
+        self._layers = (
+            trunk("pi", metadata["pi_activations"]),
+            trunk("vf", metadata["vf_activations"]),
+            (arrays["action_W"], arrays["action_b"]),
+            (arrays["value_W"], arrays["value_b"])
+        )
+        self._scratch = _Scratch()
+        self.metadata = metadata
+        self.observation_dim = metadata["observation_dim"]
+        self.action_dim = metadata["action_dim"]
+        self._action_names = tuple(metadata["action_names"])
+        print(f"[{self.name}] Model loaded from: {path} (version {metadata.get('version') or '-'})")
+
+    @property
+    def size_bytes(self) -> int:
+        """Model havuzu bütçesi için parametre byte'ları."""
+        return self.metadata.get("param_bytes", 0)
+
+    def get_action_name(self, action: int) -> str:
+        if 0 <= action < len(self._action_names):
+            return self._action_names[action]
+        return super().get_action_name(action)
+
+    def _buffers(self, layers: Tuple, num_rows: int) -> List[np.ndarray]:
+        """Bu thread'in scratch buffer'ları ([:num_rows] view'ları)."""
+        scratch = self._scratch
+        if num_rows > scratch.capacity:
+            capacity = max(num_rows, 2 * scratch.capacity, 1)
+            pi, vf, action_head, _ = layers
+            widths = [W.shape[1] for W, _, _ in pi] + [W.shape[1] for W, _, _ in vf]
+            widths += [action_head[0].shape[1], 1, action_head[0].shape[1]]
+            scratch.buffers = [np.empty((capacity, width), dtype=np.float32) for width in widths]
+            scratch.capacity = capacity
+        return [buffer[:num_rows] for buffer in scratch.buffers]
+
+    @staticmethod
+    def _trunk(x: np.ndarray, trunk: Tuple, buffers: List[np.ndarray]) -> np.ndarray:
+        for (W, b, activation), out in zip(trunk, buffers):
+            np.matmul(x, W, out=out)
+            out += b
+            if activation == "tanh":
+                np.tanh(out, out=out)
+            elif activation == "relu":
+                np.maximum(out, 0.0, out=out)
+            x = out
+        return x
+
+    def _forward(
+        self,
+        observations: np.ndarray,
+        deterministic: bool
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        layers = self._layers
+        if not layers:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        pi, vf, (action_W, action_b), (value_W, value_b) = layers
+        n = len(observations)
+        buffers = self._buffers(layers, n)
+        logits, values, probs = buffers[-3], buffers[-2], buffers[-1]
+
+        np.matmul(self._trunk(observations, pi, buffers), action_W, out=logits)
+        logits += action_b
+        np.matmul(self._trunk(observations, vf, buffers[len(pi):]), value_W, out=values)
+        values += value_b
+
+        # Softmax (satır max'ı çıkarılarak)
+        np.subtract(logits, logits.max(axis=1, keepdims=True), out=probs)
+        np.exp(probs, out=probs)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        if deterministic:
+            actions = np.argmax(logits, axis=1)
+        else:
+            # Ters CDF sampling; yuvarlama taşmasına karşı son aksiyona kırpılır
+            u = self.rng.random((n, 1), dtype=np.float32)
+            actions = np.minimum((np.cumsum(probs, axis=1) < u).sum(axis=1), self.action_dim - 1)
+        return actions.astype(np.int64), probs.copy(), values[:, 0].copy()
+
+    def select_action(
+        self,
+        observation: np.ndarray,
+        deterministic: bool = False
+    ) -> Tuple[int, Dict[str, float]]:
+        """Tek observation için aksiyon (PPOAgent ile aynı info)."""
+        observations = np.asarray(observation, dtype=np.float32).reshape(1, -1)
+        actions, probs, values = self._forward(observations, deterministic)
+
+        info = {f"prob_{self.get_action_name(i)}": p for i, p in enumerate(probs[0].tolist())}
+        info["value_estimate"] = float(values[0])
+        self.step()
+
+        return int(actions[0]), info
+
+    def select_actions(
+        self,
+        observations: np.ndarray,
+        deterministic: bool = False
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """N observation için tek forward pass."""
+        observations = np.asarray(observations, dtype=np.float32).reshape(-1, self.observation_dim)
+        actions, probs, values = self._forward(observations, deterministic)
+
+        info = {f"prob_{self.get_action_name(i)}": probs[:, i] for i in range(probs.shape[1])}
+        info["value_estimate"] = values
+        self._step_count += len(observations)
+
+        return actions, info
+
+    def update(
+        self,
+        observation: np.ndarray,
+        action: int,
+        reward: float,
+        next_observation: np.ndarray,
+        done: bool
+    ) -> Dict[str, float]:
+        """NumPy politikası eğitim yapmaz."""
+        return {"reward": reward}
+
+    def save(self, path: str) -> None:
+        """Yüklü ağırlıkları metadata ile birlikte tekrar yaz."""
+        if not self._layers:
+            raise RuntimeError("Model not loaded.")
+        pi, vf, action_head, value_head = self._layers
+        arrays = {}
+        for prefix, trunk in (("pi", pi), ("vf", vf)):
+            for i, (W, b, _) in enumerate(trunk):
+                arrays[f"{prefix}_W{i}"], arrays[f"{prefix}_b{i}"] = W, b
+        arrays["action_W"], arrays["action_b"] = action_head
+        arrays["value_W"], arrays["value_b"] = value_head
+        with open(path, "wb") as f:
+            np.savez(f, metadata=np.array(json.dumps(self.metadata)), **arrays)
@@ -8,13 +8,18 @@ Referanslar:
 - Schulman et al. (2017): Original PPO paper
 """
 
+import io
 import os
+import shutil
+import zipfile
 from typing import Any, Dict, Optional, Tuple
 import numpy as np
 import torch
 
 from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.save_util import json_to_data
+from stable_baselines3.common.utils import get_device
 from stable_baselines3.common.vec_env import DummyVecEnv
 
 from .base_agent import BaseAgent
@@ -93,6 +98,8 @@ class PPOAgent(BaseAgent):
         # Model henüz oluşturulmadı
         self.model: Optional[PPO] = None
         self._env = None
+        # load(inference_only=True) sonrası rollout buffer/optimizer yok
+        self._inference_only = False
 
         # Inference için buffer
         self._obs_buffer = None
@@ -105,6 +112,7 @@ class PPOAgent(BaseAgent):
             env: Gymnasium environment
         """
         self._env = env
+        self._inference_only = False
 
         self.model = PPO(
             policy="MlpPolicy",
@@ -125,6 +133,8 @@ class PPOAgent(BaseAgent):
             tensorboard_log="./logs/tensorboard/"
         )
 
+        self.observation_dim = int(np.prod(self.model.observation_space.shape))
+        self.action_dim = int(self.model.action_space.n)
         print(f"[{self.name}] Model initialized on device: {self.model.device}")
 
     def select_action(
@@ -150,33 +160,83 @@ class PPOAgent(BaseAgent):
         if observation.ndim == 1:
             observation = observation.reshape(1, -1)
 
-        # Aksiyon seç
-        action, _states = self.model.predict(
-            observation,
-            deterministic=deterministic
-        )
+        # Aksiyon, olasılıklar ve değer tek forward pass'ten
+        actions, probs, values = self._forward(observation, deterministic)
 
-        # Action probabilities ve value için
         info = {}
+        for i, p in enumerate(probs[0].tolist()):
+            info[f"prob_{self.get_action_name(i)}"] = p
+        info["value_estimate"] = float(values[0])
 
-        with torch.no_grad():
-            obs_tensor = torch.as_tensor(observation).float().to(self.model.device)
+        self.step()
 
-            # Policy'den distribution al
-            distribution = self.model.policy.get_distribution(obs_tensor)
-            probs = distribution.distribution.probs.cpu().numpy()[0]
+        return int(actions[0]), info
 
-            # Value tahmini
-            value = self.model.policy.predict_values(obs_tensor).cpu().numpy().flatten()[0]
+    def select_actions(
+        self,
+        observations: np.ndarray,
+        deterministic: bool = False
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        N observation için tek forward pass.
 
-            # Info dict'e ekle
-            for i, p in enumerate(probs):
-                info[f"prob_{self.get_action_name(i)}"] = float(p)
-            info["value_estimate"] = float(value.item()) if hasattr(value, 'item') else float(value)
+        Returns:
+            actions: N uzunluğunda dizi
+            info: prob_<AKSİYON> ve value_estimate kolonları
+        """
+        if self.model is None:
+            raise RuntimeError("Model not initialized. Call initialize() first.")
 
-        self.step()
+        observations = np.asarray(observations, dtype=np.float32).reshape(-1, self.observation_dim)
+        actions, probs, values = self._forward(observations, deterministic)
+
+        info = {f"prob_{self.get_action_name(i)}": probs[:, i] for i in range(probs.shape[1])}
+        info["value_estimate"] = values
+        self._step_count += len(observations)
+
+        return actions, info
+
+    def _forward(
+        self,
+        observations: np.ndarray,
+        deterministic: bool
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Tek fused forward pass: feature extractor, MLP gövdeleri, action_net
+        ve value_net birer kez çalışır; aksiyon aynı logit'lerden seçilir.
+
+        model.predict + get_distribution + predict_values ile aynı sonucu
+        verir (sampling de SB3 gibi Categorical(logits).sample()).
 
-        return int(action[0]) if isinstance(action, np.ndarray) else int(action), info
+        Args:
+            observations: N x observation_dim
+
+        Returns:
+            (aksiyonlar [N], olasılıklar [N x action_dim], değerler [N])
+        """
+        policy = self.model.policy
+        with torch.no_grad():
+            obs_tensor = torch.as_tensor(observations, dtype=torch.float32, device=policy.device)
+            features = policy.extract_features(obs_tensor)
+            if policy.share_features_extractor:
+                latent_pi, latent_vf = policy.mlp_extractor(features)
+            else:
+                pi_features, vf_features = features
+                latent_pi = policy.mlp_extractor.forward_actor(pi_features)
+                latent_vf = policy.mlp_extractor.forward_critic(vf_features)
+
+            logits = policy.action_net(latent_pi)
+            values = policy.value_net(latent_vf).flatten()
+
+            if deterministic:
+                actions = torch.argmax(logits, dim=1)
+                probs = torch.softmax(logits, dim=1)
+            else:
+                distribution = torch.distributions.Categorical(logits=logits)
+                actions = distribution.sample()
+                probs = distribution.probs
+
+        return actions.cpu().numpy(), probs.cpu().numpy(), values.cpu().numpy()
 
     def update(
         self,
@@ -216,6 +276,8 @@ class PPOAgent(BaseAgent):
         """
         if self.model is None:
             raise RuntimeError("Model not initialized. Call initialize() first.")
+        if self._inference_only:
+            raise RuntimeError("Model was loaded with inference_only=True; load it with an env to train.")
 
         self.set_training_mode(True)
 
@@ -248,24 +310,95 @@ class PPOAgent(BaseAgent):
         self.model.save(path)
         print(f"[{self.name}] Model saved to: {path}")
 
-    def load(self, path: str, env=None) -> None:
+    def load(self, path: str, env=None, inference_only: bool = False, mmap: bool = False) -> None:
         """
         Model'i yükle.
 
+        observation_dim/action_dim kayıtlı space'lerden alınır (64-dim
+        MockCombatEnv ve 96-dim CALYPSO modelleri aynı şekilde yüklenir).
+
         Args:
             path: Model dosyası yolu
             env: Opsiyonel environment (inference için gerekli değil)
+            inference_only: Sadece politikayı kur; rollout buffer, optimizer
+                state'i ve ağırlık init'i atlanır (train() kullanılamaz)
+            mmap: inference_only ile CPU'da ağırlıkları memory-map et
+                (worker process'leri aynı sayfaları paylaşır)
         """
         if env is not None:
             self._env = env
 
-        self.model = PPO.load(
-            path,
-            env=self._env,
-            device=self.device
-        )
+        if inference_only:
+            self.model = self._load_policy_only(path, mmap)
+        else:
+            self.model = PPO.load(
+                path,
+                env=self._env,
+                device=self.device
+            )
+        self._inference_only = inference_only
+        self.observation_dim = int(np.prod(self.model.observation_space.shape))
+        self.action_dim = int(self.model.action_space.n)
         print(f"[{self.name}] Model loaded from: {path}")
 
+    def _load_policy_only(self, path: str, mmap: bool) -> PPO:
+        """
+        SB3 zip'inden sadece kayıtlı space'ler + politika ağırlıklarıyla PPO kur.
+
+        PPO.load'un aksine _setup_model çağrılmaz: rollout buffer ayrılmaz,
+        policy.optimizer.pth okunmaz.
+        """
+        if not os.path.exists(path) and os.path.exists(path + ".zip"):
+            path = path + ".zip"
+        device = get_device(self.device)
+
+        with zipfile.ZipFile(path) as archive:
+            data = json_to_data(archive.read("data").decode())
+            if mmap and device.type == "cpu":
+                state_dict = self._mmap_policy_weights(path, archive)
+            else:
+                mmap = False
+                state_dict = torch.load(
+                    io.BytesIO(archive.read("policy.pth")), map_location=device, weights_only=True
+                )
+
+        model = PPO(policy=data["policy_class"], env=None, device=device, _init_setup_model=False)
+        model.__dict__.update(data)
+        model._setup_lr_schedule()
+
+        policy_kwargs = dict(model.policy_kwargs)
+        policy_kwargs.pop("device", None)
+        # Ağırlıklar hemen üzerine yazılacak; orthogonal init gereksiz
+        policy_kwargs["ortho_init"] = False
+        policy = model.policy_class(
+            model.observation_space, model.action_space, model.lr_schedule,
+            use_sde=model.use_sde, **policy_kwargs
+        )
+        # assign=True: mmap'lenmiş tensor'lar kopyalanmadan parametre olur
+        policy.load_state_dict(state_dict, assign=mmap)
+        model.policy = policy.to(device)
+        model.policy.set_training_mode(False)
+        return model
+
+    def _mmap_policy_weights(self, path: str, archive: zipfile.ZipFile) -> Dict[str, torch.Tensor]:
+        """
+        policy.pth'yi zip'in yanına çıkar (güncel değilse) ve mmap ile yükle.
+
+        Dizin yazılamıyorsa normal yüklemeye düşülür.
+        """
+        weights_path = os.path.splitext(path)[0] + ".policy.pth"
+        try:
+            if not os.path.exists(weights_path) or os.path.getmtime(weights_path) < os.path.getmtime(path):
+                tmp_path = f"{weights_path}.{os.getpid()}.tmp"
+                with archive.open("policy.pth") as src, open(tmp_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                # Aynı anda açılan worker'lar yarım dosya görmesin
+                os.replace(tmp_path, weights_path)
+            return torch.load(weights_path, map_location="cpu", weights_only=True, mmap=True)
+        except OSError as e:
+            print(f"[{self.name}] mmap unavailable for {path}: {e}")
+            return torch.load(io.BytesIO(archive.read("policy.pth")), map_location="cpu", weights_only=True)
+
     def get_training_metrics(self) -> Dict[str, float]:
         """Son training metriklerini döndür."""
         if self.model is None:
@@ -8,10 +8,14 @@ Demo'da "Rule-based vs RL" senaryosunda gösterilecek.
 Referans: Hong et al. (2023) - GOBT Utility AI yaklaşımı
 """
 
-from typing import Dict, Tuple
+import math
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Optional, Tuple, Union
 import numpy as np
 
 from .base_agent import BaseAgent
+from .rule_table import RuleDecisionTable
 
 
 class RuleBasedAgent(BaseAgent):
@@ -55,125 +59,261 @@ class RuleBasedAgent(BaseAgent):
         self.caution = caution
         self.team_focus = team_focus
 
+        # Derlenmiş karar tablosu (compile()); personality değişirse kullanılmaz
+        self.decision_table: Optional[RuleDecisionTable] = None
+
+    # Utility'lerin kullandığı observation alanları: (isim, indeks, kısa
+    # observation'da varsayılan). Observation yapısı (64 dim):
+    # [0-15] bot self state, [16-39] 3 düşman (8'er dim, ilki en yakın),
+    # [40-55] environment state, [56-63] team state
+    FEATURES = (
+        ("self_health", 0, 1.0),
+        ("self_ammo", 2, 1.0),
+        ("is_in_cover", 13, 0.0),
+        ("is_reloading", 14, 0.0),
+        ("enemy_distance", 16, 1.0),
+        ("enemy_visible", 19, 0.0),
+        ("enemy_threat", 21, 0.0),
+        ("enemy_aiming_at_me", 23, 0.0),
+        ("cover_distance", 40, 1.0),
+        ("team_health", 56, 1.0),
+        ("support_needed", 63, 0.0)
+    )
+    FEATURE_INDEX = np.array([index for _, index, _ in FEATURES])
+    _FEATURE_INDEX_LIST = FEATURE_INDEX.tolist()
+    FEATURE_DEFAULTS = np.array([default for _, _, default in FEATURES])
+
+    # Aksiyon sırasıyla utility isimleri (aksiyon id = indeks)
+    ACTION_NAMES = (
+        "IDLE", "ATTACK", "TAKE_COVER", "FLEE", "RELOAD",
+        "PATROL", "INVESTIGATE", "SUPPORT", "FLANK"
+    )
+    _ACTION_NAME_ARRAY = np.array(ACTION_NAMES)
+    _INFO_KEYS = tuple(f"utility_{name}" for name in ACTION_NAMES)
+
+    # Bu boyuta kadar batch'ler satır satır (skaler) hesaplanır; küçük
+    # dizilerde numpy çağrı maliyeti hesaplamadan büyüktür
+    SCALAR_BATCH_LIMIT = 16
+
+    # Stochastic seçimde softmax sıcaklığı
+    TEMPERATURE = 0.5
+
     def select_action(
         self,
         observation: np.ndarray,
-        deterministic: bool = True
+        deterministic: bool = True,
+        return_info: bool = True
     ) -> Tuple[int, Dict[str, float]]:
         """
         Utility skorlarına göre aksiyon seç.
 
-        Observation yapısı (64 dim):
-        - [0-15]: Bot self state
-        - [16-39]: 3 düşman (her biri 8 dim)
-        - [40-55]: Environment state
-        - [56-63]: Team state
-        """
-        # Observation'dan bilgileri çıkar
-        obs = observation.flatten()
-
-        # Self state
-        self_health = obs[0] if len(obs) > 0 else 1.0
-        self_ammo = obs[2] if len(obs) > 2 else 1.0
-        is_in_cover = obs[13] if len(obs) > 13 else 0.0
-        is_reloading = obs[14] if len(obs) > 14 else 0.0
-
-        # En yakın düşman bilgisi (index 16-23)
-        enemy_distance = obs[16] if len(obs) > 16 else 1.0
-        enemy_visible = obs[19] if len(obs) > 19 else 0.0
-        enemy_threat = obs[21] if len(obs) > 21 else 0.0
-        enemy_aiming_at_me = obs[23] if len(obs) > 23 else 0.0
-
-        # Çevre - siper mesafesi (index 40-41)
-        cover_distance = obs[40] if len(obs) > 40 else 1.0
-
-        # Takım durumu (index 56-63)
-        team_health = obs[56] if len(obs) > 56 else 1.0
-        support_needed = obs[63] if len(obs) > 63 else 0.0
-
-        # Her aksiyon için utility hesapla
-        utilities = {}
-
-        # IDLE - Düşman yoksa veya herşey iyi
-        utilities["IDLE"] = self._utility_idle(
-            enemy_visible, self_health, is_in_cover
-        )
-
-        # ATTACK - Düşman görünür ve saldırabilir durumdayız
-        utilities["ATTACK"] = self._utility_attack(
-            enemy_visible, enemy_distance, self_health, self_ammo,
-            enemy_threat, self.aggression
-        )
+        Args:
+            observation: 64-dim observation (kısa ise eksik alanlar varsayılan)
+            deterministic: True = en yüksek utility, False = softmax sampling
+            return_info: False ise utility'ler info'ya yazılmaz (boş dict)
 
-        # TAKE_COVER - Tehlike altındayız ve siper yakın
-        utilities["TAKE_COVER"] = self._utility_take_cover(
-            enemy_aiming_at_me, self_health, is_in_cover,
-            cover_distance, self.caution
-        )
+        Derlenmiş tablo varsa deterministic seçim tablodan okunur; bu
+        durumda info yalnızca selected_action içerir.
+        """
+        values = observation.ravel().tolist()
+        table = self.decision_table
+        if deterministic and table is not None and table.matches(self):
+            action = table.lookup_features(self._features_row(values))
+            self.step()
+            return action, ({"selected_action": self.ACTION_NAMES[action]} if return_info else {})
 
-        # FLEE - Can çok düşük
-        utilities["FLEE"] = self._utility_flee(
-            self_health, enemy_threat, enemy_distance, self.caution
-        )
+        utilities = self._utilities_row(values)
 
-        # RELOAD - Mermi az
-        utilities["RELOAD"] = self._utility_reload(
-            self_ammo, is_reloading, enemy_distance, is_in_cover
-        )
+        if deterministic:
+            action = max(range(len(utilities)), key=utilities.__getitem__)
+        else:
+            # _sample'ın skaler karşılığı (softmax + ters CDF)
+            best = max(utilities)
+            cdf = list(accumulate(math.exp((u - best) / self.TEMPERATURE) for u in utilities))
+            action = min(bisect_left(cdf, np.random.random() * cdf[-1]), len(cdf) - 1)
 
-        # PATROL - Düşman yok, keşif yap
-        utilities["PATROL"] = self._utility_patrol(
-            enemy_visible, self_health
-        )
+        self.step()
 
-        # INVESTIGATE - Ses duyuldu ama düşman görünmüyor
-        utilities["INVESTIGATE"] = self._utility_investigate(
-            enemy_visible, enemy_distance
-        )
+        if not return_info:
+            return action, {}
+        info = dict(zip(self._INFO_KEYS, utilities))
+        info["selected_action"] = self.ACTION_NAMES[action]
+        return action, info
 
-        # SUPPORT - Takım arkadaşı tehlikede
-        utilities["SUPPORT"] = self._utility_support(
-            support_needed, team_health, self_health, self.team_focus
-        )
+    def select_actions(
+        self,
+        observations: np.ndarray,
+        deterministic: bool = True,
+        return_info: bool = True
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        N observation için utility'leri kolon işlemleriyle hesapla.
 
-        # FLANK - Yan atak fırsatı
-        utilities["FLANK"] = self._utility_flank(
-            enemy_visible, enemy_distance, is_in_cover,
-            self_health, self.aggression
-        )
+        select_action ile aynı utility'leri ve aksiyonları verir.
 
-        # En yüksek utility'yi bul
-        action_map = {
-            "IDLE": self.ACTION_IDLE,
-            "ATTACK": self.ACTION_ATTACK,
-            "TAKE_COVER": self.ACTION_TAKE_COVER,
-            "FLEE": self.ACTION_FLEE,
-            "RELOAD": self.ACTION_RELOAD,
-            "PATROL": self.ACTION_PATROL,
-            "INVESTIGATE": self.ACTION_INVESTIGATE,
-            "SUPPORT": self.ACTION_SUPPORT,
-            "FLANK": self.ACTION_FLANK
-        }
+        Returns:
+            actions: N uzunluğunda dizi
+            info: utility_<AKSİYON> kolonları ve selected_action isimleri
+                (return_info=False ise boş; derlenmiş tabloda yalnızca
+                selected_action)
+        """
+        observations = np.atleast_2d(np.asarray(observations))
+        table = self.decision_table
+        if deterministic and table is not None and table.matches(self):
+            if len(observations) <= self.SCALAR_BATCH_LIMIT:
+                actions = np.array([table.lookup_features(self._features_row(row))
+                                    for row in observations.tolist()], dtype=np.int64)
+            else:
+                actions = table.lookup(self._features_batch(observations))
+            self._step_count += len(observations)
+            return actions, ({"selected_action": self._ACTION_NAME_ARRAY[actions]} if return_info else {})
+
+        if len(observations) <= self.SCALAR_BATCH_LIMIT:
+            utilities = np.array([self._utilities_row(row) for row in observations.tolist()])
+        else:
+            utilities = self._utilities_batch(observations)
 
         if deterministic:
-            # En yüksek utility
-            best_action_name = max(utilities, key=utilities.get)
+            actions = np.argmax(utilities, axis=1)
         else:
-            # Softmax ile stochastic seçim
-            utility_values = np.array(list(utilities.values()))
-            probs = self._softmax(utility_values, temperature=0.5)
-            action_names = list(utilities.keys())
-            best_action_name = np.random.choice(action_names, p=probs)
+            actions = self._sample(utilities)
+        self._step_count += len(observations)
 
-        action = action_map[best_action_name]
+        if not return_info:
+            return actions, {}
+        info = {key: utilities[:, i] for i, key in enumerate(self._INFO_KEYS)}
+        info["selected_action"] = self._ACTION_NAME_ARRAY[actions]
+        return actions, info
 
-        # Info dict - utility skorları
-        info = {f"utility_{k}": v for k, v in utilities.items()}
-        info["selected_action"] = best_action_name
+    def compile(self, resolution: Union[int, Dict[str, int]] = 6) -> RuleDecisionTable:
+        """
+        Şu anki personality için karar tablosunu hesapla ve kullan.
 
-        self.step()
+        Args:
+            resolution: Eksen başına eşit aralık sayısı (bkz. rule_table.axis_edges)
+        """
+        self.decision_table = RuleDecisionTable.build(self, resolution)
+        return self.decision_table
+
+    def set_decision_table(self, table: Optional[RuleDecisionTable]) -> None:
+        """Önceden derlenmiş tabloyu kullan (None = tam utility'lere dön)."""
+        if table is not None and not table.matches(self):
+            raise ValueError(
+                f"Decision table was compiled for personality {table.personality}, "
+                f"agent has {(self.aggression, self.caution, self.team_focus)}"
+            )
+        self.decision_table = table
+
+    def _sample(self, utilities: np.ndarray) -> np.ndarray:
+        """Satır başına softmax (TEMPERATURE) ve ters CDF ile tek seferde sampling."""
+        logits = utilities / self.TEMPERATURE
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        cdf = np.cumsum(probs, axis=1)
+        draws = np.random.random(len(utilities)) * cdf[:, -1]
+        return np.minimum((cdf < draws[:, None]).sum(axis=1), len(self.ACTION_NAMES) - 1)
+
+    def _features_row(self, values: list) -> list:
+        """Tek observation (python float listesi) için FEATURES sırasıyla özellikler."""
+        if len(values) > self._FEATURE_INDEX_LIST[-1]:
+            return [values[index] for index in self._FEATURE_INDEX_LIST]
+        return [values[index] if len(values) > index else default
+                for _, index, default in self.FEATURES]
+
+    def _utilities_row(self, values: list) -> Tuple[float, ...]:
+        """Tek observation (python float listesi) için 9 utility."""
+        (self_health, self_ammo, is_in_cover, is_reloading, enemy_distance, enemy_visible,
+         enemy_threat, enemy_aiming_at_me, cover_distance, team_health,
+         support_needed) = self._features_row(values)
+
+        return (
+            self._utility_idle(enemy_visible, self_health, is_in_cover),
+            self._utility_attack(enemy_visible, enemy_distance, self_health, self_ammo,
+                                 enemy_threat, self.aggression),
+            self._utility_take_cover(enemy_aiming_at_me, self_health, is_in_cover,
+                                     cover_distance, self.caution),
+            self._utility_flee(self_health, enemy_threat, enemy_distance, self.caution),
+            self._utility_reload(self_ammo, is_reloading, enemy_distance, is_in_cover),
+            self._utility_patrol(enemy_visible, self_health),
+            self._utility_investigate(enemy_visible, enemy_distance),
+            self._utility_support(support_needed, team_health, self_health, self.team_focus),
+            self._utility_flank(enemy_visible, enemy_distance, is_in_cover,
+                                self_health, self.aggression)
+        )
 
-        return action, info
+    def _features_batch(self, observations: np.ndarray) -> np.ndarray:
+        """FEATURES sırasıyla 11 x N float64 özellik matrisi."""
+        n, width = observations.shape
+        if width > self.FEATURE_INDEX[-1]:
+            return np.ascontiguousarray(observations[:, self.FEATURE_INDEX].T, dtype=np.float64)
+        features = np.repeat(self.FEATURE_DEFAULTS[:, None], n, axis=1)
+        present = self.FEATURE_INDEX < width
+        features[present] = observations[:, self.FEATURE_INDEX[present]].T
+        return features
+
+    def _utilities_batch(self, observations: np.ndarray) -> np.ndarray:
+        """N x 9 utility matrisi (_utility_* fonksiyonlarının kolon karşılığı)."""
+        return self.utilities_from_features(self._features_batch(observations))
+
+    def utilities_from_features(self, features: np.ndarray) -> np.ndarray:
+        """
+        FEATURES sırasıyla 11 x N float64 özelliklerden N x 9 utility matrisi.
+
+        Observation'sız değerlendirme içindir (ör. RuleDecisionTable
+        grid noktaları).
+        """
+        (self_health, self_ammo, is_in_cover, is_reloading, enemy_distance, enemy_visible,
+         enemy_threat, enemy_aiming_at_me, cover_distance, team_health,
+         support_needed) = features
+
+        # Toplamlar _utility_* ile aynı sırada float64'te yapılır; böylece
+        # sonuçlar skaler yol ile bit düzeyinde aynıdır (beraberlikler dahil)
+        in_cover = is_in_cover > 0.5
+        utilities = np.empty((features.shape[1], len(self.ACTION_NAMES)), dtype=np.float64)
+
+        # IDLE
+        utilities[:, 0] = np.minimum(
+            0.3 + 0.4 * (enemy_visible < 0.5) + 0.2 * (in_cover & (self_health > 0.8)), 1.0)
+
+        # ATTACK
+        score = (0.3 * enemy_visible + 0.2 * (1 - enemy_distance) + 0.2 * self_health
+                 + 0.1 * self_ammo + 0.2 * self.aggression + 0.1 * (enemy_threat < 0.3))
+        utilities[:, 1] = np.where(
+            (enemy_visible < 0.5) | (self_ammo < 0.1), 0.0, np.minimum(score, 1.0))
+
+        # TAKE_COVER
+        score = (0.3 * enemy_aiming_at_me + 0.3 * (1 - self_health)
+                 + 0.2 * (1 - cover_distance) + 0.2 * self.caution)
+        utilities[:, 2] = np.where(in_cover, 0.1, np.minimum(score, 1.0))
+
+        # FLEE
+        score = (np.where(self_health < 0.2, 0.5, np.where(self_health < 0.4, 0.3, 0.0))
+                 + 0.3 * enemy_threat + 0.2 * (enemy_distance < 0.2) + 0.1 * self.caution)
+        utilities[:, 3] = np.minimum(score, 1.0)
+
+        # RELOAD
+        score = 0.5 * (1 - self_ammo) + 0.3 * in_cover + 0.2 * enemy_distance
+        utilities[:, 4] = np.where(
+            (is_reloading > 0.5) | (self_ammo > 0.8), 0.0, np.minimum(score, 1.0))
+
+        # PATROL
+        score = 0.3 + 0.3 * self_health + 0.4 * (1 - enemy_visible)
+        utilities[:, 5] = np.where(enemy_visible > 0.5, 0.0, np.minimum(score, 1.0))
+
+        # INVESTIGATE
+        score = 0.5 * ((enemy_visible > 0.2) & (enemy_visible < 0.8)) + 0.3 * enemy_distance
+        utilities[:, 6] = np.where(enemy_visible > 0.8, 0.1, np.minimum(score, 1.0))
+
+        # SUPPORT
+        score = (0.4 * support_needed + 0.2 * (1 - team_health)
+                 + 0.2 * self_health + 0.2 * self.team_focus)
+        utilities[:, 7] = np.minimum(score, 1.0)
+
+        # FLANK
+        score = (0.3 * ((enemy_distance > 0.3) & (enemy_distance < 0.7)) + 0.2 * in_cover
+                 + 0.2 * self_health + 0.3 * self.aggression)
+        utilities[:, 8] = np.where(enemy_visible < 0.3, 0.0, np.minimum(score, 1.0))
+
+        return utilities
 
     def _utility_idle(
         self,
@@ -409,12 +549,6 @@ class RuleBasedAgent(BaseAgent):
 
         return min(score, 1.0)
 
-    def _softmax(self, x: np.ndarray, temperature: float = 1.0) -> np.ndarray:
-        """Softmax with temperature."""
-        x = x / temperature
-        exp_x = np.exp(x - np.max(x))  # Numerical stability
-        return exp_x / exp_x.sum()
-
     def update(
         self,
         observation: np.ndarray,
@@ -0,0 +1,255 @@
+"""
+Rule Decision Table - RuleBasedAgent için derlenmiş karar tablosu
+TÜBİTAK İP-2 AI Bot System
+
+RuleBasedAgent'ın utility'leri observation'ın yalnızca 11 alanına
+bağlıdır. Bu modül belirli bir aggression/caution/team_focus için
+deterministic (argmax) aksiyonu bu alanların quantize edilmiş grid'i
+üzerinde önceden hesaplar; servis sırasında karar sadece bin indeksi
+hesaplayıp tablodan okumaktır.
+
+Grid eksenleri:
+    self_health, self_ammo, is_in_cover, is_reloading, enemy_distance,
+    enemy_visible, enemy_threat   doğrudan observation alanları
+    cover_pull                    0.3 * enemy_aiming_at_me + 0.2 * (1 - cover_distance)
+    support_pull                  0.4 * support_needed + 0.2 * (1 - team_health)
+
+Son iki alan çifti utility'lerde yalnızca bu doğrusal kombinasyonlarla
+(TAKE_COVER ve SUPPORT) geçtiği için tek eksene indirgenir. Bin
+sınırları kuralların eşiklerini (ör. health < 0.2, ammo > 0.8) içerir;
+böylece eşik koşulları bir bin içinde sabittir ve hata yalnızca
+doğrudan (doğrusal) terimlerin bin içindeki değişiminden gelir. Bin'in
+aksiyonu orta noktasındaki tam utility'lerden seçilir. Eşiğe tam denk
+gelen değerler üst bin'e düşer (ör. enemy_visible == 0.5); hata raporu
+bu durumları da ölçer.
+
+Tablo stochastic sampling yapmaz; utility değerlerini de saklamaz.
+"""
+
+import json
+import time
+from bisect import bisect_right
+from operator import mul
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+TABLE_FORMAT_VERSION = 1
+
+# (eksen, değer aralığı, kural eşikleri)
+AXES = (
+    ("self_health", (0.0, 1.0), (0.2, 0.4, 0.8)),
+    ("self_ammo", (0.0, 1.0), (0.1, 0.8)),
+    ("is_in_cover", (0.0, 1.0), (0.5,)),
+    ("is_reloading", (0.0, 1.0), (0.5,)),
+    ("enemy_distance", (0.0, 1.0), (0.2, 0.3, 0.7)),
+    ("enemy_visible", (0.0, 1.0), (0.2, 0.3, 0.5, 0.8)),
+    ("enemy_threat", (0.0, 1.0), (0.3,)),
+    ("cover_pull", (0.0, 0.5), ()),
+    ("support_pull", (0.0, 0.6), ())
+)
+AXIS_NAMES = tuple(name for name, _, _ in AXES)
+
+# Sadece eşikle kullanılan eksenler (ara bin gereksiz)
+_BINARY_AXES = ("is_in_cover", "is_reloading")
+
+
+def axis_edges(resolution: Union[int, Dict[str, int]] = 6) -> List[np.ndarray]:
+    """
+    Eksen başına iç bin sınırları: kural eşikleri + eşit aralıklı bölmeler.
+
+    Args:
+        resolution: Eksen başına eşit aralık sayısı (int veya eksen -> int);
+            eşikler her zaman eklenir
+    """
+    edges = []
+    for name, (low, high), thresholds in AXES:
+        steps = resolution.get(name, 6) if isinstance(resolution, dict) else resolution
+        uniform = () if name in _BINARY_AXES else np.linspace(low, high, max(steps, 1) + 1)[1:-1]
+        edges.append(np.unique(np.round(np.concatenate([uniform, thresholds]), 9)))
+    return edges
+
+
+def axis_values(features: np.ndarray) -> np.ndarray:
+    """RuleBasedAgent.FEATURES sırasıyla 11 x N özelliklerden 9 x N eksen değeri."""
+    (self_health, self_ammo, is_in_cover, is_reloading, enemy_distance, enemy_visible,
+     enemy_threat, enemy_aiming_at_me, cover_distance, team_health, support_needed) = features
+    return np.stack([
+        self_health, self_ammo, is_in_cover, is_reloading, enemy_distance, enemy_visible,
+        enemy_threat,
+        0.3 * enemy_aiming_at_me + 0.2 * (1 - cover_distance),
+        0.4 * support_needed + 0.2 * (1 - team_health)
+    ])
+
+
+def _axis_features(values: np.ndarray) -> np.ndarray:
+    """axis_values'un tersi: eksen değerlerini veren 11 x N özellik (grid noktaları için)."""
+    (self_health, self_ammo, is_in_cover, is_reloading, enemy_distance, enemy_visible,
+     enemy_threat, cover_pull, support_pull) = values
+    aim = cover_pull / 0.5
+    support = support_pull / 0.6
+    return np.stack([
+        self_health, self_ammo, is_in_cover, is_reloading, enemy_distance, enemy_visible,
+        enemy_threat, aim, 1 - aim, 1 - support, support
+    ])
+
+
+class RuleDecisionTable:
+    """
+    Quantize edilmiş grid üzerinde önceden hesaplanmış argmax aksiyonları.
+
+    Tablo bir personality (aggression, caution, team_focus) için
+    geçerlidir; RuleBasedAgent personality değişince tabloyu kullanmaz.
+    """
+
+    def __init__(self, edges: List[np.ndarray], table: np.ndarray, personality: Tuple[float, float, float],
+                 metadata: Optional[Dict] = None):
+        """
+        Args:
+            edges: Eksen başına iç bin sınırları (AXES sırasıyla)
+            table: Düz (C sırası) uint8 aksiyon tablosu
+            personality: (aggression, caution, team_focus)
+            metadata: Ek bilgiler (resolution, build süresi, ...)
+        """
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.shape = tuple(len(e) + 1 for e in self.edges)
+        if table.size != int(np.prod(self.shape)):
+            raise ValueError(f"Table has {table.size} entries, grid {self.shape} needs {int(np.prod(self.shape))}")
+        self.table = np.ascontiguousarray(table, dtype=np.uint8).ravel()
+        self.personality = tuple(float(p) for p in personality)
+        self.metadata = metadata or {}
+
+        self.strides = np.array([int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape))])
+        # Skaler lookup için python listeleri
+        self._edge_lists = [e.tolist() for e in self.edges]
+        self._stride_list = self.strides.tolist()
+        self._table_view = memoryview(self.table)
+
+    @classmethod
+    def build(
+        cls,
+        agent,
+        resolution: Union[int, Dict[str, int]] = 6,
+        chunk_size: int = 1 << 18
+    ) -> "RuleDecisionTable":
+        """
+        Agent'ın personality'si için tabloyu hesapla.
+
+        Args:
+            agent: RuleBasedAgent (utilities_from_features kullanılır)
+            resolution: Eksen başına eşit aralık sayısı (bkz. axis_edges)
+            chunk_size: Tek seferde değerlendirilen grid noktası
+        """
+        start = time.perf_counter()
+        edges = axis_edges(resolution)
+        midpoints = []
+        for (_, (low, high), _), inner in zip(AXES, edges):
+            bounds = np.concatenate([[low], inner, [high]])
+            midpoints.append((bounds[:-1] + bounds[1:]) / 2)
+        shape = tuple(len(m) for m in midpoints)
+
+        table = np.empty(int(np.prod(shape)), dtype=np.uint8)
+        for offset in range(0, len(table), chunk_size):
+            flat = np.arange(offset, min(offset + chunk_size, len(table)))
+            index = np.unravel_index(flat, shape)
+            values = np.stack([m[i] for m, i in zip(midpoints, index)])
+            utilities = agent.utilities_from_features(_axis_features(values))
+            table[flat] = np.argmax(utilities, axis=1)
+
+        personality = (agent.aggression, agent.caution, agent.team_focus)
+        metadata = {
+            "resolution": resolution,
+            "build_seconds": time.perf_counter() - start
+        }
+        print(f"[RuleDecisionTable] Built {len(table):,} entries {shape} "
+              f"in {metadata['build_seconds']:.1f}s")
+        return cls(edges, table, personality, metadata)
+
+    @property
+    def size_bytes(self) -> int:
+        return self.table.nbytes
+
+    def matches(self, agent) -> bool:
+        """Tablo agent'ın şu anki personality'si için mi?"""
+        return self.personality == (agent.aggression, agent.caution, agent.team_focus)
+
+    def lookup_features(self, features: list) -> int:
+        """Tek observation'ın (FEATURES sırasıyla python float'lar) aksiyonu."""
+        # İlk 7 özellik eksenlerle aynı sırada; son dördü iki eksene indirgenir
+        enemy_aiming_at_me, cover_distance, team_health, support_needed = features[7:]
+        values = features[:7]
+        values.append(0.3 * enemy_aiming_at_me + 0.2 * (1 - cover_distance))
+        values.append(0.4 * support_needed + 0.2 * (1 - team_health))
+        flat = sum(map(mul, map(bisect_right, self._edge_lists, values), self._stride_list))
+        return self._table_view[flat]
+
+    def lookup(self, features: np.ndarray) -> np.ndarray:
+        """11 x N özelliklerden N aksiyon."""
+        values = axis_values(features)
+        flat = np.zeros(values.shape[1], dtype=np.int64)
+        for axis, (edges, stride) in enumerate(zip(self.edges, self.strides)):
+            flat += np.searchsorted(edges, values[axis], side="right") * stride
+        return self.table[flat].astype(np.int64)
+
+    def error_report(self, agent, observations: np.ndarray) -> Dict:
+        """
+        Tablo aksiyonlarını tam utility argmax'ı ile karşılaştır.
+
+        Regret: tam utility'ye göre en iyi aksiyonun skoru ile tablonun
+        seçtiği aksiyonun skoru arasındaki fark.
+        """
+        observations = np.atleast_2d(np.asarray(observations))
+        features = agent._features_batch(observations)
+        utilities = agent.utilities_from_features(features)
+        exact = np.argmax(utilities, axis=1)
+        compiled = self.lookup(features)
+
+        rows = np.arange(len(observations))
+        regret = utilities[rows, exact] - utilities[rows, compiled]
+        mismatched = compiled != exact
+        per_action = {}
+        for action, name in enumerate(agent.ACTION_NAMES):
+            mask = exact == action
+            if mask.any():
+                per_action[name] = {"samples": int(mask.sum()), "agreement": float(np.mean(~mismatched[mask]))}
+
+        return {
+            "samples": len(observations),
+            "agreement": float(np.mean(~mismatched)),
+            "mismatches": int(mismatched.sum()),
+            "regret_mean": float(regret.mean()),
+            "regret_p99": float(np.percentile(regret, 99)),
+            "regret_max": float(regret.max()),
+            "per_action": per_action
+        }
+
+    def save(self, path: str) -> None:
+        """Tabloyu npz olarak kaydet."""
+        metadata = {
+            "format_version": TABLE_FORMAT_VERSION,
+            "axes": list(AXIS_NAMES),
+            "personality": list(self.personality),
+            **self.metadata
+        }
+        arrays = {f"edges_{i}": e for i, e in enumerate(self.edges)}
+        with open(path, "wb") as f:
+            np.savez(f, metadata=np.array(json.dumps(metadata)), table=self.table, **arrays)
+        print(f"[RuleDecisionTable] Saved table to: {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "RuleDecisionTable":
+        """save() çıktısını yükle."""
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data["metadata"]))
+            if metadata.get("format_version") != TABLE_FORMAT_VERSION or metadata.get("axes") != list(AXIS_NAMES):
+                raise ValueError(
+                    f"Unsupported rule table format {metadata.get('format_version')} in {path}, "
+                    f"expected {TABLE_FORMAT_VERSION}"
+                )
+            edges = [data[f"edges_{i}"] for i in range(len(AXES))]
+            table = data["table"]
+        personality = tuple(metadata.pop("personality"))
+        for key in ("format_version", "axes"):
+            metadata.pop(key)
+        return cls(edges, table, personality, metadata)
@@ -0,0 +1,271 @@
+"""
+Serving Agent - SB3'süz TorchScript inference
+TÜBİTAK İP-2 AI Bot System
+
+Eğitilmiş PPO politikasının actor + critic kısmı tek bir dondurulmuş
+(frozen) TorchScript modülüne export edilir. Dosya optimizer state'i,
+rollout buffer'ı veya SB3 sınıfları içermez; ServingAgent onu sadece
+torch ile yükler.
+
+Modül imzası: forward(obs [N x obs_dim] float32) -> (logits [N x A], values [N])
+Metadata (obs_dim, action_names, version, ...) dosyanın içine
+"metadata.json" extra file olarak yazılır.
+
+quantize=True ile Linear katmanları dinamik int8'e çevrilir (ağırlıklar
+int8, aktivasyonlar çağrı başına quantize edilir). Yalnızca CPU içindir;
+kalite kaybı scripts/quantization_parity.py ile ölçülmelidir.
+"""
+
+import json
+import time
+import warnings
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import torch
+
+from .base_agent import BaseAgent
+
+
+METADATA_FILE = "metadata.json"
+EXPORT_FORMAT_VERSION = 1
+
+
+class _PolicyModule(torch.nn.Module):
+    """SB3 ActorCriticPolicy'nin inference kısmı (fused forward)."""
+
+    def __init__(self, policy):
+        super().__init__()
+        self.features_extractor = policy.features_extractor
+        self.pi_features_extractor = policy.pi_features_extractor
+        self.vf_features_extractor = policy.vf_features_extractor
+        self.share_features_extractor = policy.share_features_extractor
+        self.policy_net = policy.mlp_extractor.policy_net
+        self.value_net_trunk = policy.mlp_extractor.value_net
+        self.action_net = policy.action_net
+        self.value_net = policy.value_net
+
+    def forward(self, obs: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        if self.share_features_extractor:
+            pi_features = vf_features = self.features_extractor(obs)
+        else:
+            pi_features = self.pi_features_extractor(obs)
+            vf_features = self.vf_features_extractor(obs)
+        logits = self.action_net(self.policy_net(pi_features))
+        values = self.value_net(self.value_net_trunk(vf_features)).flatten()
+        return logits, values
+
+
+def quantize_module(module: torch.nn.Module) -> torch.nn.Module:
+    """Linear katmanları dinamik int8 quantized karşılıklarıyla değiştir."""
+    # torch.ao.quantization torch 2.x'te DeprecationWarning verir (torchao'ya taşınıyor)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _param_bytes(module: torch.nn.Module, quantized: bool) -> int:
+    """Parametre byte'ları (quantized ise Linear ağırlıkları 1 byte)."""
+    total = 0
+    for submodule in module.modules():
+        for name, param in submodule.named_parameters(recurse=False):
+            if quantized and isinstance(submodule, torch.nn.Linear) and name == "weight":
+                total += param.numel()
+            else:
+                total += param.numel() * param.element_size()
+    return total
+
+
+def export_policy(agent, path: str, version: str = "", quantize: bool = False) -> Dict:
+    """
+    PPOAgent politikasını frozen TorchScript olarak kaydet.
+
+    Args:
+        agent: Yüklenmiş PPOAgent (model.policy olmalı)
+        path: Çıktı dosyası (.pt)
+        version: Model versiyon etiketi (metadata'ya yazılır)
+        quantize: Linear katmanları dinamik int8'e çevir
+
+    Returns:
+        Yazılan metadata
+    """
+    if getattr(agent, "model", None) is None:
+        raise RuntimeError("Model not initialized.")
+
+    policy = agent.model.policy
+    module = _PolicyModule(policy).to("cpu").eval()
+    param_bytes = _param_bytes(module, quantize)
+    if quantize:
+        module = quantize_module(module)
+    example = torch.zeros(1, agent.observation_dim, dtype=torch.float32)
+
+    # torch 2.x TorchScript API'leri FutureWarning verir; format yine de
+    # Python'suz yüklenebilen tek artefakt olduğu için kullanılıyor
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        traced = torch.jit.trace(module, example)
+        frozen = torch.jit.freeze(traced)
+
+    metadata = {
+        "format_version": EXPORT_FORMAT_VERSION,
+        "version": version,
+        "observation_dim": agent.observation_dim,
+        "action_dim": agent.action_dim,
+        "action_names": [agent.get_action_name(i) for i in range(agent.action_dim)],
+        "quantized": quantize,
+        "param_bytes": param_bytes,
+        "exported_at": int(time.time())
+    }
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        torch.jit.save(frozen, path, _extra_files={METADATA_FILE: json.dumps(metadata)})
+    print(f"[export_policy] Exported policy to: {path}")
+    return metadata
+
+
+def set_torch_threads(num_threads: Optional[int] = None, interop_threads: Optional[int] = None) -> None:
+    """
+    Torch CPU thread havuzlarını ayarla.
+
+    Interop havuzu process başına bir kez (ilk paralel işten önce)
+    ayarlanabilir; sonrasında çağrı yok sayılır.
+    """
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+    if interop_threads is not None:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            print(f"[ServingAgent] Interop threads not changed: {e}")
+
+
+class ServingAgent(BaseAgent):
+    """
+    Export edilmiş TorchScript politikası ile inference.
+
+    Eğitim yapmaz; select_action/select_actions PPOAgent ile aynı info
+    anahtarlarını döndürür.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        name: str = "ServingAgent",
+        num_threads: Optional[int] = None,
+        interop_threads: Optional[int] = None
+    ):
+        """
+        Args:
+            path: Export edilmiş model (.pt); None ise load() çağrılmalı
+            name: Agent ismi
+            num_threads: torch intra-op thread sayısı (None = değiştirme)
+            interop_threads: torch inter-op thread sayısı (None = değiştirme)
+        """
+        super().__init__(name)
+        set_torch_threads(num_threads, interop_threads)
+
+        self.module: Optional[torch.jit.ScriptModule] = None
+        self.metadata: Dict = {}
+        self._action_names = ()
+        if path is not None:
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        """Export edilmiş modeli yükle."""
+        extra_files = {METADATA_FILE: ""}
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            module = torch.jit.load(path, map_location="cpu", _extra_files=extra_files)
+        metadata = json.loads(extra_files[METADATA_FILE] or "{}")
+        if metadata.get("format_version") != EXPORT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported export format {metadata.get('format_version')} in {path}, "
+                f"expected {EXPORT_FORMAT_VERSION}"
+            )
+
+        # Attribute'lar yeniden atanır (ModelSlots kopyası aktif agent'ı etkilemez)
+        self.module = module.eval()
+        self.metadata = metadata
+        self.observation_dim = metadata["observation_dim"]
+        self.action_dim = metadata["action_dim"]
+        self._action_names = tuple(metadata["action_names"])
+        print(
+            f"[{self.name}] Model loaded from: {path} (version {metadata.get('version') or '-'}"
+            f"{', int8' if metadata.get('quantized') else ''})"
+        )
+
+    @property
+    def size_bytes(self) -> int:
+        """Model havuzu bütçesi için parametre byte'ları."""
+        return self.metadata.get("param_bytes", 0)
+
+    def get_action_name(self, action: int) -> str:
+        if 0 <= action < len(self._action_names):
+            return self._action_names[action]
+        return super().get_action_name(action)
+
+    def _forward(
+        self,
+        observations: np.ndarray,
+        deterministic: bool
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.module is None:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        with torch.inference_mode():
+            logits, values = self.module(torch.as_tensor(observations, dtype=torch.float32))
+            if deterministic:
+                actions = torch.argmax(logits, dim=1)
+                probs = torch.softmax(logits, dim=1)
+            else:
+                distribution = torch.distributions.Categorical(logits=logits)
+                actions = distribution.sample()
+                probs = distribution.probs
+        return actions.numpy(), probs.numpy(), values.numpy()
+
+    def select_action(
+        self,
+        observation: np.ndarray,
+        deterministic: bool = False
+    ) -> Tuple[int, Dict[str, float]]:
+        """Tek observation için aksiyon (PPOAgent ile aynı info)."""
+        actions, probs, values = self._forward(observation.reshape(1, -1), deterministic)
+
+        info = {f"prob_{self.get_action_name(i)}": p for i, p in enumerate(probs[0].tolist())}
+        info["value_estimate"] = float(values[0])
+        self.step()
+
+        return int(actions[0]), info
+
+    def select_actions(
+        self,
+        observations: np.ndarray,
+        deterministic: bool = False
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """N observation için tek forward pass."""
+        observations = np.asarray(observations, dtype=np.float32).reshape(-1, self.observation_dim)
+        actions, probs, values = self._forward(observations, deterministic)
+
+        info = {f"prob_{self.get_action_name(i)}": probs[:, i] for i in range(probs.shape[1])}
+        info["value_estimate"] = values
+        self._step_count += len(observations)
+
+        return actions, info
+
+    def update(
+        self,
+        observation: np.ndarray,
+        action: int,
+        reward: float,
+        next_observation: np.ndarray,
+        done: bool
+    ) -> Dict[str, float]:
+        """Serving agent eğitim yapmaz."""
+        return {"reward": reward}
+
+    def save(self, path: str) -> None:
+        """Yüklü modeli metadata ile birlikte tekrar yaz."""
+        if self.module is None:
+            raise RuntimeError("Model not loaded.")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            torch.jit.save(self.module, path, _extra_files={METADATA_FILE: json.dumps(self.metadata)})
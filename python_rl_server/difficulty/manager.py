@@ -4,8 +4,14 @@ TÜBİTAK İP-2 AI Bot System
 
 Adaptif zorluk yönetimi - DDA (Dynamic Difficulty Adjustment)
 Referans: Pfau et al. (2020) - Enemy within DDA
+
+gRPC thread pool'undan eşzamanlı kullanılır: oyuncu başına durum, player_id
+hash'ine göre seçilen lock şeridiyle (lock striping) korunur. Farklı
+şeritlere düşen oyuncular birbirini beklemez.
 """
 
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
 import numpy as np
@@ -110,7 +116,8 @@ class DifficultyManager:
         adjustment_rate: float = 0.1,
         min_difficulty: float = 0.1,
         max_difficulty: float = 1.0,
-        config_path: Optional[str] = None
+        config_path: Optional[str] = None,
+        num_lock_stripes: int = 64
     ):
         """
         Args:
@@ -119,6 +126,7 @@ class DifficultyManager:
             min_difficulty: Minimum zorluk (0-1)
             max_difficulty: Maksimum zorluk (0-1)
             config_path: Opsiyonel config dosyası yolu
+            num_lock_stripes: Oyuncu durumunu koruyan lock sayısı
         """
         self.enabled = enabled
         self.adjustment_rate = adjustment_rate
@@ -138,6 +146,25 @@ class DifficultyManager:
         # Trend tracking
         self._difficulty_history: Dict[str, list] = {}
 
+        # Lock striping (RLock: get_difficulty_info içinden trend okunur)
+        self._stripes = [threading.RLock() for _ in range(num_lock_stripes)]
+
+    def _lock(self, player_id: str) -> threading.RLock:
+        """Oyuncunun lock şeridi."""
+        return self._stripes[hash(player_id) % len(self._stripes)]
+
+    @contextmanager
+    def player_lock(self, player_id: str):
+        """
+        Oyuncunun tracker'ını kilitli kullan.
+
+        Tracker'a doğrudan kayıt (record_*) bu blok içinde yapılmalıdır;
+        aksi halde eşzamanlı update_difficulty deque'leri gezerken
+        değişiklik görebilir.
+        """
+        with self._lock(player_id):
+            yield self.get_tracker(player_id)
+
     def _load_config(self, config_path: str) -> None:
         """Config dosyasından ayarları yükle."""
         try:
@@ -155,16 +182,35 @@ class DifficultyManager:
 
     def register_player(self, player_id: str) -> None:
         """Yeni oyuncu kaydet."""
-        if player_id not in self._player_trackers:
-            self._player_trackers[player_id] = PlayerPerformanceTracker(player_id)
-            self._current_difficulty[player_id] = 0.5  # Orta başla
-            self._difficulty_history[player_id] = []
+        with self._lock(player_id):
+            if player_id not in self._player_trackers:
+                # Tracker en son eklenir: onu gören okuyucu diğer alanları da görür
+                self._current_difficulty[player_id] = 0.5  # Orta başla
+                self._difficulty_history[player_id] = []
+                self._player_trackers[player_id] = PlayerPerformanceTracker(player_id)
 
     def get_tracker(self, player_id: str) -> PlayerPerformanceTracker:
         """Oyuncu tracker'ını al."""
-        if player_id not in self._player_trackers:
+        tracker = self._player_trackers.get(player_id)
+        if tracker is None:
             self.register_player(player_id)
-        return self._player_trackers[player_id]
+            tracker = self._player_trackers[player_id]
+        return tracker
+
+    def record_metrics(self, player_id: str, kills: int = 0, deaths: int = 0) -> Dict:
+        """
+        Kill/death kaydet ve zorluğu güncelle (tek atomik adım).
+
+        Returns:
+            Güncel zorluk bilgisi (get_difficulty_info)
+        """
+        with self.player_lock(player_id) as tracker:
+            for _ in range(kills):
+                tracker.record_kill()
+            for _ in range(deaths):
+                tracker.record_death()
+            self.update_difficulty(player_id)
+            return self.get_difficulty_info(player_id)
 
     def update_difficulty(self, player_id: str) -> float:
         """
@@ -179,26 +225,23 @@ class DifficultyManager:
         if not self.enabled:
             return self._current_difficulty.get(player_id, 0.5)
 
-        if player_id not in self._player_trackers:
-            self.register_player(player_id)
-
-        tracker = self._player_trackers[player_id]
-        current = self._current_difficulty[player_id]
+        with self.player_lock(player_id) as tracker:
+            current = self._current_difficulty[player_id]
 
-        # Skill score hesapla
-        skill_score = tracker.calculate_skill_score()
+            # Skill score hesapla
+            skill_score = tracker.calculate_skill_score()
 
-        # Target difficulty = skill score
-        target = skill_score
+            # Target difficulty = skill score
+            target = skill_score
 
-        # Smooth transition (exponential moving average)
-        new_difficulty = current + self.adjustment_rate * (target - current)
+            # Smooth transition (exponential moving average)
+            new_difficulty = current + self.adjustment_rate * (target - current)
 
-        # Clamp
-        new_difficulty = np.clip(new_difficulty, self.min_difficulty, self.max_difficulty)
+            # Clamp
+            new_difficulty = np.clip(new_difficulty, self.min_difficulty, self.max_difficulty)
 
-        self._current_difficulty[player_id] = new_difficulty
-        self._difficulty_history[player_id].append(new_difficulty)
+            self._current_difficulty[player_id] = new_difficulty
+            self._difficulty_history[player_id].append(new_difficulty)
 
         return new_difficulty
 
@@ -250,21 +293,21 @@ class DifficultyManager:
 
     def set_difficulty(self, player_id: str, level: int) -> None:
         """Manuel zorluk ayarla (1-7)."""
-        if player_id not in self._current_difficulty:
-            self.register_player(player_id)
+        self.register_player(player_id)
 
         # Level -> 0-1
         difficulty = (level - 1) / 6.0
-        self._current_difficulty[player_id] = np.clip(difficulty, 0.0, 1.0)
+        with self._lock(player_id):
+            self._current_difficulty[player_id] = np.clip(difficulty, 0.0, 1.0)
 
     def get_difficulty_trend(self, player_id: str) -> str:
         """Zorluk trendi (STABLE, INCREASING, DECREASING)."""
-        history = self._difficulty_history.get(player_id, [])
+        with self._lock(player_id):
+            recent = self._difficulty_history.get(player_id, [])[-10:]
 
-        if len(history) < 10:
+        if len(recent) < 10:
             return "STABLE"
 
-        recent = history[-10:]
         slope = np.polyfit(range(len(recent)), recent, 1)[0]
 
         if slope > 0.01:
@@ -275,17 +318,21 @@ class DifficultyManager:
 
     def get_difficulty_info(self, player_id: str) -> Dict:
         """Zorluk bilgilerini dict olarak döndür."""
-        level = self.get_difficulty_level(player_id)
+        # Seviye, parametreler ve sürekli değer aynı güncellemeden okunsun
+        with self._lock(player_id):
+            difficulty = self.get_current_difficulty(player_id)
+            level = self.get_difficulty_level(player_id)
+            params = self.get_interpolated_params(player_id)
+            trend = self.get_difficulty_trend(player_id)
         level_info = self.DIFFICULTY_LEVELS[level]
-        params = self.get_interpolated_params(player_id)
 
         return {
             "player_id": player_id,
-            "difficulty_continuous": self.get_current_difficulty(player_id),
+            "difficulty_continuous": difficulty,
             "difficulty_level": level,
             "difficulty_name": level_info.name,
             "difficulty_name_en": level_info.name_en,
-            "trend": self.get_difficulty_trend(player_id),
+            "trend": trend,
             "bot_params": {
                 "health": params.health,
                 "accuracy": params.accuracy,
@@ -4,5 +4,14 @@ Unreal Engine ile iletişim servisleri
 """
 
 from .grpc_server import BotAIServer
+from .workers import WorkerSupervisor, WorkerConfig, WorkerStatusTable
+from .metrics import MetricsRegistry, MetricsHTTPServer
 
-__all__ = ["BotAIServer"]
+__all__ = [
+    "BotAIServer",
+    "WorkerSupervisor",
+    "WorkerConfig",
+    "WorkerStatusTable",
+    "MetricsRegistry",
+    "MetricsHTTPServer"
+]
@@ -0,0 +1,137 @@
+"""
+Action Cache
+TÜBİTAK İP-2 AI Bot System
+
+Devriye gibi uzun süre neredeyse aynı durumda kalan botlar için
+quantize edilmiş observation -> aksiyon LRU+TTL cache'i.
+
+Anahtar: quantize edilmiş observation'ın hash'i + model versiyonu +
+deterministic flag. Yeni model yüklenince versiyon değiştiği için eski
+kayıtlar hiçbir zaman eşleşmez; ayrıca cache tamamen temizlenir.
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class ActionCache:
+    """
+    Thread-safe LRU + TTL aksiyon cache'i.
+
+    Kayıt başına sadece 16 byte'lık hash, aksiyon ve info dict tutulur;
+    observation'ın kendisi saklanmaz.
+    """
+
+    # OrderedDict node + tuple overhead tahmini (byte)
+    ENTRY_OVERHEAD = 120
+
+    def __init__(
+        self,
+        max_entries: int = 50000,
+        ttl_seconds: float = 0.5,
+        quantization_step: float = 0.02
+    ):
+        """
+        Args:
+            max_entries: Maksimum kayıt (aşılınca en eski kullanılan atılır)
+            ttl_seconds: Kayıt ömrü
+            quantization_step: Observation quantize adımı (büyük = daha çok hit,
+                daha kaba eşleşme)
+        """
+        if quantization_step <= 0:
+            raise ValueError(f"quantization_step must be > 0, got {quantization_step}")
+
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.quantization_step = quantization_step
+        self._inv_step = 1.0 / quantization_step
+
+        # key -> (expires_at, action, info, size_bytes)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Dict, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._memory_bytes = 0
+
+    def make_key(self, observation: np.ndarray, model_version: Hashable, deterministic: bool) -> Hashable:
+        """Quantize edilmiş observation hash'i + model versiyonu + deterministic flag."""
+        quantized = np.rint(np.asarray(observation, dtype=np.float32) * self._inv_step).astype(np.int32)
+        digest = hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+        return (digest, model_version, bool(deterministic))
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, Dict]]:
+        """Cache'ten (action, info) al; yoksa veya süresi dolduysa None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                self._memory_bytes -= entry[3]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: Hashable, action: int, info: Dict) -> None:
+        """Kayıt ekle (LRU eviction ile)."""
+        size = self._estimate_size(info)
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old[3]
+            self._entries[key] = (expires_at, action, info, size)
+            self._memory_bytes += size
+
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted[3]
+                self._evictions += 1
+
+    def invalidate(self) -> None:
+        """Tüm kayıtları sil (ör. yeni model yüklendi)."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def _estimate_size(self, info: Dict) -> int:
+        size = self.ENTRY_OVERHEAD + sys.getsizeof(info)
+        for k, v in info.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+        return size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self._hits + self._misses
+        return self._hits / total if total > 0 else 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def get_stats(self) -> Dict:
+        """Cache istatistikleri."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_ratio": self.hit_ratio,
+                "memory_bytes": self._memory_bytes
+            }
@@ -0,0 +1,229 @@
+"""
+Inference Batcher
+TÜBİTAK İP-2 AI Bot System
+
+gRPC thread'lerinden gelen tekil inference isteklerini kuyrukta toplayıp
+tek bir inference thread'inde batch olarak çalıştırır.
+
+Her istek bir deadline taşır; kuyrukta deadline'ı geçen istekler
+çalıştırılmadan DeadlineExceededError ile sonlandırılır.
+
+Packed istekler submit_batch ile tek istek (N x obs_dim matris) olarak
+kuyruğa girer; grupta tek başına kalırsa matris run_batch'e kopyalanmadan
+geçer.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import MetricsRegistry, BATCH_SIZE_BUCKETS
+
+
+class DeadlineExceededError(TimeoutError):
+    """İstek deadline'ı inference başlamadan doldu."""
+
+
+class _PendingRequest:
+    __slots__ = ("observation", "num_rows", "key", "deadline", "future", "enqueued_at", "trace")
+
+    def __init__(
+        self,
+        observation: np.ndarray,
+        key: Hashable,
+        deadline: Optional[float],
+        trace=None,
+        num_rows: Optional[int] = None
+    ):
+        self.observation = observation
+        # None: tek observation, aksi halde observation N satırlı matristir
+        self.num_rows = num_rows
+        self.key = key
+        self.deadline = deadline
+        self.trace = trace
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class InferenceBatcher:
+    """
+    Dinamik micro-batching kuyruğu.
+
+    İlk istek geldikten sonra en fazla max_wait_ms kadar bekleyip
+    max_batch_size'a kadar istek toplar. Aynı key'e (ör. deterministic
+    flag) sahip istekler aynı run_batch çağrısında işlenir.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, List[np.ndarray]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 1.0,
+        metrics: Optional[MetricsRegistry] = None,
+        name: str = "InferenceBatcher"
+    ):
+        """
+        Args:
+            run_batch: (key, observations) -> observation başına sonuç listesi;
+                observations liste veya (submit_batch) N x obs_dim matristir
+            max_batch_size: Tek batch'teki maksimum istek sayısı
+            max_wait_ms: İlk istekten sonra batch doldurmak için bekleme süresi
+            metrics: Opsiyonel metrik kaydı (batch boyutu ve kuyruk bekleme süresi)
+            name: Worker thread ismi
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: "queue.SimpleQueue[Optional[_PendingRequest]]" = queue.SimpleQueue()
+        self._running = True
+
+        self._m_batch_size = None
+        self._m_queue_wait = None
+        if metrics is not None:
+            self._m_batch_size = metrics.histogram(
+                "inference_batch_size", "Inference batch başına istek sayısı",
+                (), BATCH_SIZE_BUCKETS).labels()
+            self._m_queue_wait = metrics.histogram(
+                "queue_wait_seconds", "İsteğin kuyrukta bekleme süresi").labels()
+
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        """Kuyrukta bekleyen istek sayısı (yaklaşık)."""
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        observation: np.ndarray,
+        key: Hashable = None,
+        deadline: Optional[float] = None,
+        trace=None
+    ) -> Future:
+        """
+        İsteği kuyruğa ekle.
+
+        Args:
+            observation: Tek observation vektörü
+            key: Gruplama anahtarı
+            deadline: time.monotonic() cinsinden son tarih (None = yok)
+            trace: Opsiyonel RequestTrace (queue_wait ve forward aşamaları eklenir)
+
+        Returns:
+            Sonucu taşıyan Future
+        """
+        if not self._running:
+            raise RuntimeError("InferenceBatcher is stopped")
+        request = _PendingRequest(observation, key, deadline, trace)
+        self._queue.put(request)
+        return request.future
+
+    def submit_batch(
+        self,
+        observations: np.ndarray,
+        key: Hashable = None,
+        deadline: Optional[float] = None,
+        trace=None
+    ) -> Future:
+        """
+        N x obs_dim matrisi tek istek olarak kuyruğa ekle.
+
+        max_batch_size istek sayısını sınırlar; matris tek istek sayılır
+        ve bölünmez.
+
+        Returns:
+            Satır başına sonuç listesini taşıyan Future
+        """
+        if not self._running:
+            raise RuntimeError("InferenceBatcher is stopped")
+        request = _PendingRequest(observations, key, deadline, trace, num_rows=len(observations))
+        self._queue.put(request)
+        return request.future
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            stop = False
+            wait_until = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = wait_until - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._process(batch)
+            if stop:
+                break
+
+    def _process(self, batch: List[_PendingRequest]) -> None:
+        now = time.monotonic()
+        perf_now = time.perf_counter()
+        groups: Dict[Hashable, List[_PendingRequest]] = {}
+
+        for request in batch:
+            # Client zaten vazgeçtiyse (cancel) atla
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            if request.deadline is not None and now >= request.deadline:
+                request.future.set_exception(DeadlineExceededError("deadline exceeded in queue"))
+                continue
+            if self._m_queue_wait is not None:
+                self._m_queue_wait.observe(now - request.enqueued_at)
+            if request.trace is not None:
+                request.trace.span("queue_wait", perf_now - (now - request.enqueued_at), perf_now)
+            groups.setdefault(request.key, []).append(request)
+
+        for key, requests in groups.items():
+            if len(requests) == 1 and requests[0].num_rows is not None:
+                # Tek packed istek: matris kopyalanmadan geçer
+                observations = requests[0].observation
+            else:
+                observations = []
+                for r in requests:
+                    if r.num_rows is None:
+                        observations.append(r.observation)
+                    else:
+                        observations.extend(r.observation)
+            if self._m_batch_size is not None:
+                self._m_batch_size.observe(len(observations))
+            start = time.perf_counter()
+            try:
+                results = self.run_batch(key, observations)
+            except Exception as e:
+                for r in requests:
+                    r.future.set_exception(e)
+                continue
+            end = time.perf_counter()
+            offset = 0
+            for r in requests:
+                if r.trace is not None:
+                    r.trace.span("forward", start, end)
+                if r.num_rows is None:
+                    r.future.set_result(results[offset])
+                    offset += 1
+                else:
+                    r.future.set_result(results[offset:offset + r.num_rows])
+                    offset += r.num_rows
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Worker thread'i durdur (kuyruktakiler işlenir)."""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
@@ -0,0 +1,92 @@
+"""
+Delta Encoding
+TÜBİTAK İP-2 AI Bot System
+
+StreamActionsDelta için observation delta'ları.
+
+Ardışık tick'ler arasında observation'ın çoğu (takım durumu, cover
+slotları, tier, alarm, alan) değişmez. Client her tick'te sadece değişen
+indeksleri gönderir:
+- changed_mask: obs_dim bitlik little-endian bitmap (bit i = indeks i)
+- values: değişen indekslerin float32 değerleri (little-endian, artan indeks sırasıyla)
+
+Keyframe mesajında values tam obs_dim vektörüdür ve mask kullanılmaz.
+Sunucu delta'yı oturumun cache'lenmiş observation satırına yerinde uygular.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from .packed import OBS_DTYPE
+
+
+class DeltaFormatError(ValueError):
+    """Mask/değer sayısı uyuşmazlığı."""
+
+
+def mask_bytes(obs_dim: int) -> int:
+    """obs_dim bitlik mask'in byte uzunluğu."""
+    return (obs_dim + 7) // 8
+
+
+def encode_delta(previous: np.ndarray, current: np.ndarray, tolerance: float = 0.0) -> Tuple[bytes, bytes]:
+    """
+    İki observation arasındaki farkı kodla (client/test tarafı).
+
+    Args:
+        previous: Sunucunun elindeki son observation
+        current: Yeni observation
+        tolerance: Bu değerden küçük farklar değişmemiş sayılır
+
+    Returns:
+        (changed_mask, values)
+    """
+    changed = np.abs(current - previous) > tolerance
+    mask = np.packbits(changed, bitorder="little").tobytes()
+    values = np.ascontiguousarray(current[changed], dtype=OBS_DTYPE).tobytes()
+    return mask, values
+
+
+def encode_keyframe(observation: np.ndarray) -> bytes:
+    """Keyframe payload'ı (tam observation)."""
+    return np.ascontiguousarray(observation, dtype=OBS_DTYPE).tobytes()
+
+
+def apply_keyframe(row: np.ndarray, values: bytes) -> None:
+    """
+    Keyframe'i satıra yaz.
+
+    Raises:
+        DeltaFormatError: Değer sayısı obs_dim değilse
+    """
+    decoded = np.frombuffer(values, dtype=OBS_DTYPE)
+    if decoded.size != row.size:
+        raise DeltaFormatError(f"Keyframe has {decoded.size} values, expected {row.size}")
+    row[:] = decoded
+
+
+def apply_delta(row: np.ndarray, changed_mask: bytes, values: bytes) -> int:
+    """
+    Delta'yı satıra yerinde uygula.
+
+    Returns:
+        Güncellenen değer sayısı
+
+    Raises:
+        DeltaFormatError: Mask uzunluğu veya değer sayısı uyuşmazsa
+    """
+    if len(changed_mask) != mask_bytes(row.size):
+        raise DeltaFormatError(
+            f"Mask has {len(changed_mask)} bytes, expected {mask_bytes(row.size)} for obs_dim {row.size}"
+        )
+    changed = np.unpackbits(
+        np.frombuffer(changed_mask, dtype=np.uint8), count=row.size, bitorder="little"
+    ).view(np.bool_)
+    decoded = np.frombuffer(values, dtype=OBS_DTYPE)
+    if decoded.size != np.count_nonzero(changed):
+        raise DeltaFormatError(
+            f"Mask marks {np.count_nonzero(changed)} changed values but payload has {decoded.size}"
+        )
+    row[changed] = decoded
+    return decoded.size
@@ -0,0 +1,350 @@
+"""
+Experience Ingestion
+TÜBİTAK İP-2 AI Bot System
+
+Canlı oyundan online deneyim toplama.
+
+- Servis edilen her (observation, aksiyon) bot başına açık trajectory'ye
+  eklenir.
+- SendReward ile gelen RewardSignal'ler bot_id + timestamp ile ilgili
+  adıma bağlanır (timestamp'i <= reward timestamp'i olan son adım).
+- Terminal reward veya EndEpisode ile trajectory kapanır ve sabit
+  kapasiteli ExperienceStore'a yazılır. Store önceden ayrılmış numpy
+  dizileridir; dolunca en eski transition'ların üzerine yazılır.
+
+Learner thread'i read_since() ile yeni transition'ları okur, offline
+kullanım için export() npz dosyası yazar.
+"""
+
+import itertools
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class ExperienceStore:
+    """Sabit bellekli transition ring buffer'ı (en eski önce düşer)."""
+
+    def __init__(self, capacity: int = 100_000, *, obs_dim: int):
+        """
+        Args:
+            capacity: Tutulacak maksimum transition sayısı
+            obs_dim: Observation boyutu (servis edilen agent'ın observation_dim'i;
+                64-dim MockCombatEnv ve 96-dim CALYPSO modelleri farklıdır)
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self.obs_dim = obs_dim
+
+        self.observations = np.zeros((capacity, obs_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.degraded = np.zeros(capacity, dtype=np.bool_)
+        self.episode_ids = np.zeros(capacity, dtype=np.int64)
+
+        self._lock = threading.Lock()
+        # Toplam yazılan transition sayısı (read_since cursor'ı)
+        self._written = 0
+        self._episodes = 0
+
+    def add(
+        self,
+        observations: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        values: np.ndarray,
+        dones: np.ndarray,
+        degraded: np.ndarray,
+        episode_id: int
+    ) -> int:
+        """
+        Trajectory'yi ring buffer'a yaz.
+
+        Returns:
+            Yazılan transition sayısı
+        """
+        n = len(actions)
+        if n == 0:
+            return 0
+        # Kapasiteden uzun trajectory'nin sadece son kısmı sığar
+        if n > self.capacity:
+            observations, actions, rewards = observations[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:]
+            values, dones, degraded = values[-self.capacity:], dones[-self.capacity:], degraded[-self.capacity:]
+            n = self.capacity
+
+        with self._lock:
+            start = self._written % self.capacity
+            first = min(n, self.capacity - start)
+            for dst, src in (
+                (self.observations, observations), (self.actions, actions),
+                (self.rewards, rewards), (self.values, values),
+                (self.dones, dones), (self.degraded, degraded)
+            ):
+                dst[start:start + first] = src[:first]
+                dst[:n - first] = src[first:]
+            self.episode_ids[start:start + first] = episode_id
+            self.episode_ids[:n - first] = episode_id
+            self._written += n
+            self._episodes += 1
+        return n
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    @property
+    def cursor(self) -> int:
+        """Şimdiye kadar yazılan toplam transition sayısı."""
+        return self._written
+
+    def _gather(self, start: int, end: int) -> Dict[str, np.ndarray]:
+        """[start, end) mutlak aralığını kronolojik sırayla kopyala (lock altında)."""
+        idx = np.arange(start, end) % self.capacity
+        return {
+            "observations": self.observations[idx],
+            "actions": self.actions[idx],
+            "rewards": self.rewards[idx],
+            "values": self.values[idx],
+            "dones": self.dones[idx],
+            "degraded": self.degraded[idx],
+            "episode_ids": self.episode_ids[idx]
+        }
+
+    def read_since(self, cursor: int) -> Tuple[Dict[str, np.ndarray], int]:
+        """
+        Cursor'dan sonra yazılan transition'lar.
+
+        Learner çok geride kalmışsa üzerine yazılmış kısım atlanır.
+
+        Returns:
+            (batch, yeni cursor)
+        """
+        with self._lock:
+            end = self._written
+            start = max(cursor, end - self.capacity)
+            return self._gather(start, end), end
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Buffer'daki tüm transition'lar (eskiden yeniye)."""
+        with self._lock:
+            return self._gather(max(0, self._written - self.capacity), self._written)
+
+    def sample(self, batch_size: int, rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+        """Rastgele transition batch'i."""
+        rng = rng or np.random.default_rng()
+        with self._lock:
+            size = min(self._written, self.capacity)
+            if size == 0:
+                raise ValueError("Experience store is empty")
+            idx = rng.integers(0, size, batch_size)
+            return {
+                "observations": self.observations[idx],
+                "actions": self.actions[idx],
+                "rewards": self.rewards[idx],
+                "values": self.values[idx],
+                "dones": self.dones[idx],
+                "degraded": self.degraded[idx],
+                "episode_ids": self.episode_ids[idx]
+            }
+
+    def export(self, path: str) -> int:
+        """
+        Buffer'ı npz olarak yaz (offline eğitim için).
+
+        Returns:
+            Yazılan transition sayısı
+        """
+        data = self.snapshot()
+        np.savez_compressed(path, **data)
+        return len(data["actions"])
+
+    def get_stats(self) -> Dict:
+        """Store istatistikleri."""
+        return {
+            "size": len(self),
+            "capacity": self.capacity,
+            "written": self._written,
+            "dropped": max(0, self._written - self.capacity),
+            "episodes": self._episodes,
+            "bytes": sum(a.nbytes for a in (
+                self.observations, self.actions, self.rewards, self.values,
+                self.dones, self.degraded, self.episode_ids
+            ))
+        }
+
+
+class _Trajectory:
+    """Bir botun açık episode'u (kapasite ikiye katlanarak büyür)."""
+
+    __slots__ = ("episode_id", "length", "timestamps", "observations", "actions",
+                 "values", "rewards", "degraded", "last_seen")
+
+    def __init__(self, episode_id: int, obs_dim: int, capacity: int):
+        self.episode_id = episode_id
+        self.length = 0
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.observations = np.zeros((capacity, obs_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int32)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.degraded = np.zeros(capacity, dtype=np.bool_)
+        self.last_seen = time.monotonic()
+
+    def grow(self, capacity: int) -> None:
+        for name in ("timestamps", "observations", "actions", "values", "rewards", "degraded"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.length] = old[:self.length]
+            setattr(self, name, new)
+
+
+class ExperienceCollector:
+    """
+    Servis edilen adımları reward'larla birleştirip store'a yazar.
+
+    Inference yolundaki maliyet satır başına bir dict lookup ve bir
+    observation satırı kopyasıdır.
+    """
+
+    def __init__(
+        self,
+        store: ExperienceStore,
+        max_trajectory_length: int = 1024,
+        initial_length: int = 64
+    ):
+        """
+        Args:
+            store: Bitmiş trajectory'lerin yazılacağı store
+            max_trajectory_length: Bu uzunluğa ulaşan trajectory kesilip
+                (done=False) store'a yazılır
+            initial_length: Yeni trajectory için ilk ayrılan adım sayısı
+        """
+        self.store = store
+        self.obs_dim = store.obs_dim
+        self.max_trajectory_length = max_trajectory_length
+        self.initial_length = min(initial_length, max_trajectory_length)
+
+        self._open: Dict[str, _Trajectory] = {}
+        self._lock = threading.Lock()
+        self._episode_ids = itertools.count(1)
+
+        self._steps = 0
+        self._rewards = 0
+        self._unmatched_rewards = 0
+        self._truncated = 0
+
+    def record_step(
+        self,
+        bot_id: str,
+        timestamp: int,
+        observation: np.ndarray,
+        action: int,
+        value: float = 0.0,
+        degraded: bool = False
+    ) -> None:
+        """
+        Servis edilen aksiyonu botun açık trajectory'sine ekle.
+
+        Raises:
+            ValueError: Observation boyutu store'un obs_dim'ine uymuyorsa
+        """
+        if np.size(observation) != self.obs_dim:
+            raise ValueError(
+                f"Observation has {np.size(observation)} values, experience store expects obs_dim {self.obs_dim}"
+            )
+        with self._lock:
+            traj = self._open.get(bot_id)
+            if traj is None:
+                traj = _Trajectory(next(self._episode_ids), self.obs_dim, self.initial_length)
+                self._open[bot_id] = traj
+            elif traj.length == len(traj.actions):
+                traj.grow(min(2 * traj.length, self.max_trajectory_length))
+
+            i = traj.length
+            traj.timestamps[i] = timestamp
+            traj.observations[i] = observation
+            traj.actions[i] = action
+            traj.values[i] = value
+            traj.degraded[i] = degraded
+            traj.length = i + 1
+            traj.last_seen = time.monotonic()
+            self._steps += 1
+
+            if traj.length >= self.max_trajectory_length:
+                # Bitmeyen episode: kesip yaz, aynı bot için yenisi açılır
+                self._truncated += 1
+                self._flush_locked(bot_id, done=False)
+
+    def add_reward(self, bot_id: str, timestamp: int, reward: float, terminal: bool = False) -> bool:
+        """
+        Reward'ı timestamp'e göre ilgili adıma ekle.
+
+        Returns:
+            Eşleşen adım bulunduysa True
+        """
+        with self._lock:
+            traj = self._open.get(bot_id)
+            if traj is None or traj.length == 0:
+                self._unmatched_rewards += 1
+                return False
+
+            if timestamp:
+                i = int(np.searchsorted(traj.timestamps[:traj.length], timestamp, side="right")) - 1
+                if i < 0:
+                    self._unmatched_rewards += 1
+                    return False
+            else:
+                # Timestamp'siz reward son adıma aittir
+                i = traj.length - 1
+            traj.rewards[i] += reward
+            self._rewards += 1
+
+            if terminal:
+                self._flush_locked(bot_id, done=True)
+            return True
+
+    def end_episode(self, bot_id: str, done: bool = True) -> int:
+        """
+        Botun açık trajectory'sini kapat ve store'a yaz.
+
+        Returns:
+            Yazılan transition sayısı
+        """
+        with self._lock:
+            return self._flush_locked(bot_id, done=done)
+
+    def drop(self, bot_id: str) -> None:
+        """Açık trajectory'yi store'a yazmadan bırak."""
+        with self._lock:
+            self._open.pop(bot_id, None)
+
+    def _flush_locked(self, bot_id: str, done: bool) -> int:
+        traj = self._open.pop(bot_id, None)
+        if traj is None or traj.length == 0:
+            return 0
+        n = traj.length
+        dones = np.zeros(n, dtype=np.bool_)
+        dones[-1] = done
+        return self.store.add(
+            traj.observations[:n], traj.actions[:n], traj.rewards[:n],
+            traj.values[:n], dones, traj.degraded[:n], traj.episode_id
+        )
+
+    @property
+    def open_trajectories(self) -> int:
+        return len(self._open)
+
+    def get_stats(self) -> Dict:
+        """Collector + store istatistikleri."""
+        return {
+            "open_trajectories": len(self._open),
+            "steps": self._steps,
+            "rewards": self._rewards,
+            "unmatched_rewards": self._unmatched_rewards,
+            "truncated": self._truncated,
+            "store": self.store.get_stats()
+        }
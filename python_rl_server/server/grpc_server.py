@@ -5,11 +5,14 @@ TÜBİTAK İP-2 AI Bot System
 Unreal Engine ile iletişim için gRPC server.
 """
 
+import functools
 import os
 import sys
 import time
 from concurrent import futures
-from typing import Dict, Optional
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
 import threading
 
 import grpc
@@ -19,9 +22,26 @@ import numpy as np
 # from . import bot_service_pb2
 # from . import bot_service_pb2_grpc
 
-from ..agents import PPOAgent, RuleBasedAgent, BaseAgent
+from ..agents import RuleBasedAgent, RuleDecisionTable, NumpyPolicyAgent, BaseAgent, info_rows
 from ..difficulty import DifficultyManager
-from ..environments import ObservationBuilder
+from .metrics import (
+    MetricsRegistry, MetricsHTTPServer, BATCH_SIZE_BUCKETS, QUEUE_DEPTH_BUCKETS
+)
+from .action_cache import ActionCache
+from .model_slots import ModelSlots, check_compatible
+from .model_pool import ModelPool
+from .telemetry import ResourceSampler
+from .state_codec import game_state_to_observation, layout_for, layout_projection
+from .warmup import DEFAULT_WARMUP_BATCH_SIZES, warm_up_agent
+from .tracing import Tracer
+from .experience import ExperienceCollector, ExperienceStore
+from .sessions import SessionTable
+from .delta import DeltaFormatError
+from .batching import InferenceBatcher, DeadlineExceededError
+from .packed import (
+    PACKED_SCHEMA_VERSION, PackedFormatError,
+    unpack_observations, pack_actions, validate_bot_ids
+)
 
 
 class BotAIServicer:
@@ -30,25 +50,182 @@ class BotAIServicer:
 
     Not: Proto dosyaları compile edilmeden önce bu class
     bot_service_pb2_grpc.BotAIServiceServicer'ı inherit etmeli.
+
+    Her istek bir deadline ile işlenir (inference_timeout_ms ve/veya gRPC
+    deadline'ı). Deadline tutturulamayacaksa veya batch kuyruğu çok
+    doluysa cevap çok daha ucuz olan fallback agent'tan (RuleBasedAgent)
+    verilir ve response "degraded" olarak işaretlenir.
+
+    GameState yerleşimi ve aksiyon isimleri agent'ın observation_dim /
+    action_dim'inden gelir (64-dim combat veya 96-dim CALYPSO). Fallback
+    agent farklı boyuttaysa (96-dim model + 64-dim RuleBasedAgent)
+    observation'lar standart alanlara indirgenir ve aksiyonları isimle
+    servis edilen modelin aksiyon uzayına çevrilir.
     """
 
+    # Primary inference süresi tahmini için EWMA katsayısı
+    COST_EWMA_ALPHA = 0.1
+
     def __init__(
         self,
         agent: BaseAgent,
-        difficulty_manager: Optional[DifficultyManager] = None
+        difficulty_manager: Optional[DifficultyManager] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        fallback_agent: Optional[BaseAgent] = None,
+        inference_timeout_ms: Optional[float] = 100.0,
+        batch_inference: bool = False,
+        max_batch_size: int = 32,
+        max_batch_wait_ms: float = 1.0,
+        max_queue_depth: int = 256,
+        action_cache: Optional[ActionCache] = None,
+        model_slots: Optional[ModelSlots] = None,
+        model_pool: Optional[ModelPool] = None,
+        tracer: Optional[Tracer] = None,
+        experience: Optional[ExperienceCollector] = None,
+        sessions: Optional[SessionTable] = None,
+        delta_keyframe_interval: int = 300
     ):
         """
         Args:
             agent: RL veya Rule-based agent
             difficulty_manager: Opsiyonel DDA manager
+            metrics: Metrik kaydı (None ise yeni registry oluşturulur)
+            fallback_agent: Deadline/kuyruk taşmasında kullanılacak agent
+                (None ise RuleBasedAgent)
+            inference_timeout_ms: İstek başına inference bütçesi (None = sınırsız)
+            batch_inference: True ise istekler InferenceBatcher kuyruğundan geçer
+            max_batch_size: Batch başına maksimum istek
+            max_batch_wait_ms: Batch doldurmak için maksimum bekleme
+            max_queue_depth: Bu derinliğin üstünde istekler direkt fallback'e gider
+            action_cache: Opsiyonel quantize observation -> aksiyon cache'i
+            model_slots: Hot-swap model slotları (None ise agent ile oluşturulur)
+            model_pool: Opsiyonel zorluk seviyesi bazlı model havuzu; oyuncunun
+                seviyesine ait model hazır değilse agent kullanılır
+            tracer: Örneklemeli aşama tracing'i (None = kapalı tracer)
+            experience: Servis edilen adımları reward'larla birleştiren
+                collector (None = deneyim toplanmaz)
+            sessions: bot_id başına oturum tablosu (None = varsayılan tablo)
+            delta_keyframe_interval: Delta stream'de bu kadar delta'dan sonra
+                client'tan keyframe istenir (drift'i toparlamak için)
+
+        Raises:
+            ValueError: agent'ın observation_dim'i için GameState yerleşimi
+                yoksa veya fallback agent'ın aksiyonları agent'ın aksiyon
+                uzayına çevrilemiyorsa
         """
-        self.agent = agent
+        self._layout = layout_for(agent.observation_dim)
+        self.model_slots = model_slots or ModelSlots(agent)
+        self.model_slots.add_swap_listener(self.on_model_loaded)
         self.difficulty_manager = difficulty_manager or DifficultyManager()
-        self._obs_builder = ObservationBuilder()
+        self.fallback_agent = fallback_agent or RuleBasedAgent()
+        self._init_fallback_mapping(agent)
+
+        self.inference_timeout = (inference_timeout_ms / 1000.0
+                                  if inference_timeout_ms is not None else None)
+        self.max_queue_depth = max_queue_depth
+
+        # Primary agent'ın tahmini çağrı maliyeti (saniye, EWMA)
+        self._cost_estimate = 0.0
+
+        self.action_cache = action_cache
+        self.model_pool = model_pool
+        if model_pool is not None:
+            # Seviye modelleri aktif modelle aynı observation/aksiyon uzayında olmalı
+            model_pool.validate = functools.partial(check_compatible, agent)
+        self.tracer = tracer or Tracer(sample_rate=0.0)
+        self.experience = experience
+        self.sessions = sessions if sessions is not None else SessionTable(obs_dim=agent.observation_dim)
+        self.delta_keyframe_interval = delta_keyframe_interval
+        if experience is not None:
+            # Düşürülen oturumun açık episode'u kesik olarak store'a yazılır
+            self.sessions.add_evict_listener(lambda bot_id: experience.end_episode(bot_id, done=False))
 
         # Stats
-        self._request_count = 0
-        self._total_inference_time = 0.0
+        self.metrics = metrics or MetricsRegistry()
+        self._init_metrics()
+
+        self.batcher: Optional[InferenceBatcher] = None
+        if batch_inference:
+            self.batcher = InferenceBatcher(
+                self._run_primary,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_batch_wait_ms,
+                metrics=self.metrics
+            )
+
+    def _init_fallback_mapping(self, agent: BaseAgent) -> None:
+        """Fallback agent'ın observation indekslerini ve aksiyon tablosunu hazırla."""
+        self._fallback_projection: Optional[np.ndarray] = None
+        self._fallback_actions: Optional[np.ndarray] = None
+        fallback = self.fallback_agent
+        if fallback.observation_dim != agent.observation_dim:
+            self._fallback_projection = layout_projection(
+                self._layout, layout_for(fallback.observation_dim))
+
+        names = [agent.get_action_name(a) for a in range(agent.action_dim)]
+        fallback_names = [fallback.get_action_name(a) for a in range(fallback.action_dim)]
+        if fallback_names != names[:len(fallback_names)]:
+            missing = [name for name in fallback_names if name not in names]
+            if missing:
+                raise ValueError(
+                    f"Fallback agent actions {missing} not in {agent.name} action space"
+                )
+            self._fallback_actions = np.array([names.index(name) for name in fallback_names])
+
+    @property
+    def agent(self) -> BaseAgent:
+        """Aktif primary agent (LoadModel ile atomik olarak değişebilir)."""
+        return self.model_slots.active
+
+    @property
+    def model_version(self) -> int:
+        """Aktif model versiyonu (cache anahtarına girer)."""
+        return self.model_slots.version
+
+    def _init_metrics(self) -> None:
+        """Servicer metriklerini kaydet."""
+        m = self.metrics
+        self._m_requests = m.counter(
+            "rpc_requests_total", "Toplam RPC sayısı", ("rpc", "agent"))
+        self._m_rpc_latency = m.histogram(
+            "rpc_latency_seconds", "RPC başına uçtan uca gecikme", ("rpc", "agent"))
+        self._m_inference = m.histogram(
+            "inference_seconds", "Karar başına inference süresi", ("agent",))
+        self._m_actions = m.counter(
+            "actions_total", "Seçilen aksiyon sayısı", ("action", "agent"))
+        self._m_batch_size = m.histogram(
+            "batch_size", "Batch RPC başına bot sayısı", (), BATCH_SIZE_BUCKETS)
+        self._m_queue_depth = m.histogram(
+            "queue_depth", "İstek geldiğinde bekleyen inference sayısı",
+            (), QUEUE_DEPTH_BUCKETS)
+        self._m_inflight = m.gauge(
+            "inflight_requests", "İşlenmekte olan RPC sayısı").labels()
+        self._m_fallback = m.counter(
+            "fallback_total", "Fallback agent'tan verilen karar sayısı", ("reason",))
+        self._m_delta_resyncs = m.counter(
+            "delta_resyncs_total", "Delta stream'de keyframe beklenirken gelen mesaj sayısı").labels()
+
+        if self.action_cache is not None:
+            cache = self.action_cache
+            m.gauge("action_cache_hits", "Action cache hit sayısı").set_function(
+                lambda: cache.get_stats()["hits"])
+            m.gauge("action_cache_misses", "Action cache miss sayısı").set_function(
+                lambda: cache.get_stats()["misses"])
+            m.gauge("action_cache_hit_ratio", "Action cache hit oranı").set_function(
+                lambda: cache.hit_ratio)
+            m.gauge("action_cache_entries", "Action cache kayıt sayısı").set_function(
+                lambda: len(cache))
+            m.gauge("action_cache_bytes", "Action cache tahmini bellek kullanımı").set_function(
+                lambda: cache.memory_bytes)
+
+        if self.model_pool is not None:
+            pool = self.model_pool
+            m.gauge("model_pool_models", "Bellekteki seviye modeli sayısı").set_function(
+                lambda: len(pool))
+            m.gauge("model_pool_bytes", "Model havuzu tahmini bellek kullanımı").set_function(
+                lambda: pool.total_bytes)
+            m.gauge("model_pool_evictions", "Model havuzu LRU eviction sayısı").set_function(
+                lambda: pool.get_stats()["evictions"])
 
     def GetAction(self, request, context):
         """
@@ -56,15 +233,179 @@ class BotAIServicer:
 
         Proto compile edildikten sonra aktif olacak.
         """
-        start_time = time.time()
-        self._request_count += 1
+        with self._rpc("GetAction") as trace:
+            return self._get_actions([request], context, trace)[0]
+
+    def GetActionsBatch(self, request, context):
+        """Batch aksiyon - birden fazla bot."""
+        with self._rpc("GetActionsBatch") as trace:
+            self._m_batch_size.observe(len(request.states))
+            return {"actions": self._get_actions(list(request.states), context, trace)}
+
+    def StreamActions(self, request_iterator, context):
+        """Bidirectional stream - her GameState için bir BotAction."""
+        for state in request_iterator:
+            with self._rpc("StreamActions") as trace:
+                response = self._get_actions([state], context, trace)[0]
+            yield response
+
+    def StreamActionsDelta(self, request_iterator, context):
+        """
+        Delta kodlu stream - client sadece değişen observation değerlerini
+        gönderir, oturumun cache'lenmiş satırı yerinde güncellenir.
+
+        Oturumda keyframe yoksa, payload bozuksa veya keyframe aralığı
+        dolduysa cevapta keyframe_required=True döner.
+        """
+        for message in request_iterator:
+            with self._rpc("StreamActionsDelta") as trace:
+                response = self._get_delta_action(message, context, trace)
+            yield response
+
+    def _get_delta_action(self, message, context, trace=None) -> Dict:
+        decode_start = time.perf_counter()
+        bot_id = getattr(message, 'bot_id', '')
+        try:
+            observation, age = self.sessions.patch_observation(
+                bot_id, message.keyframe, message.changed_mask, message.values
+            )
+        except DeltaFormatError as e:
+            print(f"[BotAIServicer] Bad delta from {bot_id}: {e}")
+            observation, age = None, -1
+        if trace is not None:
+            trace.span("decode", decode_start)
+
+        if observation is None:
+            # Cache'te geçerli satır yok: tahmin yapılmaz, keyframe istenir
+            self._m_delta_resyncs.inc()
+            return {
+                "bot_id": bot_id,
+                "action_type": 0,
+                "action_name": self.agent.get_action_name(0),
+                "confidence": 0.0,
+                "utility_scores": {},
+                "degraded": True,
+                "degraded_reason": "keyframe_required",
+                "keyframe_required": True
+            }
+
+        response = self._get_actions([message], context, trace, observations=[observation])[0]
+        response["keyframe_required"] = age >= self.delta_keyframe_interval
+        return response
+
+    def GetActionsPacked(self, request, context):
+        """
+        Packed tensor batch aksiyon.
 
+        Observation payload'ı kopyalanmadan numpy view olarak okunur ve
+        matris olarak (batch modunda tek batcher isteği) inference'a gider;
+        aksiyonlar int8 dizisi olarak döner. Oturum ve deneyim kaydı
+        GetActionsBatch ile aynıdır (zaman damgası request.timestamp).
+        """
+        with self._rpc("GetActionsPacked") as trace:
+            decode_start = time.perf_counter()
+            try:
+                num_rows = int(request.num_rows)
+                obs_dim = int(request.obs_dim)
+                if obs_dim != self.agent.observation_dim:
+                    raise PackedFormatError(
+                        f"obs_dim {obs_dim} does not match agent observation_dim "
+                        f"{self.agent.observation_dim}"
+                    )
+                observations = unpack_observations(
+                    request.observations, num_rows, obs_dim,
+                    schema_version=int(request.schema_version)
+                )
+                bot_ids = validate_bot_ids(request.bot_ids, num_rows)
+            except PackedFormatError as e:
+                _abort(context, grpc.StatusCode.INVALID_ARGUMENT, str(e))
+                raise
+
+            self._m_batch_size.observe(num_rows)
+            return_confidences = bool(getattr(request, 'return_confidences', False))
+            deterministic = self._packed_deterministic(request)
+
+            # Packed istekte tüm satırlar aynı oyuncunun maçına aittir
+            model_key = self._route(getattr(request, 'player_id', ''))
+            self._touch_sessions(bot_ids)
+            if trace is not None:
+                trace.num_rows = num_rows
+                trace.span("decode", decode_start)
+
+            results = self._infer(observations, deterministic, context,
+                                  [model_key] * num_rows, trace)
+
+            encode_start = time.perf_counter()
+            actions = np.empty(num_rows, dtype=np.int8)
+            degraded = np.zeros(num_rows, dtype=np.uint8)
+            confidences = np.empty(num_rows, dtype=np.float32) if return_confidences else None
+            for i, (action, info, reason) in enumerate(results):
+                actions[i] = action
+                degraded[i] = reason is not None
+                if confidences is not None:
+                    confidences[i] = info.get("value_estimate", 0.0)
+
+            action_bytes, confidence_bytes = pack_actions(actions, confidences)
+            if trace is not None:
+                trace.span("encode", encode_start)
+
+            timestamp = int(getattr(request, 'timestamp', 0))
+            self._record_experience(bot_ids, [timestamp] * num_rows, observations, results)
+
+            return {
+                "schema_version": PACKED_SCHEMA_VERSION,
+                "num_rows": num_rows,
+                "bot_ids": bot_ids,
+                "actions": action_bytes,
+                "confidences": confidence_bytes,
+                "degraded": degraded.tobytes(),
+                "timestamp": int(time.time() * 1000)
+            }
+
+    @contextmanager
+    def _rpc(self, rpc_name: str):
+        """
+        RPC seviyesi metrikler (latency, in-flight, kuyruk derinliği).
+
+        Yields:
+            İstek örneklendiyse RequestTrace, değilse None
+        """
+        start_time = time.perf_counter()
+        agent_label = self.agent.name
+        trace = self.tracer.start(rpc_name)
+        self._m_queue_depth.observe(self._queue_depth())
+        self._m_inflight.inc()
+        try:
+            yield trace
+        finally:
+            self._m_inflight.dec()
+            self._m_requests.labels(rpc_name, agent_label).inc()
+            self._m_rpc_latency.labels(rpc_name, agent_label).observe(
+                time.perf_counter() - start_time)
+            if trace is not None:
+                self.tracer.finish(trace)
+
+    def _get_actions(self, states, context, trace=None, observations=None) -> list:
+        """
+        GameState listesi -> aksiyon dict listesi.
+
+        observations verilirse (delta stream) state'ler sadece bot_id/
+        player_id/timestamp için kullanılır.
+        """
+        decode_start = time.perf_counter()
+        self._touch_sessions([getattr(state, 'bot_id', '') for state in states])
         # GameState'i observation array'e çevir
-        observation = self._game_state_to_observation(request)
+        if observations is None:
+            observations = [self._game_state_to_observation(state) for state in states]
+        model_keys = [self._route(getattr(state, 'player_id', '')) for state in states]
+        if trace is not None:
+            trace.num_rows = len(states)
+            trace.span("decode", decode_start)
 
-        # Agent'tan aksiyon al
         deterministic = not self.agent.is_training
-        action, info = self.agent.select_action(observation, deterministic=deterministic)
+        results = self._infer(observations, deterministic, context, model_keys, trace)
+
+        encode_start = time.perf_counter()
 
         # Response oluştur (proto compile edildikten sonra)
         # response = bot_service_pb2.BotAction(
@@ -74,67 +415,414 @@ class BotAIServicer:
         #     confidence=info.get("value_estimate", 0.0)
         # )
 
-        self._total_inference_time += time.time() - start_time
-
         # Şimdilik dict döndür
-        return {
-            "bot_id": getattr(request, 'bot_id', 'test'),
-            "action_type": action,
-            "action_name": self.agent.get_action_name(action),
-            "confidence": info.get("value_estimate", 0.0),
-            "utility_scores": {k: v for k, v in info.items() if k.startswith("prob_") or k.startswith("utility_")}
-        }
+        responses = []
+        for state, (action, info, reason) in zip(states, results):
+            responses.append({
+                "bot_id": getattr(state, 'bot_id', 'test'),
+                "action_type": action,
+                "action_name": self.agent.get_action_name(action),
+                "confidence": info.get("value_estimate", 0.0),
+                "utility_scores": {k: v for k, v in info.items() if k.startswith("prob_") or k.startswith("utility_")},
+                "degraded": reason is not None,
+                "degraded_reason": reason or ""
+            })
+        if trace is not None:
+            trace.span("encode", encode_start)
+
+        self._record_experience(
+            [getattr(state, 'bot_id', '') for state in states],
+            [getattr(state, 'timestamp', 0) for state in states],
+            observations, results
+        )
+        return responses
+
+    def _touch_sessions(self, bot_ids: Sequence[str]) -> None:
+        """Botların oturum adımlarını kaydet."""
+        for bot_id in bot_ids:
+            self.sessions.touch(bot_id)
+
+    def _record_experience(self, bot_ids, timestamps, observations, results) -> None:
+        """Servis edilen aksiyonları botların açık trajectory'lerine ekle."""
+        if self.experience is None:
+            return
+        for bot_id, timestamp, obs, (action, info, reason) in zip(bot_ids, timestamps, observations, results):
+            self.experience.record_step(
+                bot_id, timestamp, obs, action, info.get("value_estimate", 0.0), reason is not None
+            )
+
+    def _packed_deterministic(self, request) -> bool:
+        """
+        Packed isteğin deterministic değeri.
 
-    def GetActionsBatch(self, request, context):
-        """Batch aksiyon - birden fazla bot."""
-        actions = []
-        for state in request.states:
-            action = self.GetAction(state, context)
-            actions.append(action)
-        return {"actions": actions}
+        Alan proto3 optional'dır: istemci açıkça vermediyse GetAction ile
+        aynı varsayılan (eğitimde değilse deterministic) kullanılır.
+        """
+        default = not self.agent.is_training
+        has_field = getattr(request, 'HasField', None)
+        if has_field is not None:
+            return bool(request.deterministic) if has_field('deterministic') else default
+        return bool(getattr(request, 'deterministic', default))
+
+    def _route(self, player_id: str) -> Optional[str]:
+        """Oyuncunun zorluk seviyesine ait hazır modelin anahtarı (None = varsayılan agent)."""
+        if self.model_pool is None or not player_id:
+            return None
+        return self.model_pool.route(self.difficulty_manager.get_difficulty_level(player_id))
+
+    @contextmanager
+    def _acquire_agent(self, model_key: Optional[str]):
+        """Model anahtarına ait agent; havuzda yoksa aktif slot."""
+        agent = None
+        if model_key is not None and self.model_pool is not None:
+            agent = self.model_pool.get_loaded(model_key)
+        if agent is not None:
+            yield agent
+            return
+        # Swap olursa eski slot bu batch bitene kadar yaşar
+        with self.model_slots.acquire() as agent:
+            yield agent
+
+    def _queue_depth(self) -> int:
+        """Bekleyen inference sayısı (batcher kuyruğu veya in-flight RPC)."""
+        if self.batcher is not None:
+            return self.batcher.depth
+        return int(self._m_inflight.value)
+
+    def _request_deadline(self, context) -> Optional[float]:
+        """inference_timeout ve gRPC deadline'ından küçük olanı (monotonic)."""
+        budget = self.inference_timeout
+        if context is not None and hasattr(context, "time_remaining"):
+            remaining = context.time_remaining()
+            if remaining is not None:
+                budget = remaining if budget is None else min(budget, remaining)
+        if budget is None:
+            return None
+        return time.monotonic() + budget
+
+    def _infer(
+        self,
+        observations: List[np.ndarray],
+        deterministic: bool,
+        context,
+        model_keys: Optional[List[Optional[str]]] = None,
+        trace=None
+    ) -> List[Tuple[int, Dict, Optional[str]]]:
+        """
+        Cache + deadline'a uyarak inference yap.
+
+        Args:
+            observations: Observation listesi veya N x obs_dim matris (packed)
+            model_keys: Satır başına model havuzu anahtarı (None = aktif agent)
+            trace: Opsiyonel RequestTrace
+
+        Returns:
+            Observation başına (action, info, degraded_reason) -
+            degraded_reason None ise primary agent (veya cache) cevap verdi
+        """
+        if model_keys is None:
+            model_keys = [None] * len(observations)
+
+        cache = self.action_cache
+        if cache is None:
+            return self._infer_uncached(observations, deterministic, context, model_keys, trace)
+
+        model_version = self.model_version
+        keys = [cache.make_key(obs, (model_key, model_version), deterministic)
+                for obs, model_key in zip(observations, model_keys)]
+        results: List[Optional[Tuple[int, Dict, Optional[str]]]] = [None] * len(observations)
+        misses = []
+        for i, key in enumerate(keys):
+            hit = cache.get(key)
+            if hit is None:
+                misses.append(i)
+            else:
+                results[i] = (hit[0], hit[1], None)
+
+        if misses:
+            computed = self._infer_uncached(
+                observations if len(misses) == len(observations) else [observations[i] for i in misses],
+                deterministic, context, [model_keys[i] for i in misses], trace
+            )
+            for i, result in zip(misses, computed):
+                results[i] = result
+                # Sadece primary agent sonuçları cache'lenir
+                if result[2] is None:
+                    cache.put(keys[i], result[0], result[1])
+
+        return results
+
+    def _infer_uncached(
+        self,
+        observations: List[np.ndarray],
+        deterministic: bool,
+        context,
+        model_keys: List[Optional[str]],
+        trace=None
+    ) -> List[Tuple[int, Dict, Optional[str]]]:
+        """Deadline'a uyarak primary veya fallback agent ile inference."""
+        deadline = self._request_deadline(context)
+
+        if self.batcher is not None and self.batcher.depth >= self.max_queue_depth:
+            return self._fallback(observations, "queue_full", trace)
+
+        if deadline is not None:
+            # Batch'te tek çağrı, direkt modda model grubu başına bir çağrı
+            calls = 1 if self.batcher is not None else len(set(model_keys))
+            if deadline - time.monotonic() < self._cost_estimate * calls:
+                return self._deadline_fallback(observations, trace)
+
+        if self.batcher is not None:
+            return self._infer_batched(observations, deterministic, deadline, model_keys, trace)
+        return self._infer_direct(observations, deterministic, deadline, model_keys, trace)
+
+    def _infer_batched(self, observations, deterministic, deadline, model_keys, trace=None):
+        if isinstance(observations, np.ndarray) and len(set(model_keys)) == 1:
+            # Packed matris tek batcher isteği olarak gider
+            future = self.batcher.submit_batch(observations, key=(model_keys[0], deterministic),
+                                               deadline=deadline, trace=trace)
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                return [(action, info, None) for action, info in future.result(timeout=timeout)]
+            except (FutureTimeoutError, DeadlineExceededError):
+                future.cancel()
+                return self._fallback(observations, "timeout", trace)
+
+        # Aynı modeli kullanan istekler batcher'da aynı gruba düşer
+        pending = [self.batcher.submit(obs, key=(model_key, deterministic),
+                                       deadline=deadline, trace=trace)
+                   for obs, model_key in zip(observations, model_keys)]
+
+        results = []
+        for obs, future in zip(observations, pending):
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                action, info = future.result(timeout=timeout)
+                results.append((action, info, None))
+            except (FutureTimeoutError, DeadlineExceededError):
+                future.cancel()
+                results.extend(self._fallback([obs], "timeout", trace))
+        return results
+
+    def _infer_direct(self, observations, deterministic, deadline, model_keys, trace=None):
+        """
+        Batcher olmadan inference: aynı modele giden satırlar tek
+        _run_primary (select_actions) çağrısında hesaplanır. Deadline'a
+        yetişemeyecek gruplar fallback agent'a düşer.
+        """
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, model_key in enumerate(model_keys):
+            groups.setdefault(model_key, []).append(i)
+
+        results: List[Optional[Tuple[int, Dict, Optional[str]]]] = [None] * len(observations)
+        for model_key, rows in groups.items():
+            batch = observations if len(groups) == 1 else [observations[i] for i in rows]
+            if deadline is not None and deadline - time.monotonic() < self._cost_estimate:
+                group_results = self._deadline_fallback(batch, trace)
+            else:
+                forward_start = time.perf_counter()
+                group_results = [(action, info, None) for action, info
+                                 in self._run_primary((model_key, deterministic), batch)]
+                if trace is not None:
+                    trace.span("forward", forward_start)
+            for i, result in zip(rows, group_results):
+                results[i] = result
+        return results
+
+    def _run_primary(
+        self,
+        key: Tuple[Optional[str], bool],
+        observations: List[np.ndarray]
+    ) -> List[Tuple[int, Dict]]:
+        """
+        Primary agent ile inference (batcher worker'ı da bunu çağırır).
+
+        Args:
+            key: (model havuzu anahtarı, deterministic)
+            observations: Observation listesi veya N x obs_dim matris
+        """
+        model_key, deterministic = key
+        # Batch boyunca aynı model kullanılır
+        with self._acquire_agent(model_key) as agent:
+            start_time = time.perf_counter()
+            agent_label = agent.name
+
+            # Batch tek select_actions çağrısıyla hesaplanır
+            batch = observations if isinstance(observations, np.ndarray) else np.stack(observations)
+            actions, info = agent.select_actions(batch, deterministic=deterministic)
+
+            elapsed = time.perf_counter() - start_time
+            self._cost_estimate += self.COST_EWMA_ALPHA * (elapsed - self._cost_estimate)
+
+            per_decision = elapsed / max(len(observations), 1)
+            inference = self._m_inference.labels(agent_label)
+            for _ in range(len(observations)):
+                inference.observe(per_decision)
+            self._count_actions(agent, actions)
+        return list(zip(actions.tolist(), info_rows(info, len(observations))))
+
+    def _count_actions(self, agent: BaseAgent, actions: np.ndarray) -> None:
+        """Aksiyon sayaçlarını batch başına bir kez güncelle."""
+        for action, count in enumerate(np.bincount(actions)):
+            if count:
+                self._m_actions.labels(agent.get_action_name(action), agent.name).inc(count)
+
+    def _deadline_fallback(self, observations, trace=None) -> List[Tuple[int, Dict, str]]:
+        """
+        Maliyet tahmini bütçeyi aştığı için fallback.
+
+        Tahmin sadece primary çağrılarında güncellenir; primary atlandığında
+        da kendiliğinden düşemez. Bu yüzden her deadline fallback'inde
+        sönümlenir: tek seferlik bir gecikme sıçramasından (ör. GC) sonra
+        primary birkaç istek içinde tekrar denenir, hâlâ yavaşsa tahmin
+        ilk çağrıda yeniden yükselir.
+        """
+        self._cost_estimate *= 1.0 - self.COST_EWMA_ALPHA
+        return self._fallback(observations, "deadline", trace)
+
+    def _fallback(
+        self,
+        observations: List[np.ndarray],
+        reason: str,
+        trace=None
+    ) -> List[Tuple[int, Dict, str]]:
+        """Fallback agent ile ucuz karar."""
+        start = time.perf_counter()
+        self._m_fallback.labels(reason).inc(len(observations))
+
+        batch = np.stack(observations)
+        if self._fallback_projection is not None:
+            batch = batch[:, self._fallback_projection]
+        actions, info = self.fallback_agent.select_actions(batch, deterministic=True)
+        self._count_actions(self.fallback_agent, actions)
+        if self._fallback_actions is not None:
+            actions = self._fallback_actions[actions]
+        results = [(action, row, reason)
+                   for action, row in zip(actions.tolist(), info_rows(info, len(observations)))]
+        if trace is not None:
+            trace.span(f"fallback:{reason}", start)
+        return results
+
+    def warm_up(
+        self,
+        batch_sizes: Sequence[int] = DEFAULT_WARMUP_BATCH_SIZES,
+        iterations: int = 3
+    ) -> Dict[str, Dict[int, float]]:
+        """
+        Bellekteki tüm modelleri beklenen batch boyutlarında ısıt.
+
+        Metriklere yazılmaz; sadece deadline için maliyet tahmini
+        (tek satırlık çağrı süresi) ile başlatılır.
+
+        Returns:
+            Model -> (batch boyutu -> süre)
+        """
+        agents = {"active": self.model_slots.active}
+        if self.model_pool is not None:
+            agents.update(self.model_pool.loaded_agents())
+
+        report = {}
+        for key, agent in agents.items():
+            report[key] = warm_up_agent(agent, batch_sizes, iterations)
+
+        single = report["active"].get(1)
+        if single is not None:
+            self._cost_estimate = single
+        return report
+
+    def on_model_loaded(self, version: int) -> None:
+        """Yeni model aktif oldu - eski versiyonun cache kayıtlarını at."""
+        if self.action_cache is not None:
+            self.action_cache.invalidate()
 
     def SendReward(self, request, context):
-        """Reward sinyali al (training mode)."""
-        # Training mode'da reward'ı agent'a ilet
+        """Reward sinyalini botun açık trajectory'sine bağla."""
+        if self.experience is not None:
+            matched = self.experience.add_reward(
+                request.bot_id, getattr(request, 'timestamp', 0),
+                request.total_reward, getattr(request, 'is_terminal', False)
+            )
+            if not matched:
+                return {"success": False, "message": "No served step for reward"}
         return {"success": True, "message": "Reward received"}
 
     def EndEpisode(self, request, context):
-        """Episode sonu."""
-        self.agent.reset()
-        return {"success": True, "message": "Episode ended"}
+        """Episode sonu (sadece ilgili botun oturumu sıfırlanır)."""
+        if self.experience is not None:
+            self.experience.end_episode(request.bot_id)
+        episode = self.sessions.end_episode(request.bot_id)
+        return {"success": True, "message": f"Episode {episode} ended"}
 
     def _game_state_to_observation(self, game_state) -> np.ndarray:
-        """GameState proto'yu 64-dim observation'a çevir."""
-        # Proto compile edilince gerçek dönüşüm yapılacak
-        # Şimdilik mock
+        """GameState proto'yu agent'ın observation yerleşimine (64/96-dim) çevir."""
         if hasattr(game_state, 'self_state'):
-            # Gerçek proto
-            pass
-        else:
-            # Mock/test için random observation
-            return np.random.rand(64).astype(np.float32)
+            return game_state_to_observation(game_state, layout=self._layout)
 
-        return self._obs_builder.build()
+        # Mock/test için random observation
+        return np.random.rand(self._layout.observation_dim).astype(np.float32)
 
     def get_stats(self) -> Dict:
         """Server istatistikleri."""
-        avg_time = (self._total_inference_time / self._request_count
-                    if self._request_count > 0 else 0)
+        inference = self._m_inference.labels(self.agent.name)
+        counts, total, count = inference.snapshot()
+        avg_time = total / count if count > 0 else 0
+        fallback_count = int(sum(child.value for _, child in self._m_fallback.children()))
+        decisions = count + fallback_count
         return {
-            "request_count": self._request_count,
+            "request_count": decisions,
             "avg_inference_time_ms": avg_time * 1000,
-            "total_inference_time_s": self._total_inference_time
+            "total_inference_time_s": total,
+            "p50_inference_time_ms": inference.quantile(0.50) * 1000,
+            "p95_inference_time_ms": inference.quantile(0.95) * 1000,
+            "p99_inference_time_ms": inference.quantile(0.99) * 1000,
+            "fallback_count": fallback_count,
+            "fallback_rate": fallback_count / decisions if decisions > 0 else 0.0,
+            "queue_depth": self._queue_depth(),
+            "model_version": self.model_version,
+            "model_slots": self.model_slots.get_stats(),
+            "model_pool": self.model_pool.get_stats() if self.model_pool is not None else None,
+            "action_cache": self.action_cache.get_stats() if self.action_cache is not None else None,
+            "experience": self.experience.get_stats() if self.experience is not None else None,
+            "sessions": self.sessions.get_stats()
         }
 
+    def stop(self) -> None:
+        """Arka plan kaynaklarını kapat."""
+        if self.batcher is not None:
+            self.batcher.stop()
+
+
+def _abort(context, code, message: str) -> None:
+    """gRPC context varsa isteği status code ile sonlandır."""
+    if context is not None and hasattr(context, "abort"):
+        context.abort(code, message)
+
 
 class TrainingServicer:
     """Training servisi implementasyonu."""
 
-    def __init__(self, agent: BaseAgent):
-        self.agent = agent
+    def __init__(
+        self,
+        agent: BaseAgent,
+        model_slots: Optional[ModelSlots] = None
+    ):
+        """
+        Args:
+            agent: Eğitilen/servis edilen agent
+            model_slots: Verilirse LoadModel modeli arka planda yükleyip
+                atomik olarak swap eder (serving trafiği bloklanmaz)
+        """
+        self._agent = agent
+        self.model_slots = model_slots
         self._is_training = False
         self._training_thread: Optional[threading.Thread] = None
 
+    @property
+    def agent(self) -> BaseAgent:
+        if self.model_slots is not None:
+            return self.model_slots.active
+        return self._agent
+
     def StartTraining(self, request, context):
         """Training başlat."""
         if self._is_training:
@@ -155,10 +843,14 @@ class TrainingServicer:
 
     def GetTrainingStatus(self, request, context):
         """Training durumu."""
-        return {
+        status = {
             "is_training": self._is_training,
             "status_message": "Training" if self._is_training else "Idle"
         }
+        if self.model_slots is not None:
+            status["model_version"] = self.model_slots.version
+            status["model_loading"] = self.model_slots.is_loading
+        return status
 
     def SaveModel(self, request, context):
         """Model kaydet."""
@@ -170,11 +862,24 @@ class TrainingServicer:
             return {"success": False, "message": str(e)}
 
     def LoadModel(self, request, context):
-        """Model yükle."""
+        """
+        Model yükle.
+
+        Model slotları varsa yükleme arka planda yapılır ve RPC hemen döner
+        (request.wait True ise swap tamamlanana kadar bekler).
+        """
         try:
             path = getattr(request, 'path', './models/saved_model')
-            self.agent.load(path)
-            return {"success": True, "message": f"Model loaded from {path}"}
+            if self.model_slots is None:
+                self.agent.load(path)
+                return {"success": True, "message": f"Model loaded from {path}"}
+
+            future = self.model_slots.load_async(path)
+            if not getattr(request, 'wait', False):
+                return {"success": True, "message": f"Loading model from {path}"}
+
+            version = future.result()
+            return {"success": True, "message": f"Model v{version} loaded from {path}"}
         except Exception as e:
             return {"success": False, "message": str(e)}
 
@@ -189,21 +894,12 @@ class DifficultyServicer:
         """Oyuncu metriklerini güncelle."""
         player_id = getattr(request, 'player_id', 'default')
 
-        tracker = self.manager.get_tracker(player_id)
-
-        # Metrikleri kaydet
-        if hasattr(request, 'recent_kills'):
-            for _ in range(request.recent_kills):
-                tracker.record_kill()
-
-        if hasattr(request, 'recent_deaths'):
-            for _ in range(request.recent_deaths):
-                tracker.record_death()
-
-        # Zorluk güncelle
-        self.manager.update_difficulty(player_id)
-
-        return self.manager.get_difficulty_info(player_id)
+        # Kayıt + zorluk güncellemesi oyuncunun lock'u altında tek adımda
+        return self.manager.record_metrics(
+            player_id,
+            kills=getattr(request, 'recent_kills', 0),
+            deaths=getattr(request, 'recent_deaths', 0)
+        )
 
     def GetCurrentDifficulty(self, request, context):
         """Mevcut zorluk."""
@@ -221,18 +917,116 @@ class DifficultyServicer:
 class HealthServicer:
     """Health check servisi."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        worker_status: Optional[Callable[[], Dict]] = None,
+        sampler: Optional[ResourceSampler] = None,
+        serving: bool = True
+    ):
+        """
+        Args:
+            worker_status: Multi-process modda toplu worker durumunu
+                döndüren callable (bkz. WorkerStatusTable.summary)
+            sampler: Kaynak kullanımı snapshot'ı (Check sadece cache'i okur)
+            serving: False ise set_serving(True) çağrılana kadar NOT_SERVING
+                (ör. warm-up sürerken)
+        """
         self._start_time = time.time()
         self._version = "0.1.0"
+        self.worker_status = worker_status
+        self.sampler = sampler
+        self._serving = serving
+
+    def set_serving(self, serving: bool) -> None:
+        """Serving durumunu değiştir (warm-up tamamlandı vb.)."""
+        self._serving = serving
 
     def Check(self, request, context):
         """Health check."""
-        return {
-            "status": "SERVING",
+        response = {
+            "status": "SERVING" if self._serving else "NOT_SERVING",
             "version": self._version,
             "uptime_seconds": int(time.time() - self._start_time)
         }
 
+        if self.sampler is not None:
+            snapshot = self.sampler.snapshot
+            response["cpu_usage"] = snapshot["cpu_percent_total"]
+            response["memory_usage"] = snapshot["rss_mb"]
+            response["thread_count"] = snapshot["thread_count"]
+            response["queue_depth"] = snapshot["queue_depth"]
+            response["p99_latency_ms"] = snapshot["p99_latency_ms"]
+
+        # Pre-fork modda tüm worker'ların toplu durumu
+        if self.worker_status is not None:
+            workers = self.worker_status()
+            response["workers_total"] = workers["workers_total"]
+            response["workers_alive"] = workers["workers_alive"]
+            if workers["workers_alive"] == 0:
+                response["status"] = "NOT_SERVING"
+
+        return response
+
+
+class AdminServicer:
+    """
+    Operasyon servisi (trace dump).
+
+    Dump'lar sadece dump_dir altına yazılır: istemci dizin değil yalnızca
+    dosya adı seçebilir (port kimlik doğrulamasız olduğu için).
+    """
+
+    def __init__(self, tracer: Tracer, dump_dir: str = "./logs/traces"):
+        self.tracer = tracer
+        self.dump_dir = dump_dir
+
+    def _dump_path(self, name: Optional[str]) -> str:
+        """
+        dump_dir altındaki dump dosyası yolu.
+
+        Raises:
+            ValueError: name düz bir dosya adı değilse (dizin, '..', mutlak yol)
+        """
+        if not name:
+            name = f"trace_{os.getpid()}_{int(time.time())}.json"
+        elif (os.path.isabs(name) or os.path.basename(name) != name
+              or (os.path.altsep and os.path.altsep in name) or name in (".", "..")):
+            raise ValueError(f"Trace dump name must be a plain file name, got {name!r}")
+
+        dump_dir = os.path.realpath(self.dump_dir)
+        path = os.path.realpath(os.path.join(dump_dir, name))
+        # Mevcut bir symlink dump_dir dışına yönlendiremesin
+        if os.path.dirname(path) != dump_dir:
+            raise ValueError(f"Trace dump name {name!r} resolves outside {self.dump_dir}")
+        return path
+
+    def dump(self, name: Optional[str] = None, clear: bool = False) -> Tuple[str, int]:
+        """
+        Ring buffer'ı Chrome trace JSON olarak dump_dir altına yaz.
+
+        Args:
+            name: Dosya adı (None/boş = trace_<pid>_<zaman>.json)
+            clear: Dump sonrası ring buffer'ı temizle
+
+        Returns:
+            (dosya yolu, trace sayısı)
+        """
+        path = self._dump_path(name)
+        count = self.tracer.dump(path)
+        if clear:
+            self.tracer.clear()
+        print(f"[AdminServicer] Dumped {count} traces to {path}")
+        return path, count
+
+    def DumpTraces(self, request, context):
+        """Trace buffer'ını dump_dir altına dök (request.path sadece dosya adı)."""
+        try:
+            path, count = self.dump(getattr(request, 'path', ''), getattr(request, 'clear', False))
+            return {"success": True, "path": path, "trace_count": count,
+                    "message": f"{count} traces written"}
+        except Exception as e:
+            return {"success": False, "path": "", "trace_count": 0, "message": str(e)}
+
 
 class BotAIServer:
     """
@@ -246,7 +1040,26 @@ class BotAIServer:
         agent: Optional[BaseAgent] = None,
         host: str = "0.0.0.0",
         port: int = 50051,
-        max_workers: int = 10
+        max_workers: int = 10,
+        reuse_port: bool = False,
+        metrics_port: Optional[int] = None,
+        inference_timeout_ms: Optional[float] = 100.0,
+        batch_inference: bool = True,
+        max_batch_size: int = 32,
+        max_queue_depth: int = 256,
+        action_cache: Optional[ActionCache] = None,
+        model_pool: Optional[ModelPool] = None,
+        telemetry_interval: Optional[float] = 1.0,
+        warmup_batch_sizes: Optional[Sequence[int]] = DEFAULT_WARMUP_BATCH_SIZES,
+        warmup_iterations: int = 3,
+        trace_sample_rate: float = 0.0,
+        trace_capacity: int = 4096,
+        trace_dir: str = "./logs/traces",
+        experience_capacity: Optional[int] = None,
+        max_trajectory_length: int = 1024,
+        session_capacity: int = 4096,
+        session_idle_timeout: float = 120.0,
+        mmap_weights: bool = False
     ):
         """
         Args:
@@ -254,10 +1067,35 @@ class BotAIServer:
             host: Server host
             port: Server port
             max_workers: Thread pool size
+            reuse_port: SO_REUSEPORT - birden fazla process aynı portu paylaşır
+            metrics_port: Prometheus /metrics portu (None = kapalı)
+            inference_timeout_ms: İstek başına inference bütçesi
+            batch_inference: İstekleri micro-batching kuyruğundan geçir
+            max_batch_size: Batch başına maksimum istek
+            max_queue_depth: Bu derinliğin üstünde fallback agent kullanılır
+            action_cache: Opsiyonel aksiyon cache'i (None = kapalı)
+            model_pool: Opsiyonel zorluk seviyesi bazlı model havuzu
+            telemetry_interval: Kaynak kullanımı örnekleme aralığı (None = kapalı)
+            warmup_batch_sizes: start() sırasında modellerin ısıtılacağı batch
+                boyutları; bitene kadar Health NOT_SERVING döner (None/boş = kapalı)
+            warmup_iterations: Batch boyutu başına ısınma tekrarı
+            trace_sample_rate: Aşama tracing'i yapılacak istek oranı (0 = kapalı)
+            trace_capacity: Trace ring buffer boyutu
+            trace_dir: Trace dump'larının yazıldığı dizin (DumpTraces dışına çıkamaz)
+            experience_capacity: Canlı oyundan toplanacak deneyim store'unun
+                transition kapasitesi (None = kapalı)
+            max_trajectory_length: Bu uzunluktaki açık episode kesilip store'a yazılır
+            session_capacity: Aynı anda tutulacak bot oturumu sayısı
+            session_idle_timeout: Bu süre istek göndermeyen bot oturumu düşürülür (saniye)
+            mmap_weights: LoadModel hot-swap'ında SB3 ağırlıklarını memory-map et
         """
         self.host = host
         self.port = port
         self.max_workers = max_workers
+        self.reuse_port = reuse_port
+        self.metrics_port = metrics_port
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes or ())
+        self.warmup_iterations = warmup_iterations
 
         # Agent
         self.agent = agent or RuleBasedAgent()
@@ -265,16 +1103,81 @@ class BotAIServer:
         # Managers
         self.difficulty_manager = DifficultyManager()
 
+        # Metrics
+        self.metrics = MetricsRegistry()
+        self._metrics_server: Optional[MetricsHTTPServer] = None
+
+        # Tracing (sample_rate 0 iken istek başına tek karşılaştırma)
+        self.tracer = Tracer(sample_rate=trace_sample_rate, capacity=trace_capacity)
+
+        # Online deneyim (SendReward/EndEpisode -> ExperienceStore)
+        self.experience_store: Optional[ExperienceStore] = None
+        experience = None
+        if experience_capacity:
+            self.experience_store = ExperienceStore(experience_capacity, obs_dim=self.agent.observation_dim)
+            experience = ExperienceCollector(self.experience_store, max_trajectory_length)
+
+        # Bot oturumları (idle olanlar arka planda düşürülür)
+        self.sessions = SessionTable(
+            capacity=session_capacity, idle_timeout=session_idle_timeout,
+            eviction_interval=min(10.0, session_idle_timeout),
+            obs_dim=self.agent.observation_dim
+        )
+
         # Servicers
-        self.bot_servicer = BotAIServicer(self.agent, self.difficulty_manager)
-        self.training_servicer = TrainingServicer(self.agent)
+        self.bot_servicer = BotAIServicer(
+            self.agent, self.difficulty_manager, self.metrics,
+            inference_timeout_ms=inference_timeout_ms,
+            batch_inference=batch_inference,
+            max_batch_size=max_batch_size,
+            max_queue_depth=max_queue_depth,
+            action_cache=action_cache,
+            model_pool=model_pool,
+            tracer=self.tracer,
+            experience=experience,
+            sessions=self.sessions
+        )
+        self.bot_servicer.model_slots.mmap_weights = mmap_weights
+        self.training_servicer = TrainingServicer(
+            self.agent, model_slots=self.bot_servicer.model_slots
+        )
         self.difficulty_servicer = DifficultyServicer(self.difficulty_manager)
-        self.health_servicer = HealthServicer()
+        self.admin_servicer = AdminServicer(self.tracer, dump_dir=trace_dir)
+
+        # Kaynak telemetrisi (arka planda örneklenir, Health cache'i okur)
+        self.sampler: Optional[ResourceSampler] = None
+        if telemetry_interval is not None:
+            self.sampler = ResourceSampler(
+                interval=telemetry_interval,
+                queue_depth_fn=self.bot_servicer._queue_depth,
+                latency_histogram=self.bot_servicer._m_rpc_latency
+            )
+            self._init_process_metrics()
+        self.health_servicer = HealthServicer(
+            sampler=self.sampler, serving=not self.warmup_batch_sizes
+        )
+
+        # Hot-swap ve havuz yüklemeleri de aynı batch boyutlarında ısıtılsın
+        if self.warmup_batch_sizes:
+            self.bot_servicer.model_slots.warmup_batch_sizes = self.warmup_batch_sizes
+            if model_pool is not None and model_pool.warm_up is None:
+                model_pool.warm_up = lambda agent: warm_up_agent(
+                    agent, self.warmup_batch_sizes, self.warmup_iterations)
 
         # gRPC server
         self._server: Optional[grpc.Server] = None
         self._is_running = False
 
+    def _init_process_metrics(self) -> None:
+        """Sampler snapshot'ını Prometheus gauge'ları olarak yayınla."""
+        sampler = self.sampler
+        self.metrics.gauge("process_cpu_percent", "Process CPU kullanımı (tek çekirdek = 100)").set_function(
+            lambda: sampler.snapshot["cpu_percent"])
+        self.metrics.gauge("process_resident_memory_bytes", "Process RSS").set_function(
+            lambda: sampler.snapshot["rss_bytes"])
+        self.metrics.gauge("process_threads", "Process thread sayısı").set_function(
+            lambda: sampler.snapshot["thread_count"])
+
     def start(self, blocking: bool = True) -> None:
         """
         Server'ı başlat.
@@ -282,8 +1185,13 @@ class BotAIServer:
         Args:
             blocking: True ise block eder, False ise background'da çalışır
         """
+        options = []
+        if self.reuse_port:
+            options.append(("grpc.so_reuseport", 1))
+
         self._server = grpc.server(
-            futures.ThreadPoolExecutor(max_workers=self.max_workers)
+            futures.ThreadPoolExecutor(max_workers=self.max_workers),
+            options=options
         )
 
         # Servisleri ekle
@@ -296,9 +1204,22 @@ class BotAIServer:
         address = f"{self.host}:{self.port}"
         self._server.add_insecure_port(address)
 
+        if self.metrics_port is not None:
+            self._metrics_server = MetricsHTTPServer(self.metrics, port=self.metrics_port)
+            self._metrics_server.start()
+
+        if self.sampler is not None:
+            self.sampler.start()
+        self.sessions.start()
+
         print(f"[BotAIServer] Starting server on {address}...")
         self._server.start()
         self._is_running = True
+
+        # Warm-up bitene kadar Health NOT_SERVING döner
+        if self.warmup_batch_sizes:
+            self._warm_up()
+
         print(f"[BotAIServer] Server started!")
 
         if blocking:
@@ -307,14 +1228,37 @@ class BotAIServer:
             except KeyboardInterrupt:
                 self.stop()
 
+    def _warm_up(self) -> None:
+        """Tüm yüklü modelleri ısıt, sonra SERVING'e geç."""
+        start = time.perf_counter()
+        report = self.bot_servicer.warm_up(self.warmup_batch_sizes, self.warmup_iterations)
+        elapsed = time.perf_counter() - start
+
+        for key, timings in report.items():
+            per_size = ", ".join(f"bs={bs}: {t * 1000:.2f}ms" for bs, t in timings.items())
+            print(f"[BotAIServer] Warm-up {key}: {per_size}")
+        print(f"[BotAIServer] Warm-up completed in {elapsed:.2f}s")
+        self.health_servicer.set_serving(True)
+
     def stop(self) -> None:
         """Server'ı durdur."""
         if self._server:
             print("[BotAIServer] Stopping server...")
             self._server.stop(grace=5)
             self._is_running = False
+            self.bot_servicer.stop()
+            if self.sampler is not None:
+                self.sampler.stop()
+            self.sessions.stop()
+            if self._metrics_server is not None:
+                self._metrics_server.stop()
+                self._metrics_server = None
             print("[BotAIServer] Server stopped.")
 
+    def dump_traces(self, name: Optional[str] = None) -> str:
+        """Trace buffer'ını trace_dir altına Chrome trace JSON olarak yaz (sinyal handler'ı için)."""
+        return self.admin_servicer.dump(name)[0]
+
     def is_running(self) -> bool:
         """Server çalışıyor mu?"""
         return self._is_running
@@ -332,11 +1276,54 @@ class BotAIServer:
         }
 
 
+SERVING_MODEL_EXTENSIONS = (".pt", ".ts")
+NUMPY_MODEL_EXTENSIONS = (".npz",)
+
+
+def load_ppo_agent(path: str, mmap: bool = False) -> BaseAgent:
+    """
+    Model havuzu için varsayılan loader.
+
+    Export edilmiş TorchScript (.pt) -> ServingAgent, NumPy ağırlıkları
+    (.npz) -> NumpyPolicyAgent, SB3 zip -> PPOAgent (inference-only:
+    rollout buffer/optimizer kurulmaz). torch/SB3 yalnızca gereken
+    backend için import edilir.
+
+    Args:
+        path: Model dosyası
+        mmap: SB3 zip ağırlıklarını memory-map et (process'ler arası paylaşım)
+    """
+    if path.endswith(SERVING_MODEL_EXTENSIONS):
+        from ..agents.serving_agent import ServingAgent
+        return ServingAgent(path)
+    if path.endswith(NUMPY_MODEL_EXTENSIONS):
+        return NumpyPolicyAgent(path)
+    from ..agents.ppo_agent import PPOAgent
+    agent = PPOAgent(verbose=0)
+    agent.load(path, inference_only=True, mmap=mmap)
+    return agent
+
+
 def serve(
     model_path: Optional[str] = None,
     host: str = "0.0.0.0",
     port: int = 50051,
-    use_rule_based: bool = False
+    use_rule_based: bool = False,
+    max_workers: int = 10,
+    reuse_port: bool = False,
+    metrics_port: Optional[int] = None,
+    level_models: Optional[Dict[int, str]] = None,
+    model_pool_bytes: int = 512 * 1024 * 1024,
+    mmap_weights: bool = False,
+    rule_table: Optional[str] = None,
+    torch_threads: Optional[int] = None,
+    action_cache: bool = False,
+    cache_ttl_ms: float = 500.0,
+    warmup_batch_sizes: Optional[Sequence[int]] = DEFAULT_WARMUP_BATCH_SIZES,
+    trace_sample_rate: float = 0.0,
+    trace_capacity: int = 4096,
+    trace_dir: str = "./logs/traces",
+    experience_capacity: Optional[int] = None
 ) -> BotAIServer:
     """
     Server'ı başlat (convenience function).
@@ -346,24 +1333,67 @@ def serve(
         host: Server host
         port: Server port
         use_rule_based: True ise rule-based agent kullan
+        max_workers: Thread pool size
+        reuse_port: SO_REUSEPORT (multi-process worker modu için)
+        metrics_port: Prometheus /metrics portu (None = kapalı)
+        level_models: Zorluk seviyesi -> PPO model yolu (None = tek global model)
+        model_pool_bytes: Seviye modelleri için bellek bütçesi
+        mmap_weights: SB3 zip ağırlıklarını memory-map et
+        rule_table: Rule-based agent için derlenmiş karar tablosu (.npz)
+        torch_threads: torch intra-op thread sayısı (None = değiştirme)
+        action_cache: Quantize observation aksiyon cache'ini aç
+        cache_ttl_ms: Cache girdisi TTL'i
+        warmup_batch_sizes: SERVING'den önce ısınma batch boyutları (None = kapalı)
+        trace_sample_rate: Aşama tracing'i yapılacak istek oranı (0 = kapalı)
+        trace_capacity: Trace ring buffer boyutu
+        trace_dir: Trace dump dizini
+        experience_capacity: Canlı deneyim store kapasitesi (None = kapalı)
 
     Returns:
         BotAIServer instance
     """
+    if torch_threads is not None:
+        from ..agents.serving_agent import set_torch_threads
+        set_torch_threads(torch_threads)
+
     # Agent oluştur
     if use_rule_based:
         agent = RuleBasedAgent()
-        print("[serve] Using Rule-Based Agent")
+        if rule_table:
+            agent.set_decision_table(RuleDecisionTable.load(rule_table))
+        print(f"[serve] Using Rule-Based Agent{' (compiled table)' if rule_table else ''}")
+    elif model_path and model_path.endswith(SERVING_MODEL_EXTENSIONS + NUMPY_MODEL_EXTENSIONS):
+        agent = load_ppo_agent(model_path)
+        print(f"[serve] Loaded exported policy from {model_path}")
     else:
+        from ..agents.ppo_agent import PPOAgent
         agent = PPOAgent()
         if model_path and os.path.exists(model_path):
-            agent.load(model_path)
+            agent.load(model_path, inference_only=True, mmap=mmap_weights)
             print(f"[serve] Loaded PPO model from {model_path}")
         else:
             print("[serve] Using new PPO Agent (not trained)")
 
+    model_pool = None
+    if level_models:
+        model_pool = ModelPool(
+            level_models, functools.partial(load_ppo_agent, mmap=mmap_weights), max_bytes=model_pool_bytes
+        )
+        print(f"[serve] Model pool: {len(level_models)} difficulty levels")
+
     # Server oluştur ve başlat
-    server = BotAIServer(agent=agent, host=host, port=port)
+    server = BotAIServer(
+        agent=agent, host=host, port=port,
+        max_workers=max_workers, reuse_port=reuse_port,
+        metrics_port=metrics_port, model_pool=model_pool,
+        action_cache=ActionCache(ttl_seconds=cache_ttl_ms / 1000.0) if action_cache else None,
+        warmup_batch_sizes=warmup_batch_sizes,
+        trace_sample_rate=trace_sample_rate,
+        trace_capacity=trace_capacity,
+        trace_dir=trace_dir,
+        experience_capacity=experience_capacity,
+        mmap_weights=mmap_weights
+    )
     return server
 
 
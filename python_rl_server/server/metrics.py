@@ -0,0 +1,408 @@
+"""
+Metrics Registry
+TÜBİTAK İP-2 AI Bot System
+
+Prometheus uyumlu, düşük maliyetli metrik kaydı.
+
+Hot path'te lock yok: her thread kendi shard'ına yazar, shard'lar sadece
+scrape sırasında toplanır. gRPC thread pool'u uzun ömürlü olduğu için
+shard sayısı thread sayısı ile sınırlı kalır.
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Default bucket sınırları
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+EXPORTED_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _ThreadShards:
+    """Thread başına bir shard; lock sadece yeni thread ilk kez yazarken alınır."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: List = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._factory()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def all(self) -> List:
+        # list() kopyası GIL altında atomik; okuyucu lock almaz
+        return list(self._shards)
+
+
+class _CounterChild:
+    """Tek label kombinasyonu için counter."""
+
+    def __init__(self):
+        self._shards = _ThreadShards(lambda: [0.0])
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.get()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return sum(s[0] for s in self._shards.all())
+
+
+class _GaugeChild:
+    """Tek label kombinasyonu için gauge (inc/dec shard'lı, set tek yazar)."""
+
+    def __init__(self):
+        self._base = 0.0
+        self._fn = None
+        self._shards = _ThreadShards(lambda: [0.0])
+
+    def set_function(self, fn) -> None:
+        """Değeri scrape anında fn() ile hesapla (hot path'e maliyet yok)."""
+        self._fn = fn
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.get()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._shards.get()[0] -= amount
+
+    def set(self, value: float) -> None:
+        # Shard'lardaki delta'ları telafi et
+        self._base = value - sum(s[0] for s in self._shards.all())
+
+    @property
+    def value(self) -> float:
+        if self._fn is not None:
+            return float(self._fn())
+        return self._base + sum(s[0] for s in self._shards.all())
+
+
+class _HistogramChild:
+    """Tek label kombinasyonu için histogram."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = tuple(buckets)
+        n = len(self._buckets) + 1  # +Inf
+        # Shard: [bucket_counts..., sum, count]
+        self._shards = _ThreadShards(lambda: [0] * n + [0.0, 0])
+
+    def observe(self, value: float) -> None:
+        shard = self._shards.get()
+        shard[bisect.bisect_left(self._buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """(bucket başına sayılar, toplam, adet) - kümülatif değil."""
+        n = len(self._buckets) + 1
+        counts = [0] * n
+        total = 0.0
+        count = 0
+        for shard in self._shards.all():
+            for i in range(n):
+                counts[i] += shard[i]
+            total += shard[-2]
+            count += shard[-1]
+        return counts, total, count
+
+    def quantile(self, q: float) -> float:
+        """Bucket'lar içinde lineer interpolasyon ile quantile tahmini."""
+        counts, _, count = self.snapshot()
+        return _bucket_quantile(self._buckets, counts, count, q)
+
+    @property
+    def count(self) -> int:
+        return self.snapshot()[2]
+
+    @property
+    def sum(self) -> float:
+        return self.snapshot()[1]
+
+
+def _bucket_quantile(buckets: Sequence[float], counts: List[int], count: int, q: float) -> float:
+    if count == 0:
+        return 0.0
+
+    rank = q * count
+    cumulative = 0
+    lower = 0.0
+    for i, upper in enumerate(buckets):
+        if cumulative + counts[i] >= rank:
+            if counts[i] == 0:
+                return upper
+            return lower + (upper - lower) * (rank - cumulative) / counts[i]
+        cumulative += counts[i]
+        lower = upper
+
+    # +Inf bucket'ına düştü - son sınırı döndür
+    return buckets[-1] if buckets else 0.0
+
+
+class _Metric:
+    """Label'lı metrik ailesi."""
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwargs: str):
+        """Label değerleri için child metriği al (yoksa oluştur)."""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name}: expected labels {self.labelnames}, got {values}"
+                )
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def _format_labels(self, values: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.TYPE}"
+
+
+class Counter(_Metric):
+    """Monoton artan sayaç."""
+
+    TYPE = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for values, child in self.children():
+            yield f"{self.name}{self._format_labels(values)} {child.value}"
+
+
+class Gauge(_Metric):
+    """Anlık değer."""
+
+    TYPE = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, fn) -> None:
+        self.labels().set_function(fn)
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for values, child in self.children():
+            yield f"{self.name}{self._format_labels(values)} {child.value}"
+
+
+class Histogram(_Metric):
+    """Bucket'lı histogram (p50/p95/p99 tahmini dahil)."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Tüm label'lar üzerinden toplam (bucket sayıları, toplam, adet)."""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        count = 0
+        for _, child in self.children():
+            child_counts, child_total, child_count = child.snapshot()
+            for i, c in enumerate(child_counts):
+                counts[i] += c
+            total += child_total
+            count += child_count
+        return counts, total, count
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        quantile_lines = []
+        for values, child in self.children():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for upper, c in zip(self.buckets, counts):
+                cumulative += c
+                yield f"{self.name}_bucket{self._format_labels(values, {'le': _format_float(upper)})} {cumulative}"
+            yield f"{self.name}_bucket{self._format_labels(values, {'le': '+Inf'})} {count}"
+            yield f"{self.name}_sum{self._format_labels(values)} {total}"
+            yield f"{self.name}_count{self._format_labels(values)} {count}"
+
+            for q in EXPORTED_QUANTILES:
+                value = _bucket_quantile(self.buckets, counts, count, q)
+                quantile_lines.append(
+                    f"{self.name}_quantile{self._format_labels(values, {'quantile': str(q)})} {value}"
+                )
+
+        # Scrape tarafında histogram_quantile kullanmayanlar için hazır tahminler
+        if quantile_lines:
+            yield f"# TYPE {self.name}_quantile gauge"
+            yield from quantile_lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Metrik kaydı ve Prometheus text exposition."""
+
+    def __init__(self, prefix: str = "calypso"):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.TYPE}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self._full_name(name), documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self._full_name(name), documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self._full_name(name), documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Kayıtlı metriği (prefix'siz isimle) al."""
+        return self._metrics.get(self._full_name(name))
+
+    def render(self) -> str:
+        """Prometheus text format (v0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHTTPServer:
+    """
+    /metrics endpoint'i sunan küçük HTTP server.
+
+    Ayrı daemon thread'de çalışır; inference path'ine dokunmaz.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9090):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        registry = self.registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrape başına log basma
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        # port=0 verilirse gerçek portu al
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"[MetricsHTTPServer] Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
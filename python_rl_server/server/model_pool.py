@@ -0,0 +1,223 @@
+"""
+Model Pool
+TÜBİTAK İP-2 AI Bot System
+
+Zorluk seviyesi başına ayrı eğitilmiş politikalar için model havuzu.
+
+- Seviye (1-7) -> model yolu eşlemesi; aynı yolu paylaşan seviyeler tek
+  model kullanır.
+- Modeller ilk ihtiyaçta arka planda yüklenir; yükleme bitene kadar
+  istekler varsayılan (global) agent'a düşer, request path'te dosya
+  okuması yapılmaz.
+- Bellekteki modeller byte bütçesi altında LRU ile tutulur.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+from ..agents import BaseAgent
+
+
+def estimate_agent_bytes(agent: BaseAgent) -> int:
+    """
+    Agent'ın bellek maliyeti tahmini.
+
+    Agent kendi boyutunu bildiriyorsa (ServingAgent.size_bytes) o, SB3
+    politikası varsa parametre byte'ları, yoksa (rule-based vb.)
+    attribute'ların kaba boyutu.
+    """
+    size_bytes = getattr(agent, "size_bytes", None)
+    if size_bytes:
+        return int(size_bytes)
+    model = getattr(agent, "model", None)
+    policy = getattr(model, "policy", None)
+    if policy is not None and hasattr(policy, "parameters"):
+        return int(sum(p.numel() * p.element_size() for p in policy.parameters()))
+    return sys.getsizeof(agent) + sum(sys.getsizeof(v) for v in vars(agent).values())
+
+
+class _PoolEntry:
+    __slots__ = ("agent", "size_bytes", "loaded_at")
+
+    def __init__(self, agent: BaseAgent, size_bytes: int):
+        self.agent = agent
+        self.size_bytes = size_bytes
+        self.loaded_at = time.time()
+
+
+class ModelPool:
+    """
+    Seviye bazlı lazy-load + LRU model havuzu.
+
+    Eviction sadece havuzun referansını bırakır; o modelle çalışan bir
+    batch kendi referansıyla işini bitirir.
+    """
+
+    def __init__(
+        self,
+        model_paths: Dict[int, str],
+        loader: Callable[[str], BaseAgent],
+        max_bytes: int = 512 * 1024 * 1024,
+        size_fn: Callable[[BaseAgent], int] = estimate_agent_bytes,
+        retry_after: float = 30.0,
+        warm_up: Optional[Callable[[BaseAgent], None]] = None,
+        validate: Optional[Callable[[BaseAgent], None]] = None
+    ):
+        """
+        Args:
+            model_paths: Zorluk seviyesi (1-7) -> model yolu
+            loader: Yol -> yüklenmiş agent
+            max_bytes: Bellekte tutulacak modellerin toplam byte bütçesi
+            size_fn: Agent boyut tahmini
+            retry_after: Başarısız yüklemeden sonra tekrar deneme süresi (saniye)
+            warm_up: Yüklenen model route edilebilir olmadan önce çağrılır
+            validate: Yüklenen modeli kontrol eder; hata fırlatırsa model
+                havuza eklenmez (BotAIServicer observation/aksiyon uzayını bağlar)
+        """
+        self.model_paths = {int(level): path for level, path in model_paths.items()}
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.size_fn = size_fn
+        self.retry_after = retry_after
+        self.warm_up = warm_up
+        self.validate = validate
+
+        self._entries: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        self._loading: Dict[str, threading.Thread] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._evictions = 0
+        self._failed_loads = 0
+
+    def route(self, level: int) -> Optional[str]:
+        """
+        Seviye için hazır modelin anahtarını döndür.
+
+        Model bellekte değilse arka planda yüklemeyi başlatır ve None döner
+        (çağıran varsayılan agent'ı kullanır).
+        """
+        path = self.model_paths.get(int(level))
+        if path is None:
+            return None
+
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+                self._hits += 1
+                return path
+
+            self._misses += 1
+            if path in self._loading:
+                return None
+            failed_at = self._failed_at.get(path)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+                return None
+
+            thread = threading.Thread(
+                target=self._load_background, args=(path,), name="ModelPoolLoader", daemon=True
+            )
+            self._loading[path] = thread
+        thread.start()
+        return None
+
+    def get_loaded(self, key: str) -> Optional[BaseAgent]:
+        """Bellekteki modeli döndür (evict edildiyse None)."""
+        entry = self._entries.get(key)
+        return entry.agent if entry is not None else None
+
+    def load(self, path: str) -> BaseAgent:
+        """Modeli senkron yükle ve havuza ekle."""
+        agent = self.loader(path)
+        if self.validate is not None:
+            self.validate(agent)
+        if self.warm_up is not None:
+            self.warm_up(agent)
+        size = self.size_fn(agent)
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._total_bytes -= old.size_bytes
+            self._entries[path] = _PoolEntry(agent, size)
+            self._total_bytes += size
+            self._loads += 1
+            self._failed_at.pop(path, None)
+            self._evict_locked(keep=path)
+
+        print(f"[ModelPool] Loaded {path} ({size / 1024:.0f} KiB, "
+              f"{self._total_bytes / 1024:.0f}/{self.max_bytes / 1024:.0f} KiB in pool)")
+        return agent
+
+    def preload(self, levels: Optional[Iterable[int]] = None) -> None:
+        """Verilen (None = tüm) seviyelerin modellerini senkron yükle."""
+        levels = self.model_paths.keys() if levels is None else levels
+        for path in dict.fromkeys(self.model_paths[level] for level in levels):
+            if path not in self._entries:
+                self.load(path)
+
+    def _load_background(self, path: str) -> None:
+        try:
+            self.load(path)
+        except Exception as e:
+            with self._lock:
+                self._failed_loads += 1
+                self._failed_at[path] = time.monotonic()
+            print(f"[ModelPool] Failed to load {path}: {e}")
+        finally:
+            with self._lock:
+                self._loading.pop(path, None)
+
+    def _evict_locked(self, keep: str) -> None:
+        """Bütçe aşıldıkça en uzun süredir kullanılmayan modeli at."""
+        while self._total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                # Yeni model tek başına bütçeyi aşıyor; yine de tutulur
+                break
+            entry = self._entries.pop(oldest)
+            self._total_bytes -= entry.size_bytes
+            self._evictions += 1
+            print(f"[ModelPool] Evicted {oldest}")
+
+    def loaded_agents(self) -> Dict[str, BaseAgent]:
+        """Bellekteki modeller (anahtar -> agent)."""
+        with self._lock:
+            return {key: entry.agent for key, entry in self._entries.items()}
+
+    def wait_idle(self, timeout: Optional[float] = None) -> None:
+        """Devam eden arka plan yüklemelerini bekle."""
+        with self._lock:
+            threads = list(self._loading.values())
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get_stats(self) -> Dict:
+        """Havuz istatistikleri."""
+        with self._lock:
+            return {
+                "models": len(self._entries),
+                "loaded": list(self._entries.keys()),
+                "loading": len(self._loading),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "failed_loads": self._failed_loads
+            }
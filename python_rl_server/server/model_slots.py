@@ -0,0 +1,233 @@
+"""
+Model Slots
+TÜBİTAK İP-2 AI Bot System
+
+LoadModel için çift tamponlu (double-buffered) model slotları.
+
+Yeni model arka plan thread'inde ayrı bir agent kopyasına yüklenir ve
+ısıtılır; hazır olunca aktif referans tek atamayla değiştirilir. Eski
+slot, üzerinde çalışan inference batch'leri bitene kadar (in-flight
+sayacı sıfırlanana kadar) bekletilir ve sonra bırakılır. Böylece reload
+sırasında hiçbir istek yarı yüklenmiş bir modele denk gelmez.
+"""
+
+import copy
+import inspect
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..agents import BaseAgent
+from .warmup import warm_up_agent
+
+
+class _ModelSlot:
+    __slots__ = ("agent", "version", "inflight", "retired")
+
+    def __init__(self, agent: BaseAgent, version: int):
+        self.agent = agent
+        self.version = version
+        self.inflight = 0
+        self.retired = False
+
+
+def _copy_agent(agent: BaseAgent) -> BaseAgent:
+    """
+    Varsayılan agent factory: aktif agent'ın shallow kopyası.
+
+    load() modeli/parametreleri kopyanın attribute'larına yeniden atadığı
+    için aktif agent'ın state'i değişmez.
+    """
+    return copy.copy(agent)
+
+
+def check_compatible(active: BaseAgent, candidate: BaseAgent) -> None:
+    """
+    Yeni modelin aktif modelin yerine geçebileceğini doğrula.
+
+    GameState yerleşimi, oturum/deneyim buffer'ları ve aksiyon isimleri
+    observation_dim/action_dim'e bağlı olduğu için hot-swap ve seviye
+    modelleri aynı observation ve aksiyon uzayında olmalıdır.
+
+    Raises:
+        ValueError: observation_dim veya action_dim farklıysa
+    """
+    expected = (active.observation_dim, active.action_dim)
+    got = (candidate.observation_dim, candidate.action_dim)
+    if got != expected:
+        raise ValueError(
+            f"Model {candidate.name} has observation_dim/action_dim {got[0]}/{got[1]}, "
+            f"serving {expected[0]}/{expected[1]}"
+        )
+
+
+def _load_for_serving(agent: BaseAgent, path: str, mmap: bool) -> None:
+    """
+    Modeli servis için yükle.
+
+    load() inference_only destekliyorsa (PPOAgent) start_server ve
+    load_ppo_agent gibi sadece politika kurulur; rollout buffer ve
+    optimizer state'i ayrılmaz. Diğer agent'lar kendi load()'unu kullanır.
+    """
+    if "inference_only" in inspect.signature(agent.load).parameters:
+        agent.load(path, inference_only=True, mmap=mmap)
+    else:
+        agent.load(path)
+
+
+class ModelSlots:
+    """
+    Aktif + yüklenen model slotları.
+
+    Inference tarafı acquire() ile aktif agent'ı alır; sayaç batch başına
+    bir kez artırılır. Yükleme tarafı load_async() ile yeni modeli hazırlar
+    ve swap eder.
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        agent_factory: Callable[[BaseAgent], BaseAgent] = _copy_agent,
+        warmup_steps: int = 8,
+        drain_timeout: float = 30.0,
+        warmup_batch_sizes: Sequence[int] = (1,),
+        mmap_weights: bool = False
+    ):
+        """
+        Args:
+            agent: Başlangıçta aktif agent
+            agent_factory: Aktif agent'tan yüklenecek boş kopyayı üretir
+            warmup_steps: Swap öncesi batch boyutu başına ısınma tekrarı
+            drain_timeout: Eski slotun in-flight işleri için maksimum bekleme (saniye)
+            warmup_batch_sizes: Isınmada kullanılacak batch boyutları
+            mmap_weights: Hot-swap'ta SB3 zip ağırlıklarını memory-map et
+        """
+        self.agent_factory = agent_factory
+        self.warmup_steps = warmup_steps
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes)
+        self.drain_timeout = drain_timeout
+        self.mmap_weights = mmap_weights
+
+        self._active = _ModelSlot(agent, version=0)
+        self._cond = threading.Condition()
+        self._load_lock = threading.Lock()
+        self._listeners: List[Callable[[int], None]] = []
+
+        self._loading = False
+        self._swap_count = 0
+        self._failed_loads = 0
+        self._last_error = ""
+
+    @property
+    def active(self) -> BaseAgent:
+        """Aktif agent (referans okuması atomik)."""
+        return self._active.agent
+
+    @property
+    def version(self) -> int:
+        """Aktif model versiyonu (her swap'ta artar)."""
+        return self._active.version
+
+    @property
+    def is_loading(self) -> bool:
+        return self._loading
+
+    def add_swap_listener(self, listener: Callable[[int], None]) -> None:
+        """Swap sonrası yeni versiyonla çağrılacak callback ekle."""
+        self._listeners.append(listener)
+
+    @contextmanager
+    def acquire(self):
+        """Aktif agent'ı inference süresince kullanımda işaretle."""
+        with self._cond:
+            slot = self._active
+            slot.inflight += 1
+        try:
+            yield slot.agent
+        finally:
+            with self._cond:
+                slot.inflight -= 1
+                if slot.retired and slot.inflight == 0:
+                    self._cond.notify_all()
+
+    def load_async(self, path: str) -> Future:
+        """
+        Modeli arka planda yükle, ısıt ve swap et.
+
+        Returns:
+            Yeni versiyon numarasını taşıyan Future (hata olursa exception;
+            aktif model değişmez)
+        """
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        thread = threading.Thread(
+            target=self._load, args=(path, future), name="ModelSlotLoader", daemon=True
+        )
+        thread.start()
+        return future
+
+    def load(self, path: str, timeout: Optional[float] = None) -> int:
+        """Senkron yükleme (swap tamamlanana kadar bekler)."""
+        return self.load_async(path).result(timeout=timeout)
+
+    def _load(self, path: str, future: Future) -> None:
+        # Aynı anda tek yükleme; sıradaki yükleme öncekinin bitmesini bekler
+        with self._load_lock:
+            self._loading = True
+            try:
+                candidate = self.agent_factory(self._active.agent)
+                _load_for_serving(candidate, path, self.mmap_weights)
+                check_compatible(self._active.agent, candidate)
+                if self.warmup_steps > 0:
+                    warm_up_agent(candidate, self.warmup_batch_sizes, self.warmup_steps)
+                version = self.swap(candidate)
+            except Exception as e:
+                self._failed_loads += 1
+                self._last_error = str(e)
+                print(f"[ModelSlots] Failed to load {path}: {e}")
+                future.set_exception(e)
+                return
+            finally:
+                self._loading = False
+
+        print(f"[ModelSlots] Model v{version} active ({path})")
+        future.set_result(version)
+
+    def swap(self, agent: BaseAgent) -> int:
+        """
+        Hazır agent'ı aktif yap, eski slotu in-flight işler bitince bırak.
+
+        Returns:
+            Yeni versiyon
+        """
+        with self._cond:
+            old = self._active
+            self._active = _ModelSlot(agent, version=old.version + 1)
+            old.retired = True
+            self._swap_count += 1
+            version = self._active.version
+
+        for listener in self._listeners:
+            listener(version)
+
+        with self._cond:
+            drained = self._cond.wait_for(lambda: old.inflight == 0, timeout=self.drain_timeout)
+            if not drained:
+                print(f"[ModelSlots] v{old.version} still has {old.inflight} in-flight "
+                      f"requests after {self.drain_timeout}s, releasing anyway")
+            old.agent = None
+
+        return version
+
+    def get_stats(self) -> Dict:
+        """Slot istatistikleri."""
+        return {
+            "version": self.version,
+            "agent": self.active.name,
+            "loading": self._loading,
+            "inflight": self._active.inflight,
+            "swap_count": self._swap_count,
+            "failed_loads": self._failed_loads,
+            "last_error": self._last_error
+        }
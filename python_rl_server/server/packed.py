@@ -0,0 +1,104 @@
+"""
+Packed Tensor Encoding
+TÜBİTAK İP-2 AI Bot System
+
+GetActionsPacked RPC için bytes payload <-> numpy dönüşümleri.
+
+Nested GameState mesajlarını decode etmek yerine UE client observation
+matrisini tek bir düz buffer olarak gönderir:
+- observations: row-major, little-endian float32, N x obs_dim
+- actions: int8, N
+- confidences: little-endian float32, N (opsiyonel)
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+
+PACKED_SCHEMA_VERSION = 1
+
+OBS_DTYPE = np.dtype("<f4")
+ACTION_DTYPE = np.dtype("i1")
+CONFIDENCE_DTYPE = np.dtype("<f4")
+
+
+class PackedFormatError(ValueError):
+    """Payload şema/boyut uyuşmazlığı."""
+
+
+def unpack_observations(
+    payload: bytes,
+    num_rows: int,
+    obs_dim: int,
+    schema_version: int = PACKED_SCHEMA_VERSION
+) -> np.ndarray:
+    """
+    Bytes payload'ı kopyalamadan N x obs_dim float32 view'a çevir.
+
+    Dönen array read-only'dir (protobuf bytes buffer'ına bakar).
+
+    Raises:
+        PackedFormatError: Şema versiyonu veya boyut uyuşmazsa
+    """
+    if schema_version != PACKED_SCHEMA_VERSION:
+        raise PackedFormatError(
+            f"Unsupported schema_version {schema_version}, expected {PACKED_SCHEMA_VERSION}"
+        )
+
+    expected = num_rows * obs_dim * OBS_DTYPE.itemsize
+    if len(payload) != expected:
+        raise PackedFormatError(
+            f"Payload size {len(payload)} does not match {num_rows}x{obs_dim} float32 ({expected} bytes)"
+        )
+
+    return np.frombuffer(payload, dtype=OBS_DTYPE).reshape(num_rows, obs_dim)
+
+
+def pack_observations(observations: np.ndarray) -> Tuple[bytes, int, int]:
+    """
+    N x obs_dim matrisi payload'a çevir (client/test tarafı).
+
+    Returns:
+        (payload, num_rows, obs_dim)
+    """
+    observations = np.ascontiguousarray(observations, dtype=OBS_DTYPE)
+    if observations.ndim != 2:
+        raise PackedFormatError(f"Expected 2-D observation matrix, got shape {observations.shape}")
+    return observations.tobytes(), observations.shape[0], observations.shape[1]
+
+
+def pack_actions(
+    actions: np.ndarray,
+    confidences: Optional[np.ndarray] = None
+) -> Tuple[bytes, bytes]:
+    """Aksiyon (int8) ve opsiyonel confidence (float32) payload'ları."""
+    action_bytes = np.ascontiguousarray(actions, dtype=ACTION_DTYPE).tobytes()
+    confidence_bytes = b""
+    if confidences is not None:
+        confidence_bytes = np.ascontiguousarray(confidences, dtype=CONFIDENCE_DTYPE).tobytes()
+    return action_bytes, confidence_bytes
+
+
+def unpack_actions(
+    action_bytes: bytes,
+    confidence_bytes: bytes = b""
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Client tarafı: aksiyon ve confidence payload'larını array'e çevir."""
+    actions = np.frombuffer(action_bytes, dtype=ACTION_DTYPE)
+    confidences = None
+    if confidence_bytes:
+        confidences = np.frombuffer(confidence_bytes, dtype=CONFIDENCE_DTYPE)
+        if confidences.shape[0] != actions.shape[0]:
+            raise PackedFormatError(
+                f"{actions.shape[0]} actions but {confidences.shape[0]} confidences"
+            )
+    return actions, confidences
+
+
+def validate_bot_ids(bot_ids: Sequence[str], num_rows: int) -> List[str]:
+    """bot_ids boşsa satır indekslerinden üret, doluysa sayısını kontrol et."""
+    if not bot_ids:
+        return [str(i) for i in range(num_rows)]
+    if len(bot_ids) != num_rows:
+        raise PackedFormatError(f"{len(bot_ids)} bot_ids for {num_rows} rows")
+    return list(bot_ids)
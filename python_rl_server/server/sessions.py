@@ -0,0 +1,265 @@
+"""
+Session Table
+TÜBİTAK İP-2 AI Bot System
+
+bot_id başına oturum durumu (episode sayacı, adım sayısı, son görülme,
+recurrent/stacked state slotu).
+
+Durum bot başına Python nesnesi yerine önceden ayrılmış numpy
+dizilerinde tutulur; bot_id -> satır eşlemesi bir dict ve boş satırlar
+bir free-list'tir. Belirli süre istek göndermeyen oturumlar arka plan
+thread'iyle düşürülür, böylece uzun süre çalışan ve maçların sürekli
+açılıp kapandığı sunucuda bellek sabit kalır.
+
+obs_dim > 0 ise her oturum delta stream için son observation'ı da tutar
+(bkz. delta.py).
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .delta import apply_delta, apply_keyframe
+
+
+class SessionTable:
+    """Sabit kapasiteli, dizi tabanlı bot oturum tablosu."""
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        idle_timeout: float = 120.0,
+        state_dim: int = 0,
+        eviction_interval: float = 10.0,
+        obs_dim: int = 0
+    ):
+        """
+        Args:
+            capacity: Aynı anda tutulacak maksimum oturum; dolunca en uzun
+                süredir görülmeyen oturum düşürülür
+            idle_timeout: Bu süre (saniye) istek gelmeyen oturum düşürülür
+            state_dim: Oturum başına recurrent/stacked state float sayısı
+            eviction_interval: Idle tarama aralığı (saniye)
+            obs_dim: Delta stream için oturum başına cache'lenen observation
+                boyutu (0 = delta kapalı)
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self.state_dim = state_dim
+        self.eviction_interval = eviction_interval
+
+        self.episodes = np.zeros(capacity, dtype=np.int32)
+        self.steps = np.zeros(capacity, dtype=np.int32)
+        self.last_seen = np.zeros(capacity, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=np.bool_)
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.observations = np.zeros((capacity, obs_dim), dtype=np.float32)
+        # Son keyframe'den beri uygulanan delta sayısı (-1 = keyframe yok)
+        self.keyframe_age = np.full(capacity, -1, dtype=np.int32)
+
+        self._rows: Dict[str, int] = {}
+        self._bot_ids: List[Optional[str]] = [None] * capacity
+        # Boş satırlar (pop ile en küçük indeksten başlanır)
+        self._free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+        self._evict_listeners: List[Callable[[str], None]] = []
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._created = 0
+        self._evicted = 0
+
+    def add_evict_listener(self, listener: Callable[[str], None]) -> None:
+        """Oturum düşürüldüğünde bot_id ile çağrılacak callback ekle."""
+        self._evict_listeners.append(listener)
+
+    def touch(self, bot_id: str) -> int:
+        """
+        Botun adımını kaydet (oturum yoksa aç).
+
+        Returns:
+            Oturumun satır indeksi
+        """
+        now = time.monotonic()
+        evicted = None
+        with self._lock:
+            row = self._rows.get(bot_id)
+            if row is None:
+                row, evicted = self._allocate_locked(bot_id)
+            self.steps[row] += 1
+            self.last_seen[row] = now
+        if evicted is not None:
+            self._notify(evicted)
+        return row
+
+    def _allocate_locked(self, bot_id: str):
+        evicted = None
+        if not self._free:
+            # Tablo dolu: en uzun süredir görülmeyen oturumu düşür
+            oldest = int(np.argmin(np.where(self.active, self.last_seen, np.inf)))
+            evicted = self._bot_ids[oldest]
+            self._release_locked(evicted)
+        row = self._free.pop()
+        self._rows[bot_id] = row
+        self._bot_ids[row] = bot_id
+        self.active[row] = True
+        self.episodes[row] = 0
+        self.steps[row] = 0
+        self.states[row] = 0.0
+        self.keyframe_age[row] = -1
+        self._created += 1
+        return row, evicted
+
+    def _release_locked(self, bot_id: str) -> None:
+        row = self._rows.pop(bot_id)
+        self._bot_ids[row] = None
+        self.active[row] = False
+        self._free.append(row)
+        self._evicted += 1
+
+    def _notify(self, bot_id: str) -> None:
+        for listener in self._evict_listeners:
+            try:
+                listener(bot_id)
+            except Exception as e:
+                print(f"[SessionTable] Evict listener failed for {bot_id}: {e}")
+
+    def end_episode(self, bot_id: str) -> int:
+        """
+        Botun episode'unu kapat (adım sayacı ve state sıfırlanır).
+
+        Returns:
+            Tamamlanan episode sayısı (oturum yoksa 0)
+        """
+        with self._lock:
+            row = self._rows.get(bot_id)
+            if row is None:
+                return 0
+            self.episodes[row] += 1
+            self.steps[row] = 0
+            self.states[row] = 0.0
+            return int(self.episodes[row])
+
+    def patch_observation(
+        self,
+        bot_id: str,
+        keyframe: bool,
+        changed_mask: bytes,
+        values: bytes
+    ) -> Tuple[Optional[np.ndarray], int]:
+        """
+        Delta/keyframe'i oturumun cache'lenmiş observation'ına uygula.
+
+        Returns:
+            (güncel observation kopyası, son keyframe'den beri delta sayısı);
+            oturumda keyframe yoksa (yeni/düşürülmüş oturum) (None, -1)
+
+        Raises:
+            DeltaFormatError: Payload bozuksa (oturum keyframe bekler hale gelir)
+        """
+        evicted = None
+        try:
+            with self._lock:
+                row = self._rows.get(bot_id)
+                if row is None:
+                    row, evicted = self._allocate_locked(bot_id)
+                observation = self.observations[row]
+                if keyframe:
+                    apply_keyframe(observation, values)
+                    self.keyframe_age[row] = 0
+                elif self.keyframe_age[row] < 0:
+                    return None, -1
+                else:
+                    try:
+                        apply_delta(observation, changed_mask, values)
+                    except ValueError:
+                        self.keyframe_age[row] = -1
+                        raise
+                    self.keyframe_age[row] += 1
+                return observation.copy(), int(self.keyframe_age[row])
+        finally:
+            if evicted is not None:
+                self._notify(evicted)
+
+    def get(self, bot_id: str) -> Optional[Dict]:
+        """Oturum bilgisi (yoksa None)."""
+        with self._lock:
+            row = self._rows.get(bot_id)
+            if row is None:
+                return None
+            return {
+                "bot_id": bot_id,
+                "episode": int(self.episodes[row]),
+                "step": int(self.steps[row]),
+                "idle_seconds": time.monotonic() - self.last_seen[row]
+            }
+
+    def state(self, bot_id: str) -> Optional[np.ndarray]:
+        """Botun state slotu (in-place güncellenebilir view)."""
+        row = self._rows.get(bot_id)
+        return self.states[row] if row is not None else None
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """
+        idle_timeout'u aşan oturumları düşür.
+
+        Returns:
+            Düşürülen bot_id'ler
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = np.flatnonzero(self.active & (now - self.last_seen > self.idle_timeout))
+            evicted = [self._bot_ids[row] for row in idle]
+            for bot_id in evicted:
+                self._release_locked(bot_id)
+        for bot_id in evicted:
+            self._notify(bot_id)
+        return evicted
+
+    def start(self) -> None:
+        """Idle eviction thread'ini başlat."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="SessionEvictor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Idle eviction thread'ini durdur."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.eviction_interval + 1.0)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(self.eviction_interval):
+            try:
+                evicted = self.evict_idle()
+                if evicted:
+                    print(f"[SessionTable] Evicted {len(evicted)} idle sessions")
+            except Exception as e:
+                print(f"[SessionTable] Eviction failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, bot_id: str) -> bool:
+        return bot_id in self._rows
+
+    def get_stats(self) -> Dict:
+        """Tablo istatistikleri."""
+        return {
+            "sessions": len(self._rows),
+            "capacity": self.capacity,
+            "created": self._created,
+            "evicted": self._evicted,
+            "bytes": sum(a.nbytes for a in (
+                self.episodes, self.steps, self.last_seen, self.active, self.states,
+                self.observations, self.keyframe_age
+            ))
+        }
@@ -0,0 +1,260 @@
+"""
+GameState Codec
+TÜBİTAK İP-2 AI Bot System
+
+GameState mesajı <-> observation dönüşümü.
+
+İki yerleşim desteklenir (servis edilen agent'ın observation_dim'ine
+göre seçilir):
+- COMBAT_LAYOUT (64): environments/observation.py ObservationBuilder
+- CALYPSO_LAYOUT (96): environments/calypso_observation.py
+  CalypsoObservationBuilder; standart alanlara ek olarak CALYPSO-özel
+  alanlar ve GameState.tactical okunur
+
+Alan sırası builder'ların layout'u ile birebir aynıdır; isimler proto
+alan isimleridir. Hem derlenmiş proto mesajları hem de aynı attribute'lara
+sahip herhangi bir nesne (ör. SimpleNamespace) ile çalışır.
+"""
+
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import numpy as np
+
+from ..environments import CalypsoObservationBuilder, ObservationBuilder
+
+
+SELF_STATE_FIELDS = (
+    "health", "armor", "ammo_primary", "ammo_secondary",
+    "pos_x", "pos_y", "pos_z",
+    "rotation_yaw", "rotation_pitch",
+    "velocity_x", "velocity_y", "velocity_z",
+    "is_in_cover", "is_reloading", "is_aiming",
+    "time_since_last_damage",
+)
+
+ENEMY_FIELDS = (
+    "distance", "angle", "health_estimate", "is_visible",
+    "is_in_cover", "threat_level", "velocity_towards_me", "is_aiming_at_me",
+)
+
+ENVIRONMENT_FIELDS = (
+    "cover1_distance", "cover1_angle", "cover2_distance", "cover2_angle",
+    "cover3_distance", "cover3_angle", "cover4_distance", "cover4_angle",
+    "objective_distance", "objective_angle", "objective_progress",
+    "danger_zone_distance", "danger_zone_angle",
+    "time_in_combat", "enemies_in_range", "allies_in_range",
+)
+
+TEAM_FIELDS = (
+    "team_health_avg", "team_alive_ratio",
+    "nearest_ally_distance", "nearest_ally_angle",
+    "team_objective_progress", "team_kills", "team_deaths", "support_needed",
+)
+
+# CALYPSO-özel alanlar (standart alanların arkasına eklenir)
+CALYPSO_SELF_STATE_FIELDS = SELF_STATE_FIELDS + (
+    "current_tier", "alarm_level", "area_type", "combat_phase",
+)
+CALYPSO_ENEMY_FIELDS = ENEMY_FIELDS + (
+    "tier", "has_shield", "shield_hp", "weapon_type",
+)
+CALYPSO_ENVIRONMENT_FIELDS = ENVIRONMENT_FIELDS + (
+    "spider_mine_nearby", "boss_phase", "shield_enemies_count", "flank_route_available",
+)
+TACTICAL_FIELDS = tuple(CalypsoObservationBuilder().tactical_info)
+
+MAX_ENEMIES = ObservationBuilder.MAX_ENEMIES
+OBSERVATION_DIM = ObservationBuilder.OBSERVATION_DIM
+
+
+class StateLayout:
+    """
+    GameState alanlarının observation vektöründeki yerleşimi.
+
+    Sıra: self_state, enemies (max_enemies slot), environment, team_state,
+    tactical. Görülmeyen düşman slotları default_enemy ile doldurulur.
+    """
+
+    def __init__(
+        self,
+        self_fields,
+        enemy_fields,
+        environment_fields,
+        team_fields,
+        tactical_fields,
+        max_enemies: int,
+        default_enemy: np.ndarray
+    ):
+        self.self_fields = tuple(self_fields)
+        self.enemy_fields = tuple(enemy_fields)
+        self.environment_fields = tuple(environment_fields)
+        self.team_fields = tuple(team_fields)
+        self.tactical_fields = tuple(tactical_fields)
+        self.max_enemies = max_enemies
+        self.default_enemy = np.asarray(default_enemy, dtype=np.float32)
+
+        self.enemy_offset = len(self.self_fields)
+        self.environment_offset = self.enemy_offset + max_enemies * len(self.enemy_fields)
+        self.team_offset = self.environment_offset + len(self.environment_fields)
+        self.tactical_offset = self.team_offset + len(self.team_fields)
+        self.observation_dim = self.tactical_offset + len(self.tactical_fields)
+
+    def field_indices(self) -> Dict[str, int]:
+        """'bölüm.alan' (düşmanlar: 'enemies[i].alan') -> observation indeksi."""
+        indices = {}
+        sections = (
+            ("self_state", self.self_fields, 0),
+            ("environment", self.environment_fields, self.environment_offset),
+            ("team_state", self.team_fields, self.team_offset),
+            ("tactical", self.tactical_fields, self.tactical_offset),
+        )
+        for section, fields, offset in sections:
+            for i, name in enumerate(fields):
+                indices[f"{section}.{name}"] = offset + i
+        for slot in range(self.max_enemies):
+            offset = self.enemy_offset + slot * len(self.enemy_fields)
+            for i, name in enumerate(self.enemy_fields):
+                indices[f"enemies[{slot}].{name}"] = offset + i
+        return indices
+
+
+COMBAT_LAYOUT = StateLayout(
+    SELF_STATE_FIELDS, ENEMY_FIELDS, ENVIRONMENT_FIELDS, TEAM_FIELDS, (),
+    max_enemies=MAX_ENEMIES,
+    default_enemy=ObservationBuilder().build()[16:24]
+)
+
+CALYPSO_LAYOUT = StateLayout(
+    CALYPSO_SELF_STATE_FIELDS, CALYPSO_ENEMY_FIELDS, CALYPSO_ENVIRONMENT_FIELDS, TEAM_FIELDS,
+    TACTICAL_FIELDS,
+    max_enemies=CalypsoObservationBuilder.MAX_ENEMIES,
+    default_enemy=CalypsoObservationBuilder().build()[20:32]
+)
+
+LAYOUTS = {layout.observation_dim: layout for layout in (COMBAT_LAYOUT, CALYPSO_LAYOUT)}
+
+
+def layout_for(obs_dim: int) -> StateLayout:
+    """
+    observation_dim boyutlu agent'ın GameState yerleşimi.
+
+    Raises:
+        ValueError: Bu boyut için GameState yerleşimi yoksa
+    """
+    layout = LAYOUTS.get(int(obs_dim))
+    if layout is None:
+        raise ValueError(
+            f"No GameState layout for observation_dim {obs_dim} "
+            f"(supported: {', '.join(str(dim) for dim in sorted(LAYOUTS))})"
+        )
+    return layout
+
+
+def layout_projection(source: StateLayout, target: StateLayout) -> np.ndarray:
+    """
+    source observation'ından target observation'ını seçen indeksler.
+
+    observations[:, layout_projection(CALYPSO_LAYOUT, COMBAT_LAYOUT)]
+    96-dim satırlardan standart 64-dim satırları verir.
+
+    Raises:
+        ValueError: target'ın bir alanı source'ta yoksa
+    """
+    source_indices = source.field_indices()
+    target_indices = target.field_indices()
+    missing = [name for name in target_indices if name not in source_indices]
+    if missing:
+        raise ValueError(f"{len(missing)} fields missing from source layout, e.g. {missing[0]}")
+    projection = np.empty(target.observation_dim, dtype=np.intp)
+    for name, index in target_indices.items():
+        projection[index] = source_indices[name]
+    return projection
+
+
+def _read_fields(message, fields, out: np.ndarray, offset: int) -> None:
+    for i, name in enumerate(fields):
+        out[offset + i] = getattr(message, name)
+
+
+def game_state_to_observation(
+    game_state,
+    out: Optional[np.ndarray] = None,
+    layout: StateLayout = COMBAT_LAYOUT
+) -> np.ndarray:
+    """
+    GameState -> layout.observation_dim boyutlu float32 observation.
+
+    Args:
+        game_state: GameState mesajı (veya aynı alanlara sahip nesne)
+        out: Opsiyonel hedef buffer (satır olarak yazılır)
+        layout: COMBAT_LAYOUT (64) veya CALYPSO_LAYOUT (96), bkz. layout_for
+    """
+    if out is None:
+        out = np.empty(layout.observation_dim, dtype=np.float32)
+
+    _read_fields(game_state.self_state, layout.self_fields, out, 0)
+
+    enemies = list(game_state.enemies)[:layout.max_enemies]
+    num_fields = len(layout.enemy_fields)
+    for i in range(layout.max_enemies):
+        offset = layout.enemy_offset + i * num_fields
+        if i < len(enemies):
+            _read_fields(enemies[i], layout.enemy_fields, out, offset)
+        else:
+            out[offset:offset + num_fields] = layout.default_enemy
+
+    _read_fields(game_state.environment, layout.environment_fields, out, layout.environment_offset)
+    _read_fields(game_state.team_state, layout.team_fields, out, layout.team_offset)
+    if layout.tactical_fields:
+        _read_fields(game_state.tactical, layout.tactical_fields, out, layout.tactical_offset)
+    return out
+
+
+def _fields(fields, values, offset: int) -> dict:
+    return {name: float(values[offset + i]) for i, name in enumerate(fields)}
+
+
+def observation_to_game_state(
+    observation: np.ndarray,
+    bot_id: str = "",
+    player_id: str = "",
+    timestamp: int = 0,
+    messages=None
+):
+    """
+    Observation -> GameState (client/test tarafı).
+
+    Yerleşim observation boyutundan seçilir (64: combat, 96: CALYPSO).
+
+    Args:
+        observation: 64 veya 96 değer
+        messages: bot_service_pb2 modülü; None ise SimpleNamespace döner
+
+    Raises:
+        ValueError: Boyut için GameState yerleşimi yoksa
+    """
+    layout = layout_for(np.size(observation))
+    if messages is None:
+        messages = SimpleNamespace(
+            GameState=SimpleNamespace, BotSelfState=SimpleNamespace,
+            EnemyState=SimpleNamespace, EnvironmentState=SimpleNamespace,
+            TeamState=SimpleNamespace, TacticalState=SimpleNamespace
+        )
+
+    num_fields = len(layout.enemy_fields)
+    enemies = [
+        messages.EnemyState(**_fields(layout.enemy_fields, observation, layout.enemy_offset + i * num_fields))
+        for i in range(layout.max_enemies)
+    ]
+    sections = dict(
+        self_state=messages.BotSelfState(**_fields(layout.self_fields, observation, 0)),
+        enemies=enemies,
+        environment=messages.EnvironmentState(
+            **_fields(layout.environment_fields, observation, layout.environment_offset)),
+        team_state=messages.TeamState(**_fields(layout.team_fields, observation, layout.team_offset))
+    )
+    if layout.tactical_fields:
+        sections["tactical"] = messages.TacticalState(
+            **_fields(layout.tactical_fields, observation, layout.tactical_offset))
+    return messages.GameState(bot_id=bot_id, player_id=player_id, timestamp=timestamp, **sections)
@@ -0,0 +1,155 @@
+"""
+Resource Telemetry
+TÜBİTAK İP-2 AI Bot System
+
+Process kaynak kullanımını (CPU, RSS, thread sayısı) /proc'tan okuyan
+arka plan sampler'ı.
+
+Request path'e syscall eklememek için okuma sadece sampler thread'inde
+yapılır; HealthService.Check cache'lenmiş son snapshot'ı döndürür.
+Load balancer bu snapshot'a bakarak sıcak instance'lardan trafiği
+uzaklaştırabilir.
+"""
+
+import os
+import resource
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .metrics import Histogram, _bucket_quantile
+
+
+class ResourceSampler:
+    """
+    Periyodik process telemetrisi.
+
+    Snapshot alanları:
+        cpu_percent: Son aralıktaki CPU kullanımı (tek çekirdek = 100)
+        cpu_percent_total: Makinedeki tüm çekirdeklere göre normalize (0-100)
+        rss_bytes / rss_mb: Resident memory
+        thread_count: Process thread sayısı
+        queue_depth: Bekleyen inference sayısı
+        p99_latency_ms: Son aralıktaki RPC p99 gecikmesi
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        queue_depth_fn: Optional[Callable[[], int]] = None,
+        latency_histogram: Optional[Histogram] = None,
+        proc_path: str = "/proc/self"
+    ):
+        """
+        Args:
+            interval: Örnekleme aralığı (saniye)
+            queue_depth_fn: Anlık kuyruk derinliği
+            latency_histogram: p99 için RPC latency histogram'ı (aralık bazlı delta)
+            proc_path: /proc/<pid> dizini (Linux dışında getrusage kullanılır)
+        """
+        self.interval = interval
+        self.queue_depth_fn = queue_depth_fn
+        self.latency_histogram = latency_histogram
+        self.proc_path = proc_path
+
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page_size = resource.getpagesize()
+        self._cpu_count = os.cpu_count() or 1
+        self._has_proc = os.path.exists(os.path.join(proc_path, "stat"))
+
+        self._last_cpu: Optional[float] = None
+        self._last_wall: Optional[float] = None
+        self._last_latency_counts = None
+
+        self._snapshot: Dict = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.sample()
+
+    @property
+    def snapshot(self) -> Dict:
+        """Son snapshot (referans okuması; lock yok)."""
+        return self._snapshot
+
+    def start(self) -> None:
+        """Sampler thread'ini başlat."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="ResourceSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Sampler thread'ini durdur."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"[ResourceSampler] Sample error: {e}")
+
+    def _read_proc(self):
+        """(cpu_seconds, rss_bytes, thread_count) - /proc/self/stat'tan tek okuma."""
+        with open(os.path.join(self.proc_path, "stat"), "rb") as f:
+            data = f.read()
+        # comm alanı boşluk/parantez içerebilir; son ')' sonrasından parse et
+        fields = data[data.rindex(b")") + 2:].split()
+        # fields[0] = state (alan 3); utime=14, stime=15, num_threads=20, rss=24
+        utime = int(fields[11])
+        stime = int(fields[12])
+        num_threads = int(fields[17])
+        rss_pages = int(fields[21])
+        return (utime + stime) / self._clock_ticks, rss_pages * self._page_size, num_threads
+
+    def _read_rusage(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # ru_maxrss Linux'ta KiB; peak değer, RSS için kaba yaklaşım
+        return usage.ru_utime + usage.ru_stime, usage.ru_maxrss * 1024, threading.active_count()
+
+    def _recent_p99(self) -> float:
+        """Son örnekten bu yana gelen isteklerin p99'u (ms)."""
+        if self.latency_histogram is None:
+            return 0.0
+        counts, _, _ = self.latency_histogram.snapshot()
+        previous = self._last_latency_counts
+        self._last_latency_counts = counts
+        if previous is None:
+            delta = counts
+        else:
+            delta = [c - p for c, p in zip(counts, previous)]
+        total = sum(delta)
+        return _bucket_quantile(self.latency_histogram.buckets, delta, total, 0.99) * 1000
+
+    def sample(self) -> Dict:
+        """Bir örnek al ve snapshot'ı güncelle."""
+        now = time.monotonic()
+        if self._has_proc:
+            cpu_seconds, rss_bytes, thread_count = self._read_proc()
+        else:
+            cpu_seconds, rss_bytes, thread_count = self._read_rusage()
+
+        cpu_percent = 0.0
+        if self._last_cpu is not None and now > self._last_wall:
+            cpu_percent = 100.0 * (cpu_seconds - self._last_cpu) / (now - self._last_wall)
+        self._last_cpu = cpu_seconds
+        self._last_wall = now
+
+        snapshot = {
+            "cpu_percent": cpu_percent,
+            "cpu_percent_total": cpu_percent / self._cpu_count,
+            "rss_bytes": rss_bytes,
+            "rss_mb": rss_bytes / (1024 * 1024),
+            "thread_count": thread_count,
+            "queue_depth": int(self.queue_depth_fn()) if self.queue_depth_fn is not None else 0,
+            "p99_latency_ms": self._recent_p99(),
+            "sampled_at": time.time()
+        }
+        # Tek referans ataması - okuyucular her zaman tutarlı bir dict görür
+        self._snapshot = snapshot
+        return snapshot
@@ -0,0 +1,123 @@
+"""
+Request Tracing
+TÜBİTAK İP-2 AI Bot System
+
+BotAIServicer pipeline'ı için örneklemeli, aşama bazlı tracing.
+
+İsteklerin sample_rate kadarı için aşama zaman damgaları (decode,
+queue_wait, forward, fallback, encode) kaydedilir ve sabit boyutlu bir
+ring buffer'a yazılır. Buffer Chrome trace formatında (chrome://tracing,
+Perfetto) JSON olarak dökülebilir.
+
+Ring buffer lock kullanmaz: slot indeksi itertools.count'tan alınır ve
+liste elemanı ataması tek bytecode'dur (GIL altında atomik). Sampling
+kapalıyken istek başına maliyet tek bir float karşılaştırmasıdır.
+"""
+
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class RequestTrace:
+    """Tek isteğin aşama zaman damgaları (perf_counter saniyesi)."""
+
+    __slots__ = ("trace_id", "rpc", "thread_id", "start", "end", "num_rows", "spans")
+
+    def __init__(self, trace_id: int, rpc: str):
+        self.trace_id = trace_id
+        self.rpc = rpc
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = 0.0
+        self.num_rows = 0
+        # (aşama, başlangıç, bitiş) - batcher thread'i de ekleyebilir
+        self.spans: List = []
+
+    def span(self, stage: str, start: float, end: Optional[float] = None) -> None:
+        """Aşama ekle (end None ise şimdi)."""
+        self.spans.append((stage, start, time.perf_counter() if end is None else end))
+
+
+class Tracer:
+    """Örneklemeli tracer + lock-free ring buffer."""
+
+    def __init__(self, sample_rate: float = 0.0, capacity: int = 4096):
+        """
+        Args:
+            sample_rate: İzlenecek istek oranı (0 = kapalı, 1 = hepsi)
+            capacity: Ring buffer'da tutulacak son trace sayısı
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.sample_rate = sample_rate
+        self.capacity = capacity
+
+        self._ring: List[Optional[RequestTrace]] = [None] * capacity
+        self._cursor = itertools.count()
+        self._ids = itertools.count(1)
+        self._pid = os.getpid()
+
+    def start(self, rpc: str) -> Optional[RequestTrace]:
+        """İstek örneklenirse yeni trace, değilse None."""
+        rate = self.sample_rate
+        if rate <= 0.0 or (rate < 1.0 and random.random() >= rate):
+            return None
+        return RequestTrace(next(self._ids), rpc)
+
+    def finish(self, trace: RequestTrace) -> None:
+        """Trace'i kapat ve ring buffer'a yaz (en eskinin üzerine)."""
+        trace.end = time.perf_counter()
+        self._ring[next(self._cursor) % self.capacity] = trace
+
+    def traces(self) -> List[RequestTrace]:
+        """Buffer'daki trace'ler (başlangıç zamanına göre sıralı)."""
+        return sorted((t for t in list(self._ring) if t is not None), key=lambda t: t.start)
+
+    def clear(self) -> None:
+        self._ring = [None] * self.capacity
+
+    def to_chrome_trace(self) -> Dict:
+        """Chrome trace event formatı (complete 'X' event'leri, mikro saniye)."""
+        events = []
+        for trace in self.traces():
+            events.append({
+                "name": trace.rpc,
+                "cat": "rpc",
+                "ph": "X",
+                "ts": trace.start * 1e6,
+                "dur": (trace.end - trace.start) * 1e6,
+                "pid": self._pid,
+                "tid": trace.thread_id,
+                "args": {"trace_id": trace.trace_id, "rows": trace.num_rows}
+            })
+            for stage, start, end in list(trace.spans):
+                events.append({
+                    "name": stage,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": self._pid,
+                    "tid": trace.thread_id,
+                    "args": {"trace_id": trace.trace_id}
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> int:
+        """
+        Buffer'ı Chrome trace JSON dosyasına yaz.
+
+        Returns:
+            Yazılan trace sayısı
+        """
+        data = self.to_chrome_trace()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+        return sum(1 for e in data["traceEvents"] if e["cat"] == "rpc")
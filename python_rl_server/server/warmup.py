@@ -0,0 +1,48 @@
+"""
+Model Warm-up
+TÜBİTAK İP-2 AI Bot System
+
+İlk gerçek isteğin torch lazy init, allocator büyümesi ve kernel seçimi
+maliyetini ödememesi için modelleri sentetik batch'lerle ısıtır.
+"""
+
+import time
+from typing import Dict, Sequence
+
+import numpy as np
+
+from ..agents import BaseAgent
+
+
+DEFAULT_WARMUP_BATCH_SIZES = (1, 8, 32)
+
+
+def warm_up_agent(
+    agent: BaseAgent,
+    batch_sizes: Sequence[int] = DEFAULT_WARMUP_BATCH_SIZES,
+    iterations: int = 3,
+    seed: int = 0
+) -> Dict[int, float]:
+    """
+    Agent'ı beklenen her batch boyutunda sentetik observation'larla çalıştır.
+
+    Args:
+        agent: Isıtılacak agent
+        batch_sizes: Serving'de beklenen batch boyutları
+        iterations: Batch boyutu başına tekrar sayısı
+        seed: Sentetik observation RNG seed'i
+
+    Returns:
+        Batch boyutu -> son iterasyonun süresi (saniye)
+    """
+    rng = np.random.default_rng(seed)
+    timings: Dict[int, float] = {}
+
+    for batch_size in batch_sizes:
+        observations = rng.random((batch_size, agent.observation_dim), dtype=np.float32)
+        for _ in range(iterations):
+            start = time.perf_counter()
+            agent.select_actions(observations, deterministic=True)
+            timings[batch_size] = time.perf_counter() - start
+
+    return timings
@@ -0,0 +1,310 @@
+"""
+Multi-Process Inference Workers
+TÜBİTAK İP-2 AI Bot System
+
+GIL yüzünden tek process'te inference ~1 çekirdekle sınırlı kalıyor.
+Pre-fork modunda N worker process başlatılır; her biri kendi agent'ını
+yükler ve aynı portu SO_REUSEPORT ile paylaşır. Kernel bağlantıları
+worker'lar arasında dağıtır, supervisor çöken worker'ları yeniden başlatır.
+"""
+
+import multiprocessing as mp
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .warmup import DEFAULT_WARMUP_BATCH_SIZES
+
+
+@dataclass
+class WorkerConfig:
+    """Worker process'lerin agent/server kurulum parametreleri."""
+    model_path: Optional[str] = None
+    use_rule_based: bool = False
+    host: str = "0.0.0.0"
+    port: int = 50051
+    max_workers: int = 10         # Worker başına gRPC thread sayısı
+    heartbeat_interval: float = 1.0
+    metrics_port: Optional[int] = None  # Worker i, metrics_port + i kullanır
+    mmap_weights: bool = False    # Worker'lar model ağırlık sayfalarını paylaşır
+    rule_table: Optional[str] = None  # Rule-based agent için derlenmiş karar tablosu
+    torch_threads: Optional[int] = None  # Worker başına torch intra-op thread sayısı
+    action_cache: bool = False
+    cache_ttl_ms: float = 500.0
+    level_models: Optional[Dict[int, str]] = None  # Zorluk seviyesi -> model yolu
+    model_pool_bytes: int = 512 * 1024 * 1024     # Worker başına havuz bütçesi
+    warmup_batch_sizes: Optional[Tuple[int, ...]] = DEFAULT_WARMUP_BATCH_SIZES  # None = kapalı
+    trace_sample_rate: float = 0.0
+    trace_capacity: int = 4096
+    trace_dir: str = "./logs/traces"  # Dump dosya adları worker pid'ini içerir
+    experience_capacity: Optional[int] = None  # Worker başına store (None = kapalı)
+
+
+class WorkerStatusTable:
+    """
+    Worker'lar arası paylaşılan durum tablosu.
+
+    Shared memory array'leri üzerinde çalışır; her worker sadece kendi
+    slot'una yazar, bu yüzden lock gerekmez. Health RPC'ye hangi worker
+    cevap verirse versin tüm worker'ların toplu durumunu okuyabilir.
+    """
+
+    def __init__(self, num_workers: int, ctx=None):
+        ctx = ctx or mp.get_context()
+        self.num_workers = num_workers
+        self._heartbeats = ctx.Array('d', num_workers, lock=False)
+        self._pids = ctx.Array('i', num_workers, lock=False)
+        self._restarts = ctx.Array('i', num_workers, lock=False)
+        self._requests = ctx.Array('q', num_workers, lock=False)
+
+    def heartbeat(self, index: int, request_count: int = 0) -> None:
+        """Worker canlılık sinyali."""
+        self._pids[index] = os.getpid()
+        self._requests[index] = request_count
+        self._heartbeats[index] = time.time()
+
+    def mark_dead(self, index: int) -> None:
+        """Worker slot'unu ölü olarak işaretle."""
+        self._heartbeats[index] = 0.0
+        self._pids[index] = 0
+
+    def record_restart(self, index: int) -> None:
+        """Restart sayacını artır (sadece supervisor yazar)."""
+        self._restarts[index] += 1
+
+    def summary(self, stale_after: float = 5.0) -> Dict:
+        """
+        Toplu worker durumu.
+
+        Args:
+            stale_after: Bu kadar saniye heartbeat gelmeyen worker ölü sayılır
+
+        Returns:
+            workers_total, workers_alive, restarts, request_count ve
+            worker bazlı detaylar
+        """
+        now = time.time()
+        workers = []
+        alive = 0
+        for i in range(self.num_workers):
+            is_alive = self._heartbeats[i] > 0 and now - self._heartbeats[i] <= stale_after
+            alive += int(is_alive)
+            workers.append({
+                "index": i,
+                "pid": self._pids[i],
+                "alive": is_alive,
+                "restarts": self._restarts[i],
+                "request_count": self._requests[i]
+            })
+
+        return {
+            "workers_total": self.num_workers,
+            "workers_alive": alive,
+            "restarts": sum(w["restarts"] for w in workers),
+            "request_count": sum(w["request_count"] for w in workers),
+            "workers": workers
+        }
+
+
+def _build_server(index: int, config: WorkerConfig):
+    """Worker'ın server'ını config'e göre kur (başlatmaz)."""
+    # Ağır import'lar child process'te yapılır (spawn)
+    from .grpc_server import serve
+
+    return serve(
+        model_path=config.model_path,
+        host=config.host,
+        port=config.port,
+        use_rule_based=config.use_rule_based,
+        max_workers=config.max_workers,
+        reuse_port=True,
+        metrics_port=(config.metrics_port + index
+                      if config.metrics_port is not None else None),
+        level_models=config.level_models,
+        model_pool_bytes=config.model_pool_bytes,
+        mmap_weights=config.mmap_weights,
+        rule_table=config.rule_table,
+        torch_threads=config.torch_threads,
+        action_cache=config.action_cache,
+        cache_ttl_ms=config.cache_ttl_ms,
+        warmup_batch_sizes=config.warmup_batch_sizes,
+        trace_sample_rate=config.trace_sample_rate,
+        trace_capacity=config.trace_capacity,
+        trace_dir=config.trace_dir,
+        experience_capacity=config.experience_capacity
+    )
+
+
+def _worker_main(index: int, config: WorkerConfig, status: WorkerStatusTable) -> None:
+    """Worker process giriş noktası - kendi agent'ını yükler ve server'ı başlatır."""
+    server = _build_server(index, config)
+    server.health_servicer.worker_status = status.summary
+
+    stop_event = threading.Event()
+
+    def _heartbeat_loop():
+        while not stop_event.is_set():
+            status.heartbeat(index, server.bot_servicer.get_stats()["request_count"])
+            stop_event.wait(config.heartbeat_interval)
+
+    def _handle_sigterm(sig, frame):
+        stop_event.set()
+        server.stop()
+
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    # kill -USR2 <worker pid>: worker'ın trace buffer'ını dök
+    if hasattr(signal, "SIGUSR2"):
+        signal.signal(signal.SIGUSR2, lambda sig, frame: server.dump_traces())
+
+    threading.Thread(target=_heartbeat_loop, daemon=True).start()
+    print(f"[Worker {index}] pid={os.getpid()} serving on {config.host}:{config.port}")
+    server.start(blocking=True)
+    stop_event.set()
+
+
+class WorkerSupervisor:
+    """
+    Pre-fork worker supervisor.
+
+    N worker process başlatır, periyodik olarak canlılıklarını kontrol eder
+    ve çökenleri backoff ile yeniden başlatır.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        config: WorkerConfig,
+        check_interval: float = 1.0,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 30.0,
+        start_method: str = "spawn"
+    ):
+        """
+        Args:
+            num_workers: Worker process sayısı (genelde çekirdek sayısı)
+            config: Worker kurulum parametreleri
+            check_interval: Supervisor kontrol periyodu (saniye)
+            restart_backoff: İlk restart bekleme süresi (saniye)
+            max_restart_backoff: Maksimum restart bekleme süresi
+            start_method: multiprocessing start method ("spawn" torch/gRPC için güvenli)
+        """
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be >= 1, got {num_workers}")
+
+        self.num_workers = num_workers
+        self.config = config
+        self.check_interval = check_interval
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+
+        self._ctx = mp.get_context(start_method)
+        self.status = WorkerStatusTable(num_workers, ctx=self._ctx)
+
+        self._processes: List[Optional[mp.Process]] = [None] * num_workers
+        self._next_restart: List[float] = [0.0] * num_workers
+        self._backoff: List[float] = [restart_backoff] * num_workers
+        self._started_at: List[float] = [0.0] * num_workers
+        self._stop_event = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
+
+    def _spawn(self, index: int) -> None:
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self.config, self.status),
+            name=f"calypso-worker-{index}",
+            daemon=False
+        )
+        process.start()
+        self._processes[index] = process
+        self._started_at[index] = time.time()
+
+    def start(self, blocking: bool = True) -> None:
+        """
+        Tüm worker'ları başlat.
+
+        Args:
+            blocking: True ise supervisor döngüsü bu thread'de çalışır
+        """
+        print(f"[WorkerSupervisor] Starting {self.num_workers} workers on "
+              f"{self.config.host}:{self.config.port}...")
+        for i in range(self.num_workers):
+            self._spawn(i)
+
+        if blocking:
+            try:
+                self._monitor_loop()
+            except KeyboardInterrupt:
+                self.stop()
+        else:
+            self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self._monitor_thread.start()
+
+    def _monitor_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self.check_workers()
+            self._stop_event.wait(self.check_interval)
+
+    def check_workers(self) -> int:
+        """
+        Ölü worker'ları tespit et ve yeniden başlat.
+
+        Returns:
+            Bu turda yeniden başlatılan worker sayısı
+        """
+        restarted = 0
+        now = time.time()
+
+        for i, process in enumerate(self._processes):
+            if process is None or process.is_alive() or self._stop_event.is_set():
+                continue
+
+            if self._next_restart[i] == 0.0:
+                # Yeni tespit edildi - backoff planla
+                print(f"[WorkerSupervisor] Worker {i} (pid={process.pid}) exited "
+                      f"with code {process.exitcode}, restarting in {self._backoff[i]:.1f}s")
+                self.status.mark_dead(i)
+                self._next_restart[i] = now + self._backoff[i]
+                self._backoff[i] = min(self._backoff[i] * 2, self.max_restart_backoff)
+                continue
+
+            if now >= self._next_restart[i]:
+                process.join(timeout=0)
+                self._spawn(i)
+                self.status.record_restart(i)
+                self._next_restart[i] = 0.0
+                restarted += 1
+
+        # Uzun süre ayakta kalan worker'ların backoff'unu sıfırla
+        for i, process in enumerate(self._processes):
+            if process is not None and process.is_alive() and \
+                    now - self._started_at[i] > self.max_restart_backoff:
+                self._backoff[i] = self.restart_backoff
+
+        return restarted
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Tüm worker'ları SIGTERM ile durdur."""
+        print("[WorkerSupervisor] Stopping workers...")
+        self._stop_event.set()
+
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+
+        deadline = time.time() + timeout
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(timeout=max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+        print("[WorkerSupervisor] All workers stopped.")
+
+    def get_stats(self) -> Dict:
+        """Supervisor istatistikleri."""
+        return self.status.summary(stale_after=self.config.heartbeat_interval * 5)
@@ -6,8 +6,12 @@ TÜBİTAK İP-2 AI Bot System
 import pytest
 import numpy as np
 
-from python_rl_server.agents import PPOAgent, RuleBasedAgent, BaseAgent
-from python_rl_server.environments import MockCombatEnv
+from python_rl_server.agents import (
+    PPOAgent, RuleBasedAgent, RuleDecisionTable, ServingAgent, NumpyPolicyAgent, BaseAgent,
+    export_policy, export_numpy_policy
+)
+from python_rl_server.agents.base_agent import action_names
+from python_rl_server.environments import MockCombatEnv, CalypsoMockEnv, CalypsoAction
 
 
 class TestRuleBasedAgent:
@@ -31,6 +35,15 @@ class TestRuleBasedAgent:
         assert 0 <= action <= 8
         assert "utility_ATTACK" in info or "utility_IDLE" in info
 
+    def test_action_names_follow_action_dim(self):
+        """Aksiyon isimleri aksiyon uzayına göre seçilmeli ve tekil olmalı."""
+        calypso = RuleBasedAgent(observation_dim=96, action_dim=16)
+
+        assert [calypso.get_action_name(a) for a in range(16)] == [a.name for a in CalypsoAction]
+        assert RuleBasedAgent().get_action_name(7) == "SUPPORT"
+        assert calypso.get_action_name(16) == "ACTION_16"
+        assert len(set(action_names(12))) == 12
+
     def test_stochastic_selection(self):
         """Stochastic aksiyon seçimi testi."""
         agent = RuleBasedAgent()
@@ -63,6 +76,119 @@ class TestRuleBasedAgent:
         # Aggressive agent'ın ATTACK utility'si daha yüksek olmalı
         assert agg_info.get("utility_ATTACK", 0) >= caut_info.get("utility_ATTACK", 0)
 
+    def test_batch_matches_single(self):
+        """select_actions satır satır select_action ile aynı sonucu vermeli."""
+        agent = RuleBasedAgent(aggression=0.7, caution=0.3)
+        observations = np.random.rand(256, 64).astype(np.float32)
+        # Eşik değerlerine denk gelen satırlar
+        observations[::4] = np.round(observations[::4] * 4) / 4
+
+        actions, info = agent.select_actions(observations, deterministic=True)
+
+        assert actions.shape == (256,)
+        for i, obs in enumerate(observations):
+            action, row = agent.select_action(obs, deterministic=True)
+            assert actions[i] == action
+            assert info["selected_action"][i] == row["selected_action"]
+            for name in agent.ACTION_NAMES:
+                assert info[f"utility_{name}"][i] == row[f"utility_{name}"]
+
+    def test_batch_stochastic(self):
+        """Stochastic batch seçimi geçerli ve çeşitli aksiyonlar üretmeli."""
+        agent = RuleBasedAgent()
+        observations = np.tile(np.random.rand(64).astype(np.float32), (200, 1))
+
+        actions, _ = agent.select_actions(observations, deterministic=False)
+
+        assert actions.min() >= 0 and actions.max() <= 8
+        assert len(set(actions.tolist())) > 1
+
+    def test_small_batch_and_short_observations(self):
+        """Küçük batch (skaler yol) ve kısa observation'lar kolon yolu ile aynı olmalı."""
+        agent = RuleBasedAgent(team_focus=0.8)
+        observations = np.random.rand(agent.SCALAR_BATCH_LIMIT + 1, 64).astype(np.float32)
+
+        for width in (64, 30, 10):
+            batch = observations[:, :width]
+            utilities = agent._utilities_batch(batch)
+            _, small = agent.select_actions(batch[:4])
+            for i, name in enumerate(agent.ACTION_NAMES):
+                np.testing.assert_array_equal(small[f"utility_{name}"], utilities[:4, i])
+            assert tuple(utilities[0]) == agent._utilities_row(batch[0].tolist())
+
+        action, info = agent.select_action(observations[0], return_info=False)
+        assert info == {} and 0 <= action <= 8
+
+    def test_stochastic_single_matches_batch(self):
+        """Aynı seed ile skaler ve batch sampling aynı aksiyonları seçmeli."""
+        agent = RuleBasedAgent()
+        observations = np.random.rand(64, 64).astype(np.float32)
+
+        np.random.seed(3)
+        single = [agent.select_action(obs, deterministic=False)[0] for obs in observations]
+        np.random.seed(3)
+        batch, _ = agent.select_actions(observations, deterministic=False)
+
+        assert batch.tolist() == single
+
+
+    def test_single_observation_batch(self):
+        """Tek 1-D observation tek karar olarak işlenmeli."""
+        agent = RuleBasedAgent()
+        obs = np.random.rand(64).astype(np.float32)
+
+        actions, info = agent.select_actions(obs)
+
+        assert actions.tolist() == [agent.select_action(obs, deterministic=True)[0]]
+        assert all(len(column) == 1 for column in info.values())
+
+        agent.compile(resolution=4)
+        assert agent.decision_table.error_report(agent, obs)["samples"] == 1
+        assert len(agent.select_actions(obs)[0]) == 1
+
+
+class TestRuleDecisionTable:
+    """Derlenmiş rule-based karar tablosu testleri."""
+
+    @pytest.fixture
+    def compiled(self):
+        """Düşük çözünürlükle derlenmiş agent."""
+        agent = RuleBasedAgent(aggression=0.7)
+        agent.compile(resolution=4)
+        return agent
+
+    def test_matches_exact_utilities(self, compiled):
+        """Tablo aksiyonları çoğunlukla tam argmax ile aynı, batch ve skaler lookup tutarlı."""
+        observations = np.random.rand(2000, 64).astype(np.float32)
+        report = compiled.decision_table.error_report(compiled, observations)
+        assert report["agreement"] > 0.85
+        assert report["regret_max"] < 0.2
+
+        actions, info = compiled.select_actions(observations)
+        assert set(info) == {"selected_action"}
+        single = [compiled.select_action(obs)[0] for obs in observations[:100]]
+        assert actions[:100].tolist() == single
+        small, _ = compiled.select_actions(observations[:4])
+        assert small.tolist() == single[:4]
+
+    def test_save_load_and_personality(self, compiled, tmp_path):
+        """Tablo kaydedilip yüklenebilmeli; personality uyuşmazsa kullanılmamalı."""
+        path = str(tmp_path / "table.npz")
+        compiled.decision_table.save(path)
+        table = RuleDecisionTable.load(path)
+        np.testing.assert_array_equal(table.table, compiled.decision_table.table)
+
+        other = RuleBasedAgent()
+        with pytest.raises(ValueError):
+            other.set_decision_table(table)
+
+        agent = RuleBasedAgent(aggression=0.7)
+        agent.set_decision_table(table)
+        obs = np.random.rand(64).astype(np.float32)
+        assert set(agent.select_action(obs)[1]) == {"selected_action"}
+        agent.aggression = 0.2
+        assert "utility_ATTACK" in agent.select_action(obs)[1]
+
 
 class TestPPOAgent:
     """PPO Agent testleri."""
@@ -107,6 +233,172 @@ class TestPPOAgent:
 
         assert new_agent.model is not None
 
+    @pytest.mark.parametrize("mmap", [False, True])
+    def test_inference_only_load(self, agent, tmp_path, mmap):
+        """Env'siz inference-only yükleme tam yükleme ile aynı politikayı vermeli."""
+        save_path = str(tmp_path / "test_model")
+        agent.save(save_path)
+
+        served = PPOAgent(verbose=0)
+        served.load(save_path, inference_only=True, mmap=mmap)
+
+        assert not hasattr(served.model, "rollout_buffer")
+        observations = np.random.rand(16, 64).astype(np.float32)
+        expected, expected_info = agent.select_actions(observations, deterministic=True)
+        actions, info = served.select_actions(observations, deterministic=True)
+        np.testing.assert_array_equal(actions, expected)
+        np.testing.assert_allclose(info["value_estimate"], expected_info["value_estimate"], rtol=1e-6)
+        assert (tmp_path / "test_model.policy.pth").exists() == mmap
+        with pytest.raises(RuntimeError):
+            served.train(total_timesteps=1)
+
+    def test_load_uses_stored_spaces(self, tmp_path):
+        """96-dim CALYPSO modeli boyutları zip'ten almalı."""
+        trained = PPOAgent(verbose=0, n_steps=64)
+        trained.initialize(CalypsoMockEnv())
+        trained.save(str(tmp_path / "calypso"))
+
+        served = PPOAgent(verbose=0)
+        served.load(str(tmp_path / "calypso"), inference_only=True)
+
+        assert served.observation_dim == 96
+        assert served.action_dim == trained.model.action_space.n
+        action, _ = served.select_action(np.zeros(96, dtype=np.float32), deterministic=True)
+        assert 0 <= action < served.action_dim
+
+    def test_select_actions_batch(self, agent):
+        """Batch forward satır satır sonuçla aynı olmalı, info kolon bazlı dönmeli."""
+        observations = np.random.rand(16, 64).astype(np.float32)
+
+        actions, info = agent.select_actions(observations, deterministic=True)
+
+        assert actions.shape == (16,) and info["value_estimate"].shape == (16,)
+        # 16 satırlık batch ve tek satır float32 matmul'da farklı toplama
+        # sırasıyla hesaplanır (~1e-7 fark). Sıfıra yakın değerlerde rel
+        # tolerans anlamsız kaldığı için birkaç ulp'lik abs tolerans gerekir.
+        for i, obs in enumerate(observations):
+            action, row = agent.select_action(obs, deterministic=True)
+            assert actions[i] == action
+            assert info["value_estimate"][i] == pytest.approx(row["value_estimate"], rel=1e-5, abs=1e-6)
+            assert info["prob_ATTACK"][i] == pytest.approx(row["prob_ATTACK"], rel=1e-5, abs=1e-6)
+
+    def test_fused_forward_matches_sb3(self, agent):
+        """Fused forward pass SB3 predict/get_distribution/predict_values ile aynı olmalı."""
+        import torch
+
+        obs = np.random.rand(64).astype(np.float32)
+        batch = obs.reshape(1, -1)
+        with torch.no_grad():
+            obs_tensor = torch.as_tensor(batch)
+            probs = agent.model.policy.get_distribution(obs_tensor).distribution.probs.numpy()[0]
+            value = agent.model.policy.predict_values(obs_tensor).item()
+
+        action, info = agent.select_action(obs, deterministic=True)
+
+        assert action == int(agent.model.predict(batch, deterministic=True)[0][0])
+        np.testing.assert_allclose(
+            [info[f"prob_{agent.get_action_name(i)}"] for i in range(agent.action_dim)], probs, rtol=1e-6)
+        assert info["value_estimate"] == pytest.approx(value, rel=1e-6)
+
+        # Sampling aynı RNG akışını kullanmalı
+        torch.manual_seed(0)
+        expected = [int(agent.model.predict(batch)[0][0]) for _ in range(10)]
+        torch.manual_seed(0)
+        assert [agent.select_action(obs)[0] for _ in range(10)] == expected
+
+    def test_exported_policy_matches(self, agent, tmp_path):
+        """Export edilen TorchScript politikası PPOAgent ile aynı sonucu vermeli."""
+        path = str(tmp_path / "policy.pt")
+        metadata = export_policy(agent, path, version="v1")
+
+        serving = ServingAgent(path)
+        assert serving.observation_dim == 64 and serving.action_dim == 9
+        assert serving.metadata["version"] == "v1"
+        assert serving.size_bytes == metadata["param_bytes"] > 0
+
+        observations = np.random.rand(32, 64).astype(np.float32)
+        expected, expected_info = agent.select_actions(observations, deterministic=True)
+        actions, info = serving.select_actions(observations, deterministic=True)
+        np.testing.assert_array_equal(actions, expected)
+        np.testing.assert_allclose(info["value_estimate"], expected_info["value_estimate"], rtol=1e-5)
+        np.testing.assert_allclose(info["prob_ATTACK"], expected_info["prob_ATTACK"], rtol=1e-5)
+
+        action, row = serving.select_action(observations[0], deterministic=True)
+        assert action == expected[0]
+        assert set(row) == set(agent.select_action(observations[0], deterministic=True)[1])
+
+    def test_quantized_export(self, agent, tmp_path):
+        """int8 export daha küçük olmalı ve float politikaya yakın kalmalı."""
+        float_meta = export_policy(agent, str(tmp_path / "float.pt"))
+        int8_meta = export_policy(agent, str(tmp_path / "int8.pt"), quantize=True)
+
+        serving = ServingAgent(str(tmp_path / "int8.pt"))
+        assert serving.metadata["quantized"] is True
+        assert int8_meta["param_bytes"] < float_meta["param_bytes"] / 3
+
+        observations = np.random.rand(64, 64).astype(np.float32)
+        _, expected = agent.select_actions(observations, deterministic=True)
+        _, info = serving.select_actions(observations, deterministic=True)
+        np.testing.assert_allclose(info["prob_ATTACK"], expected["prob_ATTACK"], atol=0.02)
+        np.testing.assert_allclose(info["value_estimate"], expected["value_estimate"], atol=0.1)
+
+    def test_numpy_policy_matches(self, agent, tmp_path):
+        """NumPy forward pass SB3 politikasıyla aynı sonucu vermeli."""
+        path = str(tmp_path / "policy.npz")
+        metadata = export_numpy_policy(agent, path, version="v1")
+        assert metadata["pi_activations"] == ["tanh", "tanh"]
+
+        numpy_agent = NumpyPolicyAgent(path, seed=0)
+        assert numpy_agent.size_bytes == metadata["param_bytes"] > 0
+
+        observations = np.random.rand(32, 64).astype(np.float32)
+        expected, expected_info = agent.select_actions(observations, deterministic=True)
+        actions, info = numpy_agent.select_actions(observations, deterministic=True)
+        np.testing.assert_array_equal(actions, expected)
+        np.testing.assert_allclose(info["value_estimate"], expected_info["value_estimate"], rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(info["prob_ATTACK"], expected_info["prob_ATTACK"], rtol=1e-5)
+
+        action, row = numpy_agent.select_action(observations[0], deterministic=True)
+        assert action == expected[0]
+        assert set(row) == set(expected_info)
+
+        # Aynı seed aynı örnekleri üretmeli
+        sampled = [numpy_agent.select_action(observations[0])[0] for _ in range(20)]
+        numpy_agent.rng = np.random.default_rng(0)
+        assert [numpy_agent.select_action(observations[0])[0] for _ in range(20)] == sampled
+
+
+class TestDistillation:
+    """Policy distillation testleri."""
+
+    def test_student_learns_teacher(self, tmp_path):
+        """Student KL'yi düşürmeli ve normal formatta yüklenebilmeli."""
+        from python_rl_server.training import DistillationConfig, PolicyDistiller
+
+        teacher = PPOAgent(verbose=0, n_steps=64)
+        teacher.initialize(CalypsoMockEnv(max_steps=200))
+        config = DistillationConfig(student_layers=[32], num_samples=800, epochs=4, batch_size=64)
+
+        distiller = PolicyDistiller(teacher, config)
+        distiller.collect()
+        student = distiller.train()
+
+        assert student.observation_dim == teacher.observation_dim == 96
+        assert distiller.history[-1]["kl"] < distiller.history[0]["kl"]
+        assert distiller.parameter_count(student) < distiller.parameter_count(teacher)
+        report = distiller.holdout_report()
+        assert report["samples"] == 80 and 0.0 <= report["action_agreement"] <= 1.0
+
+        path = str(tmp_path / "student")
+        student.save(path)
+        served = PPOAgent(verbose=0)
+        served.load(path, inference_only=True)
+        observations = distiller._holdout_obs
+        np.testing.assert_array_equal(
+            served.select_actions(observations, deterministic=True)[0],
+            student.select_actions(observations, deterministic=True)[0]
+        )
+
 
 class TestAgentInEnvironment:
     """Agent-Environment entegrasyon testleri."""
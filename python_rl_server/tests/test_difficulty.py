@@ -0,0 +1,105 @@
+"""
+Difficulty Tests
+TÜBİTAK İP-2 AI Bot System
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from python_rl_server.difficulty import DifficultyManager
+from python_rl_server.server.grpc_server import DifficultyServicer
+
+
+def _run_threads(num_threads, target):
+    """target(thread_index) fonksiyonunu paralel çalıştır, hataları topla."""
+    errors = []
+    barrier = threading.Barrier(num_threads)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class TestDifficultyConcurrency:
+    """DifficultyManager eşzamanlılık testleri."""
+
+    def test_register_race_single_tracker(self):
+        """Aynı oyuncuyu eşzamanlı kaydeden thread'ler aynı tracker'ı görmeli."""
+        manager = DifficultyManager()
+        seen = [None] * 16
+
+        def target(index):
+            seen[index] = manager.get_tracker("new_player")
+
+        assert _run_threads(16, target) == []
+        assert all(tracker is seen[0] for tracker in seen)
+
+    def test_stress_no_lost_updates(self):
+        """Paylaşılan ve ayrık oyuncularda güncelleme kaybolmamalı."""
+        manager = DifficultyManager()
+        servicer = DifficultyServicer(manager)
+        num_threads, updates = 8, 500
+        shared = ["shared_0", "shared_1"]
+
+        def target(index):
+            for i in range(updates):
+                player_id = shared[i % 2] if i % 4 < 2 else f"solo_{index}"
+                servicer.UpdatePlayerMetrics(
+                    SimpleNamespace(player_id=player_id, recent_kills=1, recent_deaths=0), None)
+                if i % 50 == 0:
+                    servicer.SetDifficulty(SimpleNamespace(player_id=player_id, difficulty_level=4), None)
+
+        assert _run_threads(num_threads, target) == []
+
+        total = num_threads * updates
+        history = manager._difficulty_history
+        assert set(history) == {"shared_0", "shared_1"} | {f"solo_{i}" for i in range(num_threads)}
+        assert sum(len(h) for h in history.values()) == total
+        assert len(history["shared_0"]) == len(history["shared_1"]) == total // 4
+        assert all(len(history[f"solo_{i}"]) == updates // 2 for i in range(num_threads))
+
+    def test_info_consistent_with_level(self):
+        """Eşzamanlı set_difficulty sırasında info tutarlı kalmalı."""
+        manager = DifficultyManager()
+        manager.register_player("p")
+        stop = threading.Event()
+
+        def writer():
+            level = 1
+            while not stop.is_set():
+                manager.set_difficulty("p", level)
+                level = level % 7 + 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                info = manager.get_difficulty_info("p")
+                assert info["difficulty_level"] == int(info["difficulty_continuous"] * 6) + 1
+        finally:
+            stop.set()
+            thread.join()
+
+    @pytest.mark.parametrize("num_lock_stripes", [1, 64])
+    def test_stripe_count(self, num_lock_stripes):
+        """Tek şeritle de (global lock) doğru çalışmalı."""
+        manager = DifficultyManager(num_lock_stripes=num_lock_stripes)
+
+        def target(index):
+            for _ in range(100):
+                manager.record_metrics(f"p{index % 3}", kills=1)
+
+        assert _run_threads(6, target) == []
+        assert sum(len(h) for h in manager._difficulty_history.values()) == 600
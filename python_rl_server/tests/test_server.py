@@ -0,0 +1,1281 @@
+"""
+Server Tests
+TÜBİTAK İP-2 AI Bot System
+"""
+
+import json
+import os
+import signal
+import socket
+import threading
+import time
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+
+from python_rl_server.agents import BaseAgent, RuleBasedAgent
+from python_rl_server.server.grpc_server import (
+    AdminServicer, BotAIServer, BotAIServicer, HealthServicer, TrainingServicer
+)
+from python_rl_server.server.action_cache import ActionCache
+from python_rl_server.server.model_slots import ModelSlots, check_compatible
+from python_rl_server.server.model_pool import ModelPool
+from python_rl_server.server.telemetry import ResourceSampler
+from python_rl_server.server.state_codec import (
+    CALYPSO_LAYOUT, COMBAT_LAYOUT, game_state_to_observation, layout_projection, observation_to_game_state
+)
+from python_rl_server.server.warmup import warm_up_agent
+from python_rl_server.server.tracing import Tracer
+from python_rl_server.server.experience import ExperienceCollector, ExperienceStore
+from python_rl_server.server.sessions import SessionTable
+from python_rl_server.server.delta import DeltaFormatError, apply_delta, encode_delta, encode_keyframe
+from python_rl_server.environments import CalypsoMockEnv, CalypsoObservationBuilder, ObservationBuilder
+from python_rl_server.server.metrics import MetricsRegistry, MetricsHTTPServer
+from python_rl_server.server.batching import InferenceBatcher, DeadlineExceededError
+from python_rl_server.server.packed import (
+    PackedFormatError, pack_observations, unpack_observations, unpack_actions
+)
+from python_rl_server.server.workers import WorkerStatusTable, WorkerSupervisor, WorkerConfig, _build_server
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestWorkers:
+    """Multi-process worker testleri."""
+
+    def test_status_table_summary(self):
+        """Heartbeat gönderen worker'lar canlı sayılmalı."""
+        table = WorkerStatusTable(3)
+        table.heartbeat(0, request_count=10)
+        table.heartbeat(2, request_count=5)
+
+        summary = table.summary(stale_after=5.0)
+
+        assert summary["workers_total"] == 3
+        assert summary["workers_alive"] == 2
+        assert summary["request_count"] == 15
+        assert summary["workers"][1]["alive"] is False
+
+    def test_mark_dead_and_restart(self):
+        """Ölü işaretlenen worker canlı sayılmamalı, restart sayılmalı."""
+        table = WorkerStatusTable(2)
+        table.heartbeat(0)
+        table.heartbeat(1)
+        table.mark_dead(1)
+        table.record_restart(1)
+
+        summary = table.summary()
+
+        assert summary["workers_alive"] == 1
+        assert summary["restarts"] == 1
+
+    def test_health_aggregates_workers(self):
+        """Health check toplu worker durumunu raporlamalı."""
+        table = WorkerStatusTable(2)
+        health = HealthServicer(worker_status=table.summary)
+
+        response = health.Check(None, None)
+        assert response["status"] == "NOT_SERVING"
+        assert response["workers_alive"] == 0
+
+        table.heartbeat(0)
+        response = health.Check(None, None)
+        assert response["status"] == "SERVING"
+        assert response["workers_total"] == 2
+        assert response["workers_alive"] == 1
+
+    def test_supervisor_requires_workers(self):
+        """En az bir worker gerekli."""
+        with pytest.raises(ValueError):
+            WorkerSupervisor(0, WorkerConfig())
+
+    def test_worker_server_applies_config(self, tmp_path):
+        """Worker server'ı cache, havuz, warm-up, tracing ve deneyim ayarlarını almalı."""
+        config = WorkerConfig(
+            use_rule_based=True, port=_free_port(), metrics_port=9400,
+            action_cache=True, cache_ttl_ms=250.0,
+            level_models={3: str(tmp_path / "l3.zip")}, model_pool_bytes=1024,
+            warmup_batch_sizes=(1, 4), trace_sample_rate=0.5, trace_capacity=16,
+            trace_dir=str(tmp_path), experience_capacity=32
+        )
+        server = _build_server(2, config)
+
+        servicer = server.bot_servicer
+        assert servicer.action_cache is not None and servicer.action_cache.ttl == 0.25
+        assert servicer.model_pool.model_paths == {3: str(tmp_path / "l3.zip")}
+        assert servicer.model_pool.max_bytes == 1024
+        assert server.warmup_batch_sizes == (1, 4)
+        assert server.tracer.sample_rate == 0.5 and server.tracer.capacity == 16
+        assert server.admin_servicer.dump_dir == str(tmp_path)
+        assert server.experience_store.capacity == 32
+        assert server.metrics_port == 9402
+        assert server.reuse_port
+
+    @pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="SIGUSR2 gerekli")
+    def test_supervisor_worker_with_options(self, tmp_path):
+        """Seçeneklerle başlatılan worker ayağa kalkmalı ve kendi trace dizinine dump etmeli."""
+        config = WorkerConfig(
+            use_rule_based=True, host="127.0.0.1", port=_free_port(), max_workers=2,
+            heartbeat_interval=0.1, action_cache=True, warmup_batch_sizes=(1,),
+            trace_sample_rate=1.0, trace_dir=str(tmp_path), experience_capacity=16
+        )
+        supervisor = WorkerSupervisor(1, config)
+        supervisor.start(blocking=False)
+        try:
+            deadline = time.time() + 60
+            while supervisor.get_stats()["workers_alive"] < 1 and time.time() < deadline:
+                time.sleep(0.1)
+            stats = supervisor.get_stats()
+            assert stats["workers_alive"] == 1
+
+            os.kill(stats["workers"][0]["pid"], signal.SIGUSR2)
+            while not list(tmp_path.glob("trace_*.json")) and time.time() < deadline:
+                time.sleep(0.1)
+            assert list(tmp_path.glob("trace_*.json"))
+        finally:
+            supervisor.stop()
+
+
+class TestMetrics:
+    """Metrics registry testleri."""
+
+    def test_counter_no_lost_updates(self):
+        """Çok thread'li artırımlarda kayıp olmamalı."""
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "test", ("kind",))
+
+        def worker():
+            child = counter.labels("a")
+            for _ in range(10000):
+                child.inc()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert counter.labels("a").value == 80000
+
+    def test_histogram_quantiles(self):
+        """Quantile tahmini bucket sınırları içinde olmalı."""
+        registry = MetricsRegistry()
+        hist = registry.histogram("latency_seconds", "test", buckets=(0.001, 0.01, 0.1, 1.0))
+
+        for _ in range(90):
+            hist.observe(0.0005)
+        for _ in range(10):
+            hist.observe(0.05)
+
+        child = hist.labels()
+        assert child.count == 100
+        assert child.quantile(0.5) <= 0.001
+        assert 0.01 <= child.quantile(0.99) <= 0.1
+
+    def test_render_prometheus_format(self):
+        """Text exposition format."""
+        registry = MetricsRegistry(prefix="calypso")
+        registry.counter("requests_total", "test", ("rpc",)).labels("GetAction").inc(3)
+        registry.histogram("latency_seconds", "test", buckets=(0.1,)).observe(0.05)
+
+        text = registry.render()
+
+        assert '# TYPE calypso_requests_total counter' in text
+        assert 'calypso_requests_total{rpc="GetAction"} 3.0' in text
+        assert 'calypso_latency_seconds_bucket{le="+Inf"} 1' in text
+        assert 'calypso_latency_seconds_quantile{quantile="0.99"}' in text
+
+    def test_http_endpoint(self):
+        """/metrics endpoint registry içeriğini sunmalı."""
+        registry = MetricsRegistry()
+        registry.counter("up_total", "test").inc()
+        server = MetricsHTTPServer(registry, port=0)
+        server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as resp:
+                body = resp.read().decode("utf-8")
+        finally:
+            server.stop()
+
+        assert "calypso_up_total 1.0" in body
+
+    def test_servicer_instrumentation(self):
+        """BotAIServicer RPC, batch ve aksiyon metriklerini kaydetmeli."""
+        servicer = BotAIServicer(RuleBasedAgent())
+        servicer.GetAction(SimpleNamespace(bot_id="bot_1"), None)
+        servicer.GetActionsBatch(
+            SimpleNamespace(states=[SimpleNamespace(bot_id=f"bot_{i}") for i in range(4)]),
+            None
+        )
+
+        stats = servicer.get_stats()
+        assert stats["request_count"] == 5
+
+        text = servicer.metrics.render()
+        assert 'calypso_rpc_requests_total{rpc="GetAction",agent="RuleBasedAgent"} 1.0' in text
+        assert 'calypso_batch_size_count 1' in text
+        assert 'calypso_actions_total{action=' in text
+
+
+class TestPackedRPC:
+    """Packed tensor RPC testleri."""
+
+    def _request(self, observations, **kwargs):
+        payload, num_rows, obs_dim = pack_observations(observations)
+        fields = dict(
+            schema_version=1, num_rows=num_rows, obs_dim=obs_dim,
+            bot_ids=[f"bot_{i}" for i in range(num_rows)],
+            observations=payload, deterministic=True, return_confidences=True
+        )
+        fields.update(kwargs)
+        return SimpleNamespace(**fields)
+
+    def test_unpack_is_zero_copy(self):
+        """Payload kopyalanmadan view olarak okunmalı."""
+        obs = np.random.rand(8, 96).astype(np.float32)
+        payload, n, d = pack_observations(obs)
+
+        view = unpack_observations(payload, n, d)
+
+        assert view.shape == (8, 96)
+        assert not view.flags.owndata
+        assert not view.flags.writeable
+        np.testing.assert_array_equal(view, obs)
+
+    def test_size_mismatch(self):
+        """Boyut uyuşmazlığı hata vermeli."""
+        with pytest.raises(PackedFormatError):
+            unpack_observations(b"\x00" * 10, 2, 96)
+
+    def test_servicer_packed_matches_per_bot(self):
+        """Packed sonuçlar tek tek select_action ile aynı olmalı."""
+        agent = RuleBasedAgent()
+        servicer = BotAIServicer(agent)
+        obs = np.random.rand(16, 64).astype(np.float32)
+
+        response = servicer.GetActionsPacked(self._request(obs), None)
+        actions, confidences = unpack_actions(response["actions"], response["confidences"])
+
+        expected = [agent.select_action(row, deterministic=True)[0] for row in obs]
+        assert response["num_rows"] == 16
+        assert list(actions) == expected
+        assert confidences.shape == (16,)
+
+    def test_deterministic_defaults_like_get_action(self):
+        """deterministic verilmemiş packed istek GetAction gibi argmax seçmeli."""
+        agent = RuleBasedAgent()
+        servicer = BotAIServicer(agent)
+        obs = np.random.rand(64, 64).astype(np.float32)
+        expected = [agent.select_action(row, deterministic=True)[0] for row in obs]
+
+        # Derlenmiş proto3 mesajı: alan set edilmemişken False okunur
+        unset = self._request(obs, deterministic=False, HasField=lambda name: False)
+        actions, _ = unpack_actions(servicer.GetActionsPacked(unset, None)["actions"])
+        assert list(actions) == expected
+
+        explicit = self._request(obs, deterministic=False, HasField=lambda name: name == "deterministic")
+        np.random.seed(0)
+        actions, _ = unpack_actions(servicer.GetActionsPacked(explicit, None)["actions"])
+        assert list(actions) != expected
+
+    def test_batched_packed_is_one_request(self):
+        """Batch modunda packed matris tek batcher isteği olarak kopyasız gitmeli."""
+        batches = []
+
+        class RecordingAgent(RuleBasedAgent):
+            def select_actions(self, observations, deterministic=True):
+                batches.append(observations)
+                return super().select_actions(observations, deterministic)
+
+        servicer = BotAIServicer(RecordingAgent(), batch_inference=True, inference_timeout_ms=1000)
+        submitted = []
+        submit = servicer.batcher.submit
+        servicer.batcher.submit = lambda *args, **kwargs: (submitted.append(args), submit(*args, **kwargs))[1]
+        obs = np.random.rand(32, 64).astype(np.float32)
+        request = self._request(obs)
+        try:
+            response = servicer.GetActionsPacked(request, None)
+        finally:
+            servicer.stop()
+
+        assert submitted == []
+        expected, _ = RuleBasedAgent().select_actions(obs, deterministic=True)
+        assert list(unpack_actions(response["actions"])[0]) == expected.tolist()
+        assert len(batches) == 1
+        assert np.shares_memory(batches[0], np.frombuffer(request.observations, dtype=np.uint8))
+
+    def test_packed_records_experience(self):
+        """Packed yoldan servis edilen botların reward'ları trajectory'ye eklenmeli."""
+        collector = ExperienceCollector(ExperienceStore(100, obs_dim=64))
+        servicer = BotAIServicer(RuleBasedAgent(), experience=collector)
+        obs = np.random.rand(2, 64).astype(np.float32)
+
+        servicer.GetActionsPacked(self._request(obs, timestamp=100), None)
+        servicer.SendReward(SimpleNamespace(bot_id="bot_1", timestamp=100, total_reward=1.0, is_terminal=True), None)
+
+        data = collector.store.snapshot()
+        np.testing.assert_allclose(data["observations"], obs[1:])
+        np.testing.assert_allclose(data["rewards"], [1.0])
+        assert len(servicer.sessions) == 2
+        assert collector.open_trajectories == 1
+
+    def test_servicer_rejects_wrong_dim(self):
+        """Agent boyutuna uymayan obs_dim reddedilmeli."""
+        servicer = BotAIServicer(RuleBasedAgent())
+        obs = np.random.rand(2, 96).astype(np.float32)
+
+        with pytest.raises(PackedFormatError):
+            servicer.GetActionsPacked(self._request(obs), None)
+
+
+class SlowAgent(RuleBasedAgent):
+    """Yavaş primary agent simülasyonu."""
+
+    def __init__(self, delay: float):
+        super().__init__(name="SlowAgent")
+        self.delay = delay
+
+    def select_action(self, observation, deterministic=True):
+        time.sleep(self.delay)
+        return super().select_action(observation, deterministic)
+
+    # Batch çağrıları da satır satır select_action'dan geçsin
+    select_actions = BaseAgent.select_actions
+
+
+class TestDeadlineFallback:
+    """Deadline ve rule-based fallback testleri."""
+
+    def _states(self, n):
+        return SimpleNamespace(states=[SimpleNamespace(bot_id=f"bot_{i}") for i in range(n)])
+
+    def test_fast_agent_not_degraded(self):
+        """Bütçe içinde kalan istekler degraded olmamalı."""
+        servicer = BotAIServicer(RuleBasedAgent(), inference_timeout_ms=1000)
+        response = servicer.GetAction(SimpleNamespace(bot_id="bot_1"), None)
+
+        assert response["degraded"] is False
+        assert servicer.get_stats()["fallback_count"] == 0
+
+    def test_slow_agent_falls_back(self):
+        """Primary maliyeti bütçeyi aşınca fallback agent cevap vermeli."""
+        servicer = BotAIServicer(SlowAgent(0.02), inference_timeout_ms=30)
+
+        # Batch tek primary çağrısıdır (5 x 20ms); maliyet tahmini çağrı
+        # başına öğrenilir, bütçeyi aşınca sonraki batch'ler fallback
+        degraded = []
+        for _ in range(20):
+            response = servicer.GetActionsBatch(self._states(5), None)
+            degraded.append([a["degraded"] for a in response["actions"]])
+            if any(degraded[-1]):
+                break
+
+        assert not any(degraded[0])
+        assert all(degraded[-1])
+        stats = servicer.get_stats()
+        assert stats["fallback_count"] == 5
+        assert 0 < stats["fallback_rate"] < 1
+
+    @pytest.mark.parametrize("batch_inference", [False, True])
+    def test_latency_spike_recovers(self, batch_inference):
+        """Tek bir gecikme sıçraması primary'yi kalıcı olarak devre dışı bırakmamalı."""
+        class StallOnceAgent(CountingAgent):
+            def select_action(self, observation, deterministic=True):
+                if self.calls == 0:
+                    time.sleep(0.5)
+                return super().select_action(observation, deterministic)
+
+        agent = StallOnceAgent()
+        servicer = BotAIServicer(agent, inference_timeout_ms=30, batch_inference=batch_inference)
+        try:
+            reasons = [servicer.GetAction(SimpleNamespace(bot_id="bot"), None)["degraded_reason"]]
+            if batch_inference:
+                time.sleep(0.6)  # takılan batch worker'da bitsin
+            for _ in range(30):
+                reasons.append(servicer.GetAction(SimpleNamespace(bot_id="bot"), None)["degraded_reason"])
+        finally:
+            servicer.stop()
+
+        assert "deadline" in reasons
+        assert reasons[-10:] == [""] * 10
+        assert agent.calls > 10
+
+    def test_direct_inference_groups_by_model(self):
+        """Batcher'sız yolda her model grubu tek select_actions çağrısı almalı."""
+        calls = []
+
+        class CountingAgent(RuleBasedAgent):
+            def select_actions(self, observations, deterministic=True):
+                calls.append((self.name, len(observations)))
+                return super().select_actions(observations, deterministic)
+
+        agent = CountingAgent(name="Default")
+        servicer = BotAIServicer(agent, inference_timeout_ms=None)
+        pool_agent = CountingAgent(name="Level5")
+        servicer.model_pool = SimpleNamespace(get_loaded=lambda key: pool_agent if key == "l5" else None)
+        obs = np.random.rand(6, 64).astype(np.float32)
+        keys = [None, "l5", None, "l5", None, None]
+
+        results = servicer._infer_direct(list(obs), True, None, keys)
+
+        assert sorted(calls) == [("Default", 4), ("Level5", 2)]
+        expected = [agent.select_action(row, deterministic=True)[0] for row in obs]
+        assert [action for action, _, reason in results] == expected
+        assert all(reason is None for _, _, reason in results)
+
+    def test_large_batch_within_budget(self):
+        """Direkt modda ön kontrol satır değil model grubu başına maliyet saymalı."""
+        servicer = BotAIServicer(RuleBasedAgent(), inference_timeout_ms=50)
+        servicer._cost_estimate = 0.002  # ~2 ms/çağrı model; 64 x 2 ms bütçeyi aşardı
+
+        response = servicer.GetActionsBatch(self._states(64), None)
+
+        assert not any(a["degraded"] for a in response["actions"])
+
+    def test_batched_timeout_falls_back(self):
+        """Batcher deadline'ı kaçırırsa timeout fallback olmalı."""
+        servicer = BotAIServicer(SlowAgent(0.05), inference_timeout_ms=10, batch_inference=True)
+        try:
+            response = servicer.GetAction(SimpleNamespace(bot_id="bot_1"), None)
+        finally:
+            servicer.stop()
+
+        assert response["degraded"] is True
+        assert response["degraded_reason"] == "timeout"
+
+    def test_queue_full_falls_back(self):
+        """Kuyruk derinliği limiti aşınca direkt fallback."""
+        servicer = BotAIServicer(RuleBasedAgent(), batch_inference=True, max_queue_depth=0)
+        try:
+            response = servicer.GetAction(SimpleNamespace(bot_id="bot_1"), None)
+        finally:
+            servicer.stop()
+
+        assert response["degraded_reason"] == "queue_full"
+        assert 'calypso_fallback_total{reason="queue_full"} 1.0' in servicer.metrics.render()
+
+    def test_batcher_groups_requests(self):
+        """Eşzamanlı istekler tek batch'te toplanmalı."""
+        calls = []
+
+        def run_batch(key, observations):
+            calls.append(len(observations))
+            return [key] * len(observations)
+
+        batcher = InferenceBatcher(run_batch, max_batch_size=8, max_wait_ms=50)
+        try:
+            futures = [batcher.submit(np.zeros(4), key="k") for _ in range(8)]
+            results = [f.result(timeout=2) for f in futures]
+        finally:
+            batcher.stop()
+
+        assert results == ["k"] * 8
+        assert sum(calls) == 8
+        assert max(calls) > 1
+
+    def test_batcher_expires_queued_requests(self):
+        """Kuyrukta deadline'ı geçen istek çalıştırılmamalı."""
+        batcher = InferenceBatcher(lambda key, obs: [0] * len(obs), max_wait_ms=0)
+        try:
+            future = batcher.submit(np.zeros(4), deadline=time.monotonic() - 1)
+            with pytest.raises(DeadlineExceededError):
+                future.result(timeout=2)
+        finally:
+            batcher.stop()
+
+
+class CountingAgent(RuleBasedAgent):
+    """select_action çağrılarını sayan agent."""
+
+    def __init__(self):
+        super().__init__(name="CountingAgent")
+        self.calls = 0
+
+    def select_action(self, observation, deterministic=True):
+        self.calls += 1
+        return super().select_action(observation, deterministic)
+
+    # Batch çağrıları da satır satır select_action'dan geçsin
+    select_actions = BaseAgent.select_actions
+
+    def load(self, path):
+        pass
+
+
+class TestActionCache:
+    """Action cache testleri."""
+
+    def test_quantized_key(self):
+        """Quantize adımından küçük farklar aynı anahtara düşmeli."""
+        cache = ActionCache(quantization_step=0.1)
+        obs = np.full(64, 0.5, dtype=np.float32)
+
+        assert cache.make_key(obs, 0, True) == cache.make_key(obs + 0.01, 0, True)
+        assert cache.make_key(obs, 0, True) != cache.make_key(obs + 0.2, 0, True)
+        assert cache.make_key(obs, 0, True) != cache.make_key(obs, 1, True)
+        assert cache.make_key(obs, 0, True) != cache.make_key(obs, 0, False)
+
+    def test_ttl_and_lru(self):
+        """Süresi dolan ve LRU dışı kalan kayıtlar dönmemeli."""
+        cache = ActionCache(max_entries=2, ttl_seconds=0.05)
+        cache.put("a", 1, {})
+        cache.put("b", 2, {})
+        assert cache.get("a") == (1, {})
+        cache.put("c", 3, {})  # "b" en eski kullanılan
+
+        assert cache.get("b") is None
+        assert cache.get_stats()["evictions"] == 1
+
+        time.sleep(0.06)
+        assert cache.get("a") is None
+        assert len(cache) == 1
+
+    def test_servicer_hits_cache(self):
+        """Tekrarlanan observation agent'ı çağırmadan cevaplanmalı."""
+        agent = CountingAgent()
+        servicer = BotAIServicer(agent, action_cache=ActionCache())
+        obs = np.random.rand(64).astype(np.float32)
+
+        first = servicer._infer([obs], True, None)[0]
+        second = servicer._infer([obs.copy()], True, None)[0]
+
+        assert agent.calls == 1
+        assert second[0] == first[0]
+        assert second[1] is first[1]
+        stats = servicer.get_stats()["action_cache"]
+        assert stats["hits"] == 1 and stats["hit_ratio"] == 0.5
+        assert stats["memory_bytes"] > 0
+        assert "calypso_action_cache_hit_ratio 0.5" in servicer.metrics.render()
+
+    def test_load_model_invalidates(self):
+        """LoadModel sonrası eski kayıtlar kullanılmamalı."""
+        agent = CountingAgent()
+        servicer = BotAIServicer(agent, action_cache=ActionCache())
+        training = TrainingServicer(agent, model_slots=servicer.model_slots)
+        obs = np.random.rand(64).astype(np.float32)
+
+        servicer._infer([obs], True, None)
+        response = training.LoadModel(SimpleNamespace(path=__file__, wait=True), None)
+        servicer._infer([obs], True, None)
+
+        assert response["success"]
+        assert servicer.model_version == 1
+        assert servicer.agent is not agent
+        assert servicer.action_cache.get_stats()["hits"] == 0
+        assert len(servicer.action_cache) == 1
+
+
+class TestModelSlots:
+    """Hot model swap testleri."""
+
+    def test_swap_waits_for_inflight(self):
+        """Eski slot in-flight iş bitene kadar bırakılmamalı."""
+        slots = ModelSlots(RuleBasedAgent(), warmup_steps=0, drain_timeout=2.0)
+        new_agent = RuleBasedAgent(name="NewAgent")
+        swapped = threading.Event()
+
+        with slots.acquire() as old_agent:
+            thread = threading.Thread(target=lambda: (slots.swap(new_agent), swapped.set()))
+            thread.start()
+            time.sleep(0.05)
+            # Yeni istekler yeni modeli görür, swap eski slotun drain'ini bekler
+            assert slots.active is new_agent
+            assert not swapped.is_set()
+            old_agent.select_action(np.zeros(64, dtype=np.float32))
+        thread.join(timeout=2)
+
+        assert swapped.is_set()
+        assert slots.version == 1
+
+    def test_failed_load_keeps_active(self):
+        """Yüklenemeyen model aktif agent'ı değiştirmemeli."""
+        agent = RuleBasedAgent()
+        slots = ModelSlots(agent)
+
+        with pytest.raises(FileNotFoundError):
+            slots.load("/nonexistent/model.json")
+
+        assert slots.active is agent
+        assert slots.version == 0
+        assert slots.get_stats()["failed_loads"] == 1
+
+    def test_swap_loads_inference_only(self, tmp_path):
+        """inference_only destekleyen agent'lar hot-swap'ta sadece politika yüklemeli."""
+        calls = []
+
+        class PolicyAgent(RuleBasedAgent):
+            def load(self, path, env=None, inference_only=False, mmap=False):
+                calls.append((inference_only, mmap))
+                super().load(path)
+
+        path = str(tmp_path / "params.json")
+        RuleBasedAgent().save(path)
+        slots = ModelSlots(PolicyAgent(), warmup_steps=0, mmap_weights=True)
+
+        assert slots.load(path, timeout=5) == 1
+        assert calls == [(True, True)]
+
+        # Kendi load()'u olan agent'lar değişmeden yüklenir
+        plain = ModelSlots(RuleBasedAgent(), warmup_steps=0)
+        assert plain.load(path, timeout=5) == 1
+
+    def test_reload_under_load_no_failures(self, tmp_path):
+        """Trafik altında LoadModel hiçbir isteği düşürmemeli."""
+        agent = RuleBasedAgent()
+        path = str(tmp_path / "params.json")
+        agent.save(path)
+        servicer = BotAIServicer(agent, batch_inference=True, inference_timeout_ms=1000)
+        training = TrainingServicer(agent, model_slots=servicer.model_slots)
+        errors, degraded = [], []
+        stop = threading.Event()
+
+        def client():
+            while not stop.is_set():
+                try:
+                    response = servicer.GetAction(SimpleNamespace(bot_id="bot"), None)
+                    degraded.append(response["degraded"])
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=client) for _ in range(4)]
+        for t in threads:
+            t.start()
+        try:
+            for _ in range(5):
+                response = training.LoadModel(SimpleNamespace(path=path, wait=True), None)
+                assert response["success"]
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+            servicer.stop()
+
+        assert errors == []
+        assert not any(degraded)
+        assert servicer.model_version == 5
+
+
+class FixedAgent(RuleBasedAgent):
+    """Hep aynı aksiyonu seçen agent (model yolu = aksiyon)."""
+
+    def __init__(self, action: int):
+        super().__init__(name=f"FixedAgent{action}")
+        self.action = action
+
+    def select_action(self, observation, deterministic=True):
+        return self.action, {}
+
+    # Batch çağrıları da satır satır select_action'dan geçsin
+    select_actions = BaseAgent.select_actions
+
+
+class TestModelPool:
+    """Zorluk seviyesi bazlı model havuzu testleri."""
+
+    def _pool(self, **kwargs):
+        return ModelPool(
+            {1: "1", 2: "2", 3: "2", 7: "7"},
+            loader=lambda path: FixedAgent(int(path)),
+            size_fn=lambda agent: 100,
+            **kwargs
+        )
+
+    def test_lazy_load_and_shared_paths(self):
+        """İlk istek yüklemeyi başlatmalı, aynı yolu paylaşan seviyeler tek model kullanmalı."""
+        pool = self._pool()
+
+        assert pool.route(2) is None
+        pool.wait_idle(timeout=2)
+
+        assert pool.route(2) == "2"
+        assert pool.route(3) == "2"
+        assert pool.route(5) is None  # eşlemesi olmayan seviye
+        assert len(pool) == 1
+
+    def test_lru_byte_budget(self):
+        """Bütçe aşılınca en uzun süre kullanılmayan model atılmalı."""
+        pool = self._pool(max_bytes=250)
+        pool.preload([1, 2])
+        pool.route(1)  # "1" en son kullanılan
+        pool.load("7")
+
+        stats = pool.get_stats()
+        assert stats["loaded"] == ["1", "7"]
+        assert stats["bytes"] == 200
+        assert stats["evictions"] == 1
+
+    def test_servicer_routes_by_level(self):
+        """GetAction oyuncunun seviyesine ait modeli kullanmalı."""
+        pool = self._pool()
+        pool.preload()
+        servicer = BotAIServicer(FixedAgent(0), model_pool=pool)
+        servicer.difficulty_manager.set_difficulty("easy", 1)
+        servicer.difficulty_manager.set_difficulty("hard", 7)
+
+        response = servicer.GetActionsBatch(SimpleNamespace(states=[
+            SimpleNamespace(bot_id="a", player_id="easy"),
+            SimpleNamespace(bot_id="b", player_id="hard"),
+            SimpleNamespace(bot_id="c", player_id=""),
+        ]), None)
+
+        assert [a["action_type"] for a in response["actions"]] == [1, 7, 0]
+
+    def test_batches_grouped_by_model(self):
+        """Aynı modele giden istekler aynı batch'te toplanmalı."""
+        pool = self._pool()
+        pool.preload()
+        servicer = BotAIServicer(FixedAgent(0), model_pool=pool, batch_inference=True,
+                                 max_batch_wait_ms=20, inference_timeout_ms=1000)
+        batches = []
+        run_primary = servicer._run_primary
+        servicer.batcher.run_batch = lambda key, obs: (batches.append((key[0], len(obs))),
+                                                       run_primary(key, obs))[1]
+        observations = [np.zeros(64, dtype=np.float32)] * 6
+        try:
+            results = servicer._infer(observations, True, None, ["1", "7", "1", "7", "1", None])
+        finally:
+            servicer.stop()
+
+        assert [r[0] for r in results] == [1, 7, 1, 7, 1, 0]
+        assert sorted(batches, key=str) == sorted([("1", 3), ("7", 2), (None, 1)], key=str)
+
+
+class TestTelemetry:
+    """Kaynak telemetrisi testleri."""
+
+    def test_sample_reads_process(self):
+        """Snapshot RSS, thread ve CPU değerlerini içermeli."""
+        sampler = ResourceSampler(queue_depth_fn=lambda: 7)
+        end = time.process_time() + 0.05
+        while time.process_time() < end:
+            pass
+        snapshot = sampler.sample()
+
+        assert snapshot["rss_bytes"] > 0
+        assert snapshot["thread_count"] >= 1
+        assert snapshot["cpu_percent"] > 0
+        assert snapshot["queue_depth"] == 7
+
+    def test_recent_p99_window(self):
+        """p99 sadece son aralıktaki istekleri yansıtmalı."""
+        registry = MetricsRegistry()
+        hist = registry.histogram("rpc_latency_seconds", "test", ("rpc",), buckets=(0.001, 0.1, 1.0))
+        sampler = ResourceSampler(latency_histogram=hist)
+
+        for _ in range(100):
+            hist.labels("GetAction").observe(0.5)
+        assert sampler.sample()["p99_latency_ms"] > 100
+
+        for _ in range(100):
+            hist.labels("GetAction").observe(0.0005)
+        assert sampler.sample()["p99_latency_ms"] <= 1.0
+
+    def test_health_serves_cached_snapshot(self):
+        """Check sampler'ı çağırmadan son snapshot'ı döndürmeli."""
+        sampler = ResourceSampler()
+        health = HealthServicer(sampler=sampler)
+        sampler.sample = None  # Check örnekleme yaparsa hata verir
+
+        response = health.Check(None, None)
+
+        assert response["memory_usage"] > 0
+        assert response["thread_count"] >= 1
+        assert "p99_latency_ms" in response
+
+
+class TestStateCodec:
+    """GameState <-> observation dönüşüm testleri."""
+
+    def test_round_trip(self):
+        """Observation -> GameState -> observation aynı vektörü vermeli."""
+        obs = np.random.rand(64).astype(np.float32)
+
+        state = observation_to_game_state(obs, bot_id="bot_1")
+
+        np.testing.assert_allclose(game_state_to_observation(state), obs, rtol=1e-6)
+
+    def test_missing_enemies_use_defaults(self):
+        """Eksik düşman slotları ObservationBuilder default'ları ile dolmalı."""
+        obs = np.random.rand(64).astype(np.float32)
+        state = observation_to_game_state(obs)
+        state.enemies = state.enemies[:1]
+
+        decoded = game_state_to_observation(state)
+
+        np.testing.assert_allclose(decoded[24:40], ObservationBuilder().build()[24:40])
+
+    def test_calypso_round_trip(self):
+        """96-dim CALYPSO observation'ı GameState üzerinden kayıpsız dönmeli."""
+        obs = np.random.rand(96).astype(np.float32)
+
+        state = observation_to_game_state(obs, bot_id="bot_1")
+
+        assert state.tactical.suppression_threat == pytest.approx(obs[CALYPSO_LAYOUT.tactical_offset])
+        np.testing.assert_allclose(game_state_to_observation(state, layout=CALYPSO_LAYOUT), obs, rtol=1e-6)
+
+    def test_calypso_missing_enemies_use_defaults(self):
+        """Eksik CALYPSO düşman slotları CalypsoObservationBuilder default'ları ile dolmalı."""
+        state = observation_to_game_state(np.random.rand(96).astype(np.float32))
+        state.enemies = state.enemies[:1]
+
+        decoded = game_state_to_observation(state, layout=CALYPSO_LAYOUT)
+
+        np.testing.assert_allclose(decoded[32:56], CalypsoObservationBuilder().build()[32:56])
+
+    def test_projection_selects_standard_fields(self):
+        """CALYPSO -> combat projeksiyonu standart alanları seçmeli."""
+        obs = np.random.rand(96).astype(np.float32)
+
+        projected = obs[layout_projection(CALYPSO_LAYOUT, COMBAT_LAYOUT)]
+
+        standard = game_state_to_observation(observation_to_game_state(obs))
+        np.testing.assert_array_equal(projected, standard)
+
+    def test_stream_actions(self):
+        """StreamActions her state için sırayla bir aksiyon döndürmeli."""
+        agent = RuleBasedAgent()
+        servicer = BotAIServicer(agent)
+        observations = np.random.rand(5, 64).astype(np.float32)
+        states = [observation_to_game_state(o, bot_id=f"bot_{i}") for i, o in enumerate(observations)]
+
+        responses = list(servicer.StreamActions(iter(states), None))
+
+        assert [r["bot_id"] for r in responses] == [f"bot_{i}" for i in range(5)]
+        assert [r["action_type"] for r in responses] == [
+            agent.select_action(o, deterministic=True)[0] for o in observations
+        ]
+
+
+@pytest.fixture(scope="module")
+def calypso_agent():
+    """96-dim observation, 16 aksiyonlu PPO agent."""
+    from python_rl_server.agents import PPOAgent
+    agent = PPOAgent(verbose=0, n_steps=64)
+    agent.initialize(CalypsoMockEnv())
+    return agent
+
+
+class TestCalypsoServing:
+    """96-dim CALYPSO modellerinin GameState RPC'leri üzerinden servisi."""
+
+    def _observations(self, n):
+        env = CalypsoMockEnv()
+        return np.stack([env.reset(seed=i)[0] for i in range(n)]).astype(np.float32)
+
+    def test_get_action_96_dim(self, calypso_agent):
+        """GetAction CALYPSO yerleşimini okumalı ve 16 aksiyonu ayrı isimlerle dönmeli."""
+        servicer = BotAIServicer(calypso_agent)
+        obs = self._observations(1)[0]
+
+        response = servicer.GetAction(observation_to_game_state(obs, bot_id="bot_1"), None)
+
+        assert not response["degraded"]
+        assert response["action_type"] == calypso_agent.select_action(obs, deterministic=True)[0]
+        assert response["action_name"] == calypso_agent.get_action_name(response["action_type"])
+        probs = [k for k in response["utility_scores"] if k.startswith("prob_")]
+        assert len(probs) == 16
+        assert "prob_COORDINATE_ATTACK" in probs
+
+    def test_batch_and_stream_96_dim(self, calypso_agent):
+        """GetActionsBatch ve StreamActions da CALYPSO yerleşimini kullanmalı."""
+        servicer = BotAIServicer(calypso_agent)
+        observations = self._observations(4)
+        states = [observation_to_game_state(o, bot_id=f"bot_{i}") for i, o in enumerate(observations)]
+        expected = calypso_agent.select_actions(observations, deterministic=True)[0].tolist()
+
+        batch = servicer.GetActionsBatch(SimpleNamespace(states=states), None)
+        stream = list(servicer.StreamActions(iter(states), None))
+
+        assert [a["action_type"] for a in batch["actions"]] == expected
+        assert [r["action_type"] for r in stream] == expected
+
+    def test_fallback_mapped_to_calypso_actions(self, calypso_agent):
+        """64-dim kural tabanlı fallback projekte edilmeli, aksiyonları isimle eşlenmeli."""
+        servicer = BotAIServicer(calypso_agent)
+        observations = self._observations(8)
+        fallback_obs = observations[:, layout_projection(CALYPSO_LAYOUT, COMBAT_LAYOUT)]
+        fallback_actions, _ = RuleBasedAgent().select_actions(fallback_obs, deterministic=True)
+
+        results = servicer._fallback(list(observations), "deadline")
+
+        names = [calypso_agent.get_action_name(a) for a, _, _ in results]
+        assert names == [RuleBasedAgent().get_action_name(a) for a in fallback_actions]
+
+    def test_unsupported_dim_rejected_at_startup(self):
+        """GameState yerleşimi olmayan boyuttaki model servicer kurulurken reddedilmeli."""
+        with pytest.raises(ValueError, match="observation_dim 80"):
+            BotAIServicer(RuleBasedAgent(observation_dim=80))
+
+    def test_mismatched_swap_rejected(self, tmp_path):
+        """Farklı boyutlu model hot-swap edilmemeli, aktif model korunmalı."""
+        class WideAgent(RuleBasedAgent):
+            def load(self, path):
+                super().load(path)
+                self.observation_dim = 96
+
+        path = str(tmp_path / "params.json")
+        RuleBasedAgent().save(path)
+        agent = WideAgent()
+        slots = ModelSlots(agent, warmup_steps=0)
+
+        with pytest.raises(ValueError, match="observation_dim"):
+            slots.load(path)
+
+        assert slots.active is agent
+        assert slots.get_stats()["failed_loads"] == 1
+
+    def test_mismatched_pool_model_rejected(self, calypso_agent):
+        """Seviye modeli aktif modelle aynı uzayda değilse havuza eklenmemeli."""
+        pool = ModelPool({1: "combat"}, loader=lambda path: RuleBasedAgent(), size_fn=lambda agent: 1)
+        BotAIServicer(calypso_agent, model_pool=pool)
+
+        with pytest.raises(ValueError):
+            pool.load("combat")
+        assert len(pool) == 0
+        check_compatible(calypso_agent, calypso_agent)  # aynı uzay kabul edilir
+
+
+class TestWarmup:
+    """Başlangıç warm-up testleri."""
+
+    def test_warm_up_agent_batch_sizes(self):
+        """Her batch boyutu için süre raporlanmalı."""
+        agent = CountingAgent()
+
+        timings = warm_up_agent(agent, batch_sizes=(1, 4), iterations=2)
+
+        assert set(timings) == {1, 4}
+        assert agent.calls == 2 * (1 + 4)
+
+    def test_servicer_warms_pool_models(self):
+        """Aktif agent ve havuzdaki tüm modeller ısıtılmalı."""
+        pool = ModelPool({1: "1", 7: "7"}, loader=lambda path: CountingAgent())
+        pool.preload()
+        servicer = BotAIServicer(CountingAgent(), model_pool=pool)
+
+        report = servicer.warm_up(batch_sizes=(2,), iterations=1)
+
+        assert set(report) == {"active", "1", "7"}
+        assert all(agent.calls == 2 for agent in pool.loaded_agents().values())
+
+    def test_health_not_serving_until_warm(self):
+        """Warm-up bitene kadar Health NOT_SERVING dönmeli."""
+        server = BotAIServer(
+            agent=RuleBasedAgent(), host="127.0.0.1", port=0,
+            telemetry_interval=None, warmup_batch_sizes=(1, 8)
+        )
+        assert server.health_servicer.Check(None, None)["status"] == "NOT_SERVING"
+
+        server.start(blocking=False)
+        try:
+            assert server.health_servicer.Check(None, None)["status"] == "SERVING"
+        finally:
+            server.stop()
+
+
+class TestTracing:
+    """Örneklemeli aşama tracing testleri."""
+
+    def test_sampling_off_records_nothing(self):
+        """sample_rate 0 iken trace tutulmamalı."""
+        tracer = Tracer(sample_rate=0.0)
+        servicer = BotAIServicer(RuleBasedAgent(), tracer=tracer)
+
+        servicer.GetAction(SimpleNamespace(bot_id="bot_1"), None)
+
+        assert tracer.traces() == []
+
+    def test_stages_recorded(self):
+        """Örneklenen istekte decode/forward/encode aşamaları olmalı."""
+        tracer = Tracer(sample_rate=1.0)
+        servicer = BotAIServicer(RuleBasedAgent(), tracer=tracer, batch_inference=True)
+        try:
+            servicer.GetActionsBatch(
+                SimpleNamespace(states=[SimpleNamespace(bot_id="b1"), SimpleNamespace(bot_id="b2")]),
+                None
+            )
+        finally:
+            servicer.stop()
+
+        [trace] = tracer.traces()
+        stages = [span[0] for span in trace.spans]
+        assert trace.rpc == "GetActionsBatch"
+        assert trace.num_rows == 2
+        assert {"decode", "queue_wait", "forward", "encode"} <= set(stages)
+        assert all(trace.start <= start <= end <= trace.end for _, start, end in trace.spans)
+
+    def test_ring_buffer_wraps(self):
+        """Kapasite aşılınca en eski trace'ler düşmeli."""
+        tracer = Tracer(sample_rate=1.0, capacity=4)
+        for i in range(10):
+            trace = tracer.start(f"rpc_{i}")
+            tracer.finish(trace)
+
+        assert [t.rpc for t in tracer.traces()] == ["rpc_6", "rpc_7", "rpc_8", "rpc_9"]
+
+    def test_admin_dump_chrome_trace(self, tmp_path):
+        """DumpTraces geçerli Chrome trace JSON yazmalı."""
+        tracer = Tracer(sample_rate=1.0)
+        servicer = BotAIServicer(RuleBasedAgent(), tracer=tracer)
+        servicer.GetAction(SimpleNamespace(bot_id="bot_1"), None)
+        admin = AdminServicer(tracer, dump_dir=str(tmp_path))
+
+        response = admin.DumpTraces(SimpleNamespace(path="trace.json", clear=True), None)
+
+        path = str(tmp_path / "trace.json")
+        assert response["success"] and response["trace_count"] == 1
+        assert response["path"] == os.path.realpath(path)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+        assert {e["name"] for e in events} >= {"GetAction", "decode", "forward", "encode"}
+        assert tracer.traces() == []
+
+    def test_admin_dump_stays_in_dump_dir(self, tmp_path):
+        """İstek yolu dump_dir dışına yazamamalı."""
+        tracer = Tracer(sample_rate=1.0)
+        BotAIServicer(RuleBasedAgent(), tracer=tracer).GetAction(SimpleNamespace(bot_id="bot_1"), None)
+        dump_dir = tmp_path / "traces"
+        admin = AdminServicer(tracer, dump_dir=str(dump_dir))
+        outside = tmp_path / "escape.json"
+        os.makedirs(dump_dir)
+        os.symlink(outside, dump_dir / "link.json")
+
+        for path in (str(outside), "../escape.json", "sub/../../escape.json", "..", "link.json"):
+            response = admin.DumpTraces(SimpleNamespace(path=path, clear=False), None)
+            assert not response["success"], path
+        assert not outside.exists()
+        assert os.listdir(tmp_path) == ["traces"]
+
+        response = admin.DumpTraces(SimpleNamespace(path="", clear=False), None)
+        assert response["success"]
+        assert os.path.dirname(response["path"]) == os.path.realpath(dump_dir)
+
+
+class TestExperience:
+    """Online deneyim toplama testleri."""
+
+    def _servicer(self, capacity=100, **kwargs):
+        store = ExperienceStore(capacity, obs_dim=64)
+        collector = ExperienceCollector(store, **kwargs)
+        return BotAIServicer(RuleBasedAgent(), experience=collector), store
+
+    def _state(self, bot_id, timestamp):
+        return SimpleNamespace(bot_id=bot_id, timestamp=timestamp)
+
+    def test_rewards_joined_by_timestamp(self):
+        """Reward timestamp'i <= olan son adıma eklenmeli."""
+        servicer, store = self._servicer()
+        for t in (100, 200, 300):
+            servicer.GetAction(self._state("bot_1", t), None)
+
+        servicer.SendReward(SimpleNamespace(bot_id="bot_1", timestamp=250, total_reward=1.0, is_terminal=False), None)
+        servicer.SendReward(SimpleNamespace(bot_id="bot_1", timestamp=300, total_reward=2.0, is_terminal=True), None)
+
+        data = store.snapshot()
+        np.testing.assert_allclose(data["rewards"], [0.0, 1.0, 2.0])
+        assert data["dones"].tolist() == [False, False, True]
+        assert len(set(data["episode_ids"].tolist())) == 1
+
+    def test_end_episode_flushes_per_bot(self):
+        """EndEpisode sadece ilgili botun trajectory'sini kapatmalı."""
+        servicer, store = self._servicer()
+        servicer.GetActionsBatch(SimpleNamespace(states=[self._state("a", 1), self._state("b", 1)]), None)
+        servicer.GetAction(self._state("a", 2), None)
+
+        servicer.EndEpisode(SimpleNamespace(bot_id="a"), None)
+
+        assert len(store) == 2
+        assert servicer.experience.open_trajectories == 1
+
+    def test_unmatched_reward(self):
+        """Servis edilmemiş bot için reward eşleşmemeli."""
+        servicer, store = self._servicer()
+        response = servicer.SendReward(
+            SimpleNamespace(bot_id="ghost", timestamp=1, total_reward=1.0, is_terminal=False), None)
+
+        assert response["success"] is False
+        assert servicer.experience.get_stats()["unmatched_rewards"] == 1
+
+    def test_store_evicts_oldest(self):
+        """Kapasite dolunca en eski transition'lar düşmeli, cursor ilerlemeli."""
+        servicer, store = self._servicer(capacity=4, max_trajectory_length=3)
+        for t in range(7):
+            servicer.GetAction(self._state("bot_1", t), None)
+
+        # 3 + 3 uzunluğunda iki kesik trajectory yazıldı, 4'ü duruyor
+        assert len(store) == 4
+        assert store.get_stats()["dropped"] == 2
+        batch, cursor = store.read_since(0)
+        assert cursor == 6 and len(batch["actions"]) == 4
+        assert store.read_since(cursor)[0]["actions"].size == 0
+
+    def test_store_uses_agent_observation_dim(self):
+        """Server store'u agent boyutunda açmalı; uymayan observation reddedilmeli."""
+        server = BotAIServer(agent=RuleBasedAgent(observation_dim=96), experience_capacity=8,
+                             telemetry_interval=None, warmup_batch_sizes=None)
+        assert server.experience_store.observations.shape == (8, 96)
+
+        collector = ExperienceCollector(ExperienceStore(8, obs_dim=96))
+        with pytest.raises(ValueError, match="obs_dim 96"):
+            collector.record_step("bot_1", 1, np.zeros(64, dtype=np.float32), 0)
+        assert collector.open_trajectories == 0
+
+
+class TestSessions:
+    """Bot oturum tablosu testleri."""
+
+    def test_end_episode_is_per_bot(self):
+        """EndEpisode sadece ilgili botu sıfırlamalı, paylaşılan agent'a dokunmamalı."""
+        agent = RuleBasedAgent()
+        servicer = BotAIServicer(agent)
+        for bot_id in ("a", "a", "b"):
+            servicer.GetAction(SimpleNamespace(bot_id=bot_id), None)
+        steps = agent.step_count
+
+        response = servicer.EndEpisode(SimpleNamespace(bot_id="a"), None)
+
+        assert response["message"] == "Episode 1 ended"
+        assert servicer.sessions.get("a")["step"] == 0
+        assert servicer.sessions.get("b")["step"] == 1
+        assert agent.step_count == steps
+
+    def test_full_table_evicts_least_recent(self):
+        """Kapasite dolunca en uzun süredir görülmeyen oturum düşmeli."""
+        table = SessionTable(capacity=2)
+        evicted = []
+        table.add_evict_listener(evicted.append)
+
+        table.touch("a")
+        table.touch("b")
+        table.touch("a")
+        table.touch("c")
+
+        assert evicted == ["b"]
+        assert "a" in table and "c" in table and len(table) == 2
+
+    def test_idle_eviction_flushes_experience(self):
+        """Idle oturum düşünce açık trajectory store'a yazılmalı."""
+        store = ExperienceStore(16, obs_dim=64)
+        table = SessionTable(idle_timeout=5.0, state_dim=4)
+        servicer = BotAIServicer(RuleBasedAgent(), experience=ExperienceCollector(store), sessions=table)
+        servicer.GetAction(SimpleNamespace(bot_id="bot_1", timestamp=1), None)
+        table.state("bot_1")[:] = 1.0
+
+        assert table.evict_idle() == []
+        assert table.evict_idle(now=time.monotonic() + 10.0) == ["bot_1"]
+
+        assert len(table) == 0
+        assert len(store) == 1 and not store.snapshot()["dones"][0]
+        # Satır yeniden kullanılınca state temiz olmalı
+        table.touch("bot_2")
+        assert not table.state("bot_2").any()
+
+
+class TestDeltaStream:
+    """Delta kodlu stream testleri."""
+
+    def _delta(self, bot_id, keyframe, mask=b"", values=b""):
+        return SimpleNamespace(bot_id=bot_id, timestamp=0, keyframe=keyframe, changed_mask=mask, values=values)
+
+    def test_encode_apply_round_trip(self):
+        """Delta uygulanınca yeni observation elde edilmeli."""
+        previous = np.random.rand(64).astype(np.float32)
+        current = previous.copy()
+        current[[3, 17, 63]] = [0.1, 0.2, 0.3]
+
+        mask, values = encode_delta(previous, current)
+        row = previous.copy()
+
+        assert len(mask) == 8 and len(values) == 3 * 4
+        assert apply_delta(row, mask, values) == 3
+        np.testing.assert_array_equal(row, current)
+
+    def test_mismatched_payload_rejected(self):
+        """Mask ile değer sayısı uyuşmazsa satır değişmemeli."""
+        row = np.zeros(64, dtype=np.float32)
+        mask, _ = encode_delta(row, np.ones(64, dtype=np.float32))
+
+        with pytest.raises(DeltaFormatError):
+            apply_delta(row, mask, b"\x00" * 8)
+        assert not row.any()
+
+    def test_stream_patches_session_row(self):
+        """Keyframe + delta'lar oturum satırını güncellemeli, aralık dolunca keyframe istenmeli."""
+        servicer = BotAIServicer(RuleBasedAgent(), delta_keyframe_interval=2)
+        obs = np.random.rand(64).astype(np.float32)
+        messages = [self._delta("bot_1", True, values=encode_keyframe(obs))]
+        current = obs
+        for _ in range(2):
+            nxt = current.copy()
+            nxt[5] += 1.0
+            messages.append(self._delta("bot_1", False, *encode_delta(current, nxt)))
+            current = nxt
+
+        responses = list(servicer.StreamActionsDelta(iter(messages), None))
+
+        assert [r["keyframe_required"] for r in responses] == [False, False, True]
+        assert not any(r["degraded"] for r in responses)
+        row = servicer.sessions.observations[servicer.sessions.touch("bot_1")]
+        np.testing.assert_array_equal(row, current)
+        assert servicer.sessions.get("bot_1")["step"] == 4
+
+    def test_delta_without_keyframe_requests_resync(self):
+        """Keyframe'siz oturuma gelen delta tahmin yapılmadan keyframe istemeli."""
+        servicer = BotAIServicer(RuleBasedAgent())
+        zeros = np.zeros(64, dtype=np.float32)
+        mask, values = encode_delta(zeros, zeros)
+
+        [response] = servicer.StreamActionsDelta(iter([self._delta("bot_1", False, mask, values)]), None)
+
+        assert response["keyframe_required"] and response["degraded_reason"] == "keyframe_required"
+
+
+# Rule-based server'ın import + servicer kurulumu (ayrı process'te ölçülür)
+_RULE_BASED_STARTUP = """
+import json, sys
+heavy = lambda: sorted(m for m in ("torch", "stable_baselines3") if m in sys.modules)
+import python_rl_server.agents
+after_agents = heavy()
+from python_rl_server.agents import RuleBasedAgent
+from python_rl_server.server import BotAIServer
+from python_rl_server.server.grpc_server import BotAIServicer
+servicer = BotAIServicer(RuleBasedAgent())
+print(json.dumps({"agents": after_agents, "server": heavy()}))
+"""
+
+
+class TestLazyImports:
+    """Rule-based server torch/SB3 yüklemeden açılmalı."""
+
+    def test_rule_based_startup_skips_torch(self):
+        """Temiz interpreter'da agents ve rule-based servicer torch/SB3 import etmemeli."""
+        import subprocess
+        import sys
+
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        result = subprocess.run(
+            [sys.executable, "-c", _RULE_BASED_STARTUP],
+            cwd=root, capture_output=True, text=True, timeout=60
+        )
+        assert result.returncode == 0, result.stderr
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+
+        assert report["agents"] == []
+        assert report["server"] == []
+
+    def test_lazy_backends_resolve(self):
+        """Lazy isimler erişimde gerçek sınıflara çözülmeli."""
+        import python_rl_server.agents as agents
+        from python_rl_server.agents.ppo_agent import PPOAgent
+
+        assert agents.PPOAgent is PPOAgent
+        assert "ServingAgent" in dir(agents)
+        with pytest.raises(AttributeError):
+            agents.MissingAgent
@@ -5,5 +5,9 @@ Training scripts, callbacks ve reward fonksiyonları
 
 from .rewards import RewardCalculator
 from .callbacks import TrainingCallback, EvaluationCallback
+from .distillation import DistillationConfig, PolicyDistiller
 
-__all__ = ["RewardCalculator", "TrainingCallback", "EvaluationCallback"]
+__all__ = [
+    "RewardCalculator", "TrainingCallback", "EvaluationCallback",
+    "DistillationConfig", "PolicyDistiller"
+]
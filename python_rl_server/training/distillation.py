@@ -0,0 +1,241 @@
+"""
+Policy Distillation
+TÜBİTAK İP-2 AI Bot System
+
+Büyük ağla eğitilmiş PPO politikasını (teacher) servis maliyeti daha
+düşük küçük bir ağa (student) aktarır.
+
+1. Teacher CalypsoMockEnv'de oynatılır, observation'lar toplanır
+   (teacher kendi dağılımından sample eder).
+2. Teacher'ın aksiyon dağılımı ve value tahmini hedef olarak hesaplanır.
+3. Student KL(teacher || student) + value MSE ile eğitilir.
+
+Student normal bir PPOAgent'tır; SB3 zip formatında kaydedilir ve
+sunucu/export araçlarıyla aynı şekilde yüklenir.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from ..agents.ppo_agent import PPOAgent
+from ..environments import CalypsoMockEnv
+
+
+@dataclass
+class DistillationConfig:
+    """Distillation ayarları."""
+    student_layers: List[int] = field(default_factory=lambda: [64, 64])
+    num_samples: int = 50_000
+    holdout_fraction: float = 0.1
+    epochs: int = 20
+    batch_size: int = 256
+    learning_rate: float = 1e-3
+    value_coef: float = 0.5
+    seed: int = 0
+    env_kwargs: Dict = field(default_factory=dict)
+
+
+class PolicyDistiller:
+    """Teacher PPOAgent'tan küçük student PPOAgent'a distillation."""
+
+    def __init__(self, teacher: PPOAgent, config: Optional[DistillationConfig] = None):
+        """
+        Args:
+            teacher: Yüklenmiş teacher agent (inference-only olabilir)
+            config: Distillation ayarları
+        """
+        if teacher.model is None:
+            raise RuntimeError("Teacher model not initialized.")
+        self.teacher = teacher
+        self.config = config or DistillationConfig()
+        self.student: Optional[PPOAgent] = None
+        self.history: List[Dict[str, float]] = []
+
+        self._train_obs: Optional[np.ndarray] = None
+        self._holdout_obs: Optional[np.ndarray] = None
+
+    def make_env(self) -> CalypsoMockEnv:
+        """Teacher'ın observation boyutuyla uyumlu environment."""
+        env = CalypsoMockEnv(**self.config.env_kwargs)
+        obs_dim = int(np.prod(env.observation_space.shape))
+        if obs_dim != self.teacher.observation_dim:
+            raise ValueError(
+                f"Teacher expects {self.teacher.observation_dim}-dim observations, "
+                f"CalypsoMockEnv produces {obs_dim}"
+            )
+        return env
+
+    def collect(self, num_samples: Optional[int] = None) -> np.ndarray:
+        """
+        Teacher'ı oynatıp observation topla.
+
+        Son holdout_fraction kısmı agreement ölçümü için ayrılır.
+
+        Returns:
+            Toplanan observation'lar [N x obs_dim]
+        """
+        num_samples = num_samples or self.config.num_samples
+        env = self.make_env()
+        observations = np.zeros((num_samples, self.teacher.observation_dim), dtype=np.float32)
+
+        obs, _ = env.reset(seed=self.config.seed)
+        for i in range(num_samples):
+            observations[i] = obs
+            action, _ = self.teacher.select_action(obs)
+            obs, _, done, truncated, _ = env.step(action)
+            if done or truncated:
+                obs, _ = env.reset()
+        env.close()
+
+        num_holdout = int(num_samples * self.config.holdout_fraction)
+        self._train_obs = observations[:num_samples - num_holdout]
+        self._holdout_obs = observations[num_samples - num_holdout:]
+        print(f"[PolicyDistiller] Collected {num_samples} observations ({num_holdout} held out)")
+        return observations
+
+    def build_student(self) -> PPOAgent:
+        """Küçük ağlı student (teacher ile aynı aktivasyon)."""
+        teacher_kwargs = self.teacher.model.policy_kwargs
+        layers = list(self.config.student_layers)
+        student = PPOAgent(
+            name="StudentAgent",
+            policy_kwargs={
+                "net_arch": dict(pi=layers, vf=layers),
+                "activation_fn": teacher_kwargs.get("activation_fn", torch.nn.Tanh),
+                "ortho_init": True
+            },
+            device="cpu",
+            verbose=0
+        )
+        env = self.make_env()
+        student.initialize(env)
+        env.close()
+        return student
+
+    def _teacher_targets(self, observations: np.ndarray) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Teacher log-olasılıkları ve value'ları."""
+        policy = self.teacher.model.policy
+        with torch.no_grad():
+            obs_tensor = torch.as_tensor(observations, device=policy.device)
+            distribution = policy.get_distribution(obs_tensor).distribution
+            log_probs = torch.log_softmax(distribution.logits, dim=1)
+            values = policy.predict_values(obs_tensor).flatten()
+        return log_probs.cpu(), values.cpu()
+
+    @staticmethod
+    def _student_outputs(policy, obs_tensor: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        features = policy.extract_features(obs_tensor)
+        if policy.share_features_extractor:
+            latent_pi, latent_vf = policy.mlp_extractor(features)
+        else:
+            pi_features, vf_features = features
+            latent_pi = policy.mlp_extractor.forward_actor(pi_features)
+            latent_vf = policy.mlp_extractor.forward_critic(vf_features)
+        log_probs = torch.log_softmax(policy.action_net(latent_pi), dim=1)
+        return log_probs, policy.value_net(latent_vf).flatten()
+
+    def train(self, epochs: Optional[int] = None) -> PPOAgent:
+        """
+        Student'ı toplanan observation'larda eğit.
+
+        Returns:
+            Eğitilmiş student
+        """
+        if self._train_obs is None:
+            self.collect()
+        if self.student is None:
+            self.student = self.build_student()
+
+        config = self.config
+        epochs = epochs or config.epochs
+        policy = self.student.model.policy
+        policy.set_training_mode(True)
+        optimizer = torch.optim.Adam(policy.parameters(), lr=config.learning_rate)
+
+        observations = torch.as_tensor(self._train_obs)
+        target_log_probs, target_values = self._teacher_targets(self._train_obs)
+        generator = torch.Generator().manual_seed(config.seed)
+
+        for epoch in range(epochs):
+            permutation = torch.randperm(len(observations), generator=generator)
+            kl_total, value_total = 0.0, 0.0
+            for start in range(0, len(observations), config.batch_size):
+                idx = permutation[start:start + config.batch_size]
+                log_probs, values = self._student_outputs(policy, observations[idx])
+                # KL(teacher || student)
+                kl = F.kl_div(log_probs, target_log_probs[idx], log_target=True, reduction="batchmean")
+                value_loss = F.mse_loss(values, target_values[idx])
+                loss = kl + config.value_coef * value_loss
+
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+                kl_total += kl.item() * len(idx)
+                value_total += value_loss.item() * len(idx)
+
+            metrics = {
+                "epoch": epoch + 1,
+                "kl": kl_total / len(observations),
+                "value_mse": value_total / len(observations)
+            }
+            if len(self._holdout_obs):
+                metrics["holdout_agreement"] = self.action_agreement(self._holdout_obs)
+            self.history.append(metrics)
+            print(f"[PolicyDistiller] Epoch {epoch + 1}/{epochs}: kl={metrics['kl']:.4f} "
+                  f"value_mse={metrics['value_mse']:.4f} "
+                  f"agreement={metrics.get('holdout_agreement', float('nan')):.3f}")
+
+        policy.set_training_mode(False)
+        return self.student
+
+    def action_agreement(self, observations: np.ndarray) -> float:
+        """Deterministic aksiyonların teacher ile aynı olma oranı."""
+        teacher_actions, _ = self.teacher.select_actions(observations, deterministic=True)
+        student_actions, _ = self.student.select_actions(observations, deterministic=True)
+        return float(np.mean(teacher_actions == student_actions))
+
+    def holdout_report(self) -> Dict[str, float]:
+        """Held-out observation'larda agreement, KL ve value hatası."""
+        if self.student is None or self._holdout_obs is None or not len(self._holdout_obs):
+            return {}
+        target_log_probs, target_values = self._teacher_targets(self._holdout_obs)
+        with torch.no_grad():
+            log_probs, values = self._student_outputs(
+                self.student.model.policy, torch.as_tensor(self._holdout_obs)
+            )
+            kl = (target_log_probs.exp() * (target_log_probs - log_probs)).sum(dim=1)
+        return {
+            "samples": len(self._holdout_obs),
+            "action_agreement": self.action_agreement(self._holdout_obs),
+            "kl_mean": float(kl.mean()),
+            "kl_p99": float(torch.quantile(kl, 0.99)),
+            "value_mae": float((values - target_values).abs().mean())
+        }
+
+    def latency_report(self, batch_sizes=(1, 32), iterations: int = 500) -> Dict[str, Dict[int, float]]:
+        """Teacher ve student için select_actions latency'si (µs, medyan)."""
+        observations = self._holdout_obs if self._holdout_obs is not None and len(self._holdout_obs) else self._train_obs
+        report = {}
+        for label, agent in (("teacher", self.teacher), ("student", self.student)):
+            report[label] = {}
+            for batch_size in batch_sizes:
+                batch = np.resize(observations, (batch_size, observations.shape[1]))
+                for _ in range(20):
+                    agent.select_actions(batch, deterministic=True)
+                latencies = np.zeros(iterations)
+                for i in range(iterations):
+                    start = time.perf_counter()
+                    agent.select_actions(batch, deterministic=True)
+                    latencies[i] = time.perf_counter() - start
+                report[label][batch_size] = float(np.median(latencies) * 1e6)
+        return report
+
+    @staticmethod
+    def parameter_count(agent: PPOAgent) -> int:
+        """Politika parametre sayısı."""
+        return int(sum(p.numel() for p in agent.model.policy.parameters()))
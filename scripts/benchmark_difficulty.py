@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Difficulty Benchmark Script
+TÜBİTAK İP-2 AI Bot System
+
+DifficultyServicer.UpdatePlayerMetrics eşzamanlı güncelleme hızını ölçer.
+Her thread güncellemelerin yarısını iki paylaşılan oyuncuya, yarısını
+kendi oyuncusuna gönderir (her 50 güncellemede bir SetDifficulty).
+Thread ve lock şeridi sayısı başına saniyedeki güncelleme raporlanır;
+ölçüm sonunda güncelleme geçmişinin eksiksiz olduğu kontrol edilir.
+
+Usage:
+    python scripts/benchmark_difficulty.py
+    python scripts/benchmark_difficulty.py --threads 1,4,16 --stripes 1,64 --updates 2000
+    python scripts/benchmark_difficulty.py --output ./logs/difficulty_bench.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict
+
+# Project root'u path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_rl_server.difficulty import DifficultyManager
+from python_rl_server.server.grpc_server import DifficultyServicer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent difficulty updates")
+
+    parser.add_argument(
+        "--threads", type=str, default="1,2,8,16",
+        help="Comma-separated thread counts"
+    )
+    parser.add_argument(
+        "--stripes", type=str, default="1,64",
+        help="Comma-separated DifficultyManager lock stripe counts"
+    )
+    parser.add_argument(
+        "--updates", type=int, default=1000,
+        help="UpdatePlayerMetrics calls per thread"
+    )
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="Write the report as JSON"
+    )
+
+    return parser.parse_args()
+
+
+def run(num_threads: int, num_lock_stripes: int, updates: int) -> Dict:
+    """Tek ölçüm: num_threads thread'in toplam güncelleme hızı."""
+    manager = DifficultyManager(num_lock_stripes=num_lock_stripes)
+    servicer = DifficultyServicer(manager)
+    shared = ["shared_0", "shared_1"]
+    barrier = threading.Barrier(num_threads + 1)
+
+    def worker(index):
+        barrier.wait()
+        for i in range(updates):
+            player_id = shared[i % 2] if i % 4 < 2 else f"solo_{index}"
+            servicer.UpdatePlayerMetrics(
+                SimpleNamespace(player_id=player_id, recent_kills=1, recent_deaths=0), None)
+            if i % 50 == 0:
+                servicer.SetDifficulty(SimpleNamespace(player_id=player_id, difficulty_level=4), None)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = num_threads * updates
+    recorded = sum(len(h) for h in manager._difficulty_history.values())
+    return {
+        "threads": num_threads,
+        "lock_stripes": num_lock_stripes,
+        "updates": total,
+        "lost_updates": total - recorded,
+        "elapsed_s": elapsed,
+        "updates_per_s": total / elapsed
+    }
+
+
+def main():
+    args = parse_args()
+    thread_counts = [int(n) for n in args.threads.split(",") if n]
+    stripe_counts = [int(n) for n in args.stripes.split(",") if n]
+
+    results = [run(threads, stripes, args.updates) for stripes in stripe_counts for threads in thread_counts]
+
+    print(f"=" * 60)
+    print(f"Difficulty Update Benchmark ({args.updates} updates/thread)")
+    print(f"=" * 60)
+    print(f"  {'stripes':>7}  {'threads':>7}  {'updates/s':>12}  {'lost':>6}")
+    for result in results:
+        print(f"  {result['lock_stripes']:>7}  {result['threads']:>7}  "
+              f"{result['updates_per_s']:>12.0f}  {result['lost_updates']:>6}")
+    print(f"=" * 60)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"updates_per_thread": args.updates, "results": results}, f, indent=2)
+        print(f"Report written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
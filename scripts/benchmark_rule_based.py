@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Rule-Based Agent Benchmark Script
+TÜBİTAK İP-2 AI Bot System
+
+RuleBasedAgent karar maliyetini ölçer:
+- select_action (tek observation, skaler yol)
+- select_actions (batch; küçük batch'ler satır satır, büyükler kolon işlemleriyle)
+
+Her batch boyutu için karar başına µs ve saniyedeki karar sayısı
+raporlanır. Ölçümden önce batch sonuçlarının select_action ile aynı
+olduğu kontrol edilir.
+
+Usage:
+    python scripts/benchmark_rule_based.py
+    python scripts/benchmark_rule_based.py --batch-sizes 1,16,256,4096 --stochastic
+    python scripts/benchmark_rule_based.py --aggression 0.8 --output ./logs/rule_based_bench.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+# Project root'u path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_rl_server.agents import RuleBasedAgent
+from python_rl_server.environments import MockCombatEnv
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark RuleBasedAgent decision cost")
+
+    parser.add_argument(
+        "--samples", type=int, default=4096,
+        help="Observations to collect from MockCombatEnv"
+    )
+    parser.add_argument(
+        "--batch-sizes", type=str, default="1,8,32,128,1024",
+        help="Comma-separated batch sizes for select_actions"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=500,
+        help="Timed calls per measurement"
+    )
+    parser.add_argument(
+        "--stochastic", action="store_true",
+        help="Benchmark softmax sampling instead of argmax"
+    )
+    parser.add_argument(
+        "--aggression", type=float, default=0.5,
+        help="RuleBasedAgent aggression"
+    )
+    parser.add_argument(
+        "--caution", type=float, default=0.5,
+        help="RuleBasedAgent caution"
+    )
+    parser.add_argument(
+        "--team-focus", type=float, default=0.5,
+        help="RuleBasedAgent team focus"
+    )
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="Write the report as JSON"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42,
+        help="Random seed"
+    )
+
+    return parser.parse_args()
+
+
+def collect_observations(agent: RuleBasedAgent, n_samples: int, seed: int) -> np.ndarray:
+    """Agent'ın kendi rollout'larından observation topla."""
+    env = MockCombatEnv(max_steps=500)
+    observations = np.zeros((n_samples, agent.observation_dim), dtype=np.float32)
+    obs, _ = env.reset(seed=seed)
+    for i in range(n_samples):
+        observations[i] = obs
+        action, _ = agent.select_action(obs, deterministic=False, return_info=False)
+        obs, _, done, truncated, _ = env.step(action)
+        if done or truncated:
+            obs, _ = env.reset()
+    env.close()
+    return observations
+
+
+def time_call(fn, iterations: int) -> np.ndarray:
+    """Çağrı başına süreler (saniye)."""
+    for _ in range(20):
+        fn()
+    latencies = np.zeros(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def benchmark(
+    agent: RuleBasedAgent,
+    observations: np.ndarray,
+    batch_sizes: List[int],
+    iterations: int,
+    deterministic: bool
+) -> Dict[str, Dict]:
+    """select_action ve batch boyutu başına select_actions maliyeti."""
+    results = {}
+    single = observations[0]
+    latencies = time_call(lambda: agent.select_action(single, deterministic), iterations)
+    results["select_action"] = {
+        "batch_size": 1,
+        "p50_us": float(np.percentile(latencies, 50) * 1e6),
+        "us_per_decision": float(latencies.mean() * 1e6),
+        "decisions_per_s": float(1 / latencies.mean())
+    }
+
+    for batch_size in batch_sizes:
+        batch = np.resize(observations, (batch_size, observations.shape[1]))
+        latencies = time_call(lambda: agent.select_actions(batch, deterministic), iterations)
+        results[f"select_actions[{batch_size}]"] = {
+            "batch_size": batch_size,
+            "p50_us": float(np.percentile(latencies, 50) * 1e6),
+            "us_per_decision": float(latencies.mean() / batch_size * 1e6),
+            "decisions_per_s": float(batch_size / latencies.mean())
+        }
+    return results
+
+
+def main():
+    args = parse_args()
+    np.random.seed(args.seed)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+
+    agent = RuleBasedAgent(
+        aggression=args.aggression,
+        caution=args.caution,
+        team_focus=args.team_focus
+    )
+    observations = collect_observations(agent, args.samples, args.seed)
+
+    # Parity: batch ve skaler yol aynı aksiyonları seçmeli
+    batch_actions, _ = agent.select_actions(observations, deterministic=True)
+    single_actions = np.array([agent.select_action(obs)[0] for obs in observations])
+    mismatches = int(np.sum(batch_actions != single_actions))
+
+    results = benchmark(agent, observations, batch_sizes, args.iterations, not args.stochastic)
+
+    print(f"=" * 60)
+    print(f"RuleBasedAgent Benchmark ({'stochastic' if args.stochastic else 'deterministic'})")
+    print(f"=" * 60)
+    print(f"  Observations:  {len(observations)} from MockCombatEnv (seed {args.seed})")
+    print(f"  Parity:        {len(observations) - mismatches}/{len(observations)} batch == single")
+    print("-" * 60)
+    print(f"  {'call':<22}  {'p50':>10}  {'us/decision':>12}  {'decisions/s':>12}")
+    for label, result in results.items():
+        print(f"  {label:<22}  {result['p50_us']:>8.1f}us  {result['us_per_decision']:>12.2f}  "
+              f"{result['decisions_per_s']:>12.0f}")
+    print(f"=" * 60)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "personality": {
+                    "aggression": args.aggression,
+                    "caution": args.caution,
+                    "team_focus": args.team_focus
+                },
+                "deterministic": not args.stochastic,
+                "samples": len(observations),
+                "parity_mismatches": mismatches,
+                "results": results
+            }, f, indent=2)
+        print(f"Report written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
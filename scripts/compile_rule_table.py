@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Rule Table Compile Script
+TÜBİTAK İP-2 AI Bot System
+
+Verilen aggression/caution/team_focus için RuleBasedAgent karar
+tablosunu derler ve kaydeder. Rapor:
+- tam utility argmax'ına karşı hata (aksiyon uyumu, regret) hem
+  MockCombatEnv rollout'larında hem uniform rastgele observation'larda
+- tam ve derlenmiş mod için karar başına maliyet (benchmark_rule_based.py)
+
+Kaydedilen tablo start_server.py --rule-based --rule-table ile
+kullanılır (personality tabloyla aynı olmalı).
+
+Usage:
+    python scripts/compile_rule_table.py --output ./models/rule_table.npz
+    python scripts/compile_rule_table.py --aggression 0.8 --caution 0.3 --resolution 8 --output ./models/rule_table_aggressive.npz
+    python scripts/compile_rule_table.py --output ./models/rule_table.npz --report ./logs/rule_table.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+# Project root'u path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_rl_server.agents import RuleBasedAgent
+from benchmark_rule_based import benchmark, collect_observations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compile a RuleBasedAgent decision table")
+
+    parser.add_argument(
+        "--output", type=str, required=True,
+        help="Decision table path (.npz)"
+    )
+    parser.add_argument(
+        "--resolution", type=int, default=6,
+        help="Uniform intervals per axis (rule thresholds are always added)"
+    )
+    parser.add_argument(
+        "--aggression", type=float, default=0.5,
+        help="RuleBasedAgent aggression"
+    )
+    parser.add_argument(
+        "--caution", type=float, default=0.5,
+        help="RuleBasedAgent caution"
+    )
+    parser.add_argument(
+        "--team-focus", type=float, default=0.5,
+        help="RuleBasedAgent team focus"
+    )
+    parser.add_argument(
+        "--samples", type=int, default=20000,
+        help="Observations per error-report set"
+    )
+    parser.add_argument(
+        "--batch-sizes", type=str, default="1,32,1024",
+        help="Comma-separated batch sizes for the cost comparison"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=500,
+        help="Timed calls per measurement"
+    )
+    parser.add_argument(
+        "--report", type=str, default=None,
+        help="Write the report as JSON"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42,
+        help="Random seed"
+    )
+
+    return parser.parse_args()
+
+
+def print_errors(label: str, errors: dict):
+    print(f"  {label}:")
+    print(f"    Agreement:     {errors['agreement'] * 100:.2f}% ({errors['mismatches']}/{errors['samples']} differ)")
+    print(f"    Regret mean/p99/max: {errors['regret_mean']:.4f} / {errors['regret_p99']:.4f} / {errors['regret_max']:.4f}")
+    for name, stats in errors["per_action"].items():
+        print(f"    {name:<12} {stats['agreement'] * 100:6.2f}% of {stats['samples']}")
+
+
+def main():
+    args = parse_args()
+    np.random.seed(args.seed)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+
+    agent = RuleBasedAgent(
+        aggression=args.aggression,
+        caution=args.caution,
+        team_focus=args.team_focus
+    )
+    table = agent.compile(args.resolution)
+    table.save(args.output)
+
+    rollouts = collect_observations(agent, args.samples, args.seed)
+    uniform = np.random.default_rng(args.seed).random((args.samples, agent.observation_dim))
+    errors = {
+        "rollouts": table.error_report(agent, rollouts),
+        "uniform": table.error_report(agent, uniform)
+    }
+
+    cost = {"compiled": benchmark(agent, rollouts, batch_sizes, args.iterations, True)}
+    agent.set_decision_table(None)
+    cost["exact"] = benchmark(agent, rollouts, batch_sizes, args.iterations, True)
+
+    print(f"=" * 60)
+    print(f"Rule Decision Table: {args.output}")
+    print(f"=" * 60)
+    print(f"  Personality:   aggression={args.aggression} caution={args.caution} team_focus={args.team_focus}")
+    print(f"  Grid:          {table.shape} = {table.table.size:,} entries ({table.size_bytes / 1024 / 1024:.1f} MB)")
+    print(f"  Build time:    {table.metadata['build_seconds']:.1f}s")
+    print("-" * 60)
+    print_errors(f"MockCombatEnv rollouts (seed {args.seed})", errors["rollouts"])
+    print_errors("Uniform random observations", errors["uniform"])
+    print("-" * 60)
+    print(f"  {'call':<22}  {'exact us/dec':>12}  {'table us/dec':>12}  {'speedup':>7}")
+    for label in cost["exact"]:
+        exact, compiled = cost["exact"][label], cost["compiled"][label]
+        print(f"  {label:<22}  {exact['us_per_decision']:>12.2f}  {compiled['us_per_decision']:>12.2f}  "
+              f"{exact['us_per_decision'] / compiled['us_per_decision']:>6.2f}x")
+    print(f"=" * 60)
+
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w") as f:
+            json.dump({
+                "table": args.output,
+                "personality": list(table.personality),
+                "resolution": args.resolution,
+                "shape": list(table.shape),
+                "size_bytes": table.size_bytes,
+                "build_seconds": table.metadata["build_seconds"],
+                "errors": errors,
+                "cost": cost
+            }, f, indent=2)
+        print(f"Report written to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Policy Distillation Script
+TÜBİTAK İP-2 AI Bot System
+
+Eğitilmiş (büyük) PPO modelini CalypsoMockEnv'de oynatıp küçük bir
+student ağa distill eder. Rapor:
+- held-out observation'larda aksiyon uyumu ve KL
+- evaluate.py ile teacher/student ödül karşılaştırması
+- select_actions latency'si (batch 1 ve 32)
+
+Student normal SB3 zip formatında kaydedilir (start_server.py,
+export_policy.py ile doğrudan kullanılabilir).
+
+Usage:
+    python scripts/distill_policy.py --teacher ./models/calypso_best.zip --output ./models/calypso_student.zip
+    python scripts/distill_policy.py --teacher ./models/calypso_best.zip --student-layers 128,128 --samples 100000
+    python scripts/distill_policy.py --teacher ./models/calypso_best.zip --report ./logs/distillation.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+# Project root'u path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_rl_server.agents import PPOAgent
+from python_rl_server.training.distillation import DistillationConfig, PolicyDistiller
+from evaluate import evaluate_agent, print_metrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distill a PPO policy into a smaller network")
+
+    parser.add_argument(
+        "--teacher", type=str, required=True,
+        help="Path to trained teacher PPO model (.zip)"
+    )
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="Student model path (default: <teacher>_student.zip)"
+    )
+    parser.add_argument(
+        "--student-layers", type=str, default="64,64",
+        help="Comma-separated hidden layer widths for the student pi/vf trunks"
+    )
+    parser.add_argument(
+        "--samples", type=int, default=50000,
+        help="Teacher observations to collect"
+    )
+    parser.add_argument(
+        "--epochs", type=int, default=20,
+        help="Training epochs over the collected observations"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=256,
+        help="Mini-batch size"
+    )
+    parser.add_argument(
+        "--lr", type=float, default=1e-3,
+        help="Student learning rate"
+    )
+    parser.add_argument(
+        "--eval-episodes", type=int, default=20,
+        help="Episodes per agent for the reward comparison (0 = skip)"
+    )
+    parser.add_argument(
+        "--tier", type=int, default=1,
+        help="CalypsoMockEnv initial enemy tier"
+    )
+    parser.add_argument(
+        "--alarm", type=int, default=1,
+        help="CalypsoMockEnv alarm level"
+    )
+    parser.add_argument(
+        "--area", type=int, default=1,
+        help="CalypsoMockEnv area type"
+    )
+    parser.add_argument(
+        "--report", type=str, default=None,
+        help="Write the distillation report as JSON"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42,
+        help="Random seed"
+    )
+
+    args = parser.parse_args()
+    # Özet ve rapor held-out observation'lara dayanır; boş split'i eğitimden önce reddet
+    if int(args.samples * DistillationConfig.holdout_fraction) < 1:
+        parser.error(
+            f"--samples {args.samples} leaves no held-out observations "
+            f"(holdout fraction {DistillationConfig.holdout_fraction})"
+        )
+    return args
+
+
+def main():
+    args = parse_args()
+    np.random.seed(args.seed)
+    output = args.output or os.path.splitext(args.teacher)[0] + "_student.zip"
+
+    teacher = PPOAgent(name="TeacherAgent", verbose=0)
+    teacher.load(args.teacher, inference_only=True)
+
+    config = DistillationConfig(
+        student_layers=[int(width) for width in args.student_layers.split(",") if width],
+        num_samples=args.samples,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.lr,
+        seed=args.seed,
+        env_kwargs={"initial_tier": args.tier, "alarm_level": args.alarm, "area_type": args.area}
+    )
+
+    print(f"=" * 60)
+    print(f"TÜBİTAK İP-2 Policy Distillation")
+    print(f"=" * 60)
+    print(f"Teacher: {args.teacher}")
+    print(f"Student layers: {config.student_layers}")
+    print(f"Samples: {config.num_samples}, Epochs: {config.epochs}")
+    print("-" * 60)
+
+    distiller = PolicyDistiller(teacher, config)
+    distiller.collect()
+    student = distiller.train()
+    student.save(output)
+
+    holdout = distiller.holdout_report()
+    latency = distiller.latency_report()
+    report = {
+        "teacher": args.teacher,
+        "student": output,
+        "student_layers": config.student_layers,
+        "parameters": {
+            "teacher": distiller.parameter_count(teacher),
+            "student": distiller.parameter_count(student)
+        },
+        "holdout": holdout,
+        "latency_us": latency,
+        "history": distiller.history
+    }
+
+    if args.eval_episodes:
+        env = distiller.make_env()
+        teacher_metrics = evaluate_agent(teacher, env, args.eval_episodes)
+        teacher_metrics["episodes"] = args.eval_episodes
+        student_metrics = evaluate_agent(student, env, args.eval_episodes)
+        student_metrics["episodes"] = args.eval_episodes
+        env.close()
+        print_metrics("Teacher", teacher_metrics)
+        print_metrics("Student", student_metrics)
+        report["evaluation"] = {
+            "teacher": {k: float(v) for k, v in teacher_metrics.items()},
+            "student": {k: float(v) for k, v in student_metrics.items()}
+        }
+
+    print(f"\n{'=' * 50}")
+    print(f"  Distillation Summary")
+    print(f"{'=' * 50}")
+    print(f"  Parameters:       {report['parameters']['teacher']:,} -> {report['parameters']['student']:,}")
+    if holdout:
+        print(f"  Action agreement: {holdout['action_agreement'] * 100:.2f}% ({holdout['samples']} held-out obs)")
+        print(f"  KL mean/p99:      {holdout['kl_mean']:.2e} / {holdout['kl_p99']:.2e}")
+        print(f"  Value MAE:        {holdout['value_mae']:.4f}")
+    else:
+        print(f"  Action agreement: n/a (no held-out obs)")
+    for batch_size in latency["teacher"]:
+        print(f"  Latency (batch {batch_size:>3}): {latency['teacher'][batch_size]:.0f}us -> "
+              f"{latency['student'][batch_size]:.0f}us")
+    if "evaluation" in report:
+        teacher_reward = report["evaluation"]["teacher"]["mean_reward"]
+        student_reward = report["evaluation"]["student"]["mean_reward"]
+        print(f"  Mean reward:      {teacher_reward:.2f} -> {student_reward:.2f} ({student_reward - teacher_reward:+.2f})")
+    print(f"  Student saved to: {output}")
+    print(f"{'=' * 50}")
+
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Policy Export Script
+TÜBİTAK İP-2 AI Bot System
+
+Eğitilmiş PPO modelini (SB3 zip) sunucu için frozen TorchScript
+dosyasına (ServingAgent, SB3'süz) veya NumPy ağırlıklarına
+(NumpyPolicyAgent, torch'suz) export eder.
+
+Usage:
+    python scripts/export_policy.py --model ./models/ppo_best.zip --output ./models/ppo_best.pt
+    python scripts/export_policy.py --model ./models/ppo_best.zip --output ./models/ppo_best.pt --version v12
+    python scripts/export_policy.py --model ./models/ppo_best.zip --output ./models/ppo_best_int8.pt --quantize
+    python scripts/export_policy.py --model ./models/ppo_best.zip --format numpy
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Project root'u path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_rl_server.agents import PPOAgent, ServingAgent, NumpyPolicyAgent, export_policy, export_numpy_policy
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export PPO policy to TorchScript")
+
+    parser.add_argument(
+        "--model", type=str, required=True,
+        help="Path to trained PPO model (.zip)"
+    )
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="Output path (default: model path with .pt/.npz extension)"
+    )
+    parser.add_argument(
+        "--format", type=str, default="torchscript", choices=["torchscript", "numpy"],
+        help="torchscript: frozen .pt for ServingAgent, numpy: .npz weights for NumpyPolicyAgent"
+    )
+    parser.add_argument(
+        "--version", type=str, default="",
+        help="Version label stored in the export metadata"
+    )
+    parser.add_argument(
+        "--quantize", action="store_true",
+        help="Dynamic int8 Linear layers (CPU only; check with quantization_parity.py)"
+    )
+    parser.add_argument(
+        "--verify-samples", type=int, default=256,
+        help="Random observations used to check parity with the SB3 policy (0 = skip)"
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    numpy_format = args.format == "numpy"
+    if numpy_format and args.quantize:
+        sys.exit("--quantize is only supported for the torchscript format")
+    output = args.output or os.path.splitext(args.model)[0] + (".npz" if numpy_format else ".pt")
+
+    agent = PPOAgent(verbose=0)
+    agent.load(args.model, inference_only=True)
+
+    if numpy_format:
+        metadata = export_numpy_policy(agent, output, version=args.version)
+    else:
+        metadata = export_policy(agent, output, version=args.version, quantize=args.quantize)
+    print(f"  Observation dim: {metadata['observation_dim']}")
+    print(f"  Actions: {metadata['action_dim']}")
+    print(f"  Parameters: {metadata['param_bytes'] / 1024:.1f} KB")
+    print(f"  File size: {os.path.getsize(output) / 1024:.1f} KB")
+
+    start = time.perf_counter()
+    serving = NumpyPolicyAgent(output) if numpy_format else ServingAgent(output)
+    print(f"  Load time: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.verify_samples:
+        observations = np.random.uniform(
+            -1.0, 1.0, (args.verify_samples, agent.observation_dim)
+        ).astype(np.float32)
+        expected, expected_info = agent.select_actions(observations, deterministic=True)
+        actions, info = serving.select_actions(observations, deterministic=True)
+        mismatches = int(np.count_nonzero(actions != expected))
+        value_error = float(np.max(np.abs(info["value_estimate"] - expected_info["value_estimate"])))
+        print(f"  Parity: {mismatches}/{len(actions)} action mismatches, max value error {value_error:.2e}")
+        # Quantized modelde küçük sapma beklenir
+        if mismatches and not args.quantize:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Load Test Script
+TÜBİTAK İP-2 AI Bot System
+
+Unreal game server'larını taklit eden yük testi aracı.
+
+M bağlantı (game server) açılır; her bağlantı K bot sürer ve tick_rate
+Hz'de state gönderir. Bot state'leri gerçek MockCombatEnv/CalypsoMockEnv
+instance'larından gelir; server'ın döndürdüğü aksiyonlar env'in aksiyon
+tablosundan geçirilerek env'e uygulanır.
+
+CalypsoMockEnv 96-dim observation üretir; GameState codec'i 64 alan
+taşıdığı için --env calypso sadece --rpc packed ile (ham observation
+matrisi) ve 96-dim/16 aksiyonlu bir modele karşı çalışır.
+
+Transport:
+    grpc      - localhost server'a gerçek gRPC (derlenmiş proto stub'ları gerekir)
+    inprocess - BotAIServicer'ı direkt çağırır (gRPC/proto decode hariç tüm pipeline)
+
+Usage:
+    python scripts/load_test.py --connections 8 --bots 32 --tick-rate 10 --duration 30
+    python scripts/load_test.py --rpc stream --output ./logs/load_test.json
+    python scripts/load_test.py --rpc packed --env calypso --transport inprocess --model ./models/calypso.zip
+    python scripts/load_test.py --transport inprocess --rpc single
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+import numpy as np
+
+# Project root'u path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_rl_server.environments import MockCombatEnv, CalypsoMockEnv
+from python_rl_server.environments.calypso_mock_env import CalypsoAction
+from python_rl_server.server.packed import PACKED_SCHEMA_VERSION, pack_observations, unpack_actions
+from python_rl_server.server.state_codec import observation_to_game_state
+
+
+# Server aksiyonu -> env aksiyonu. Server, env ile aynı aksiyon uzayında
+# eğitilmiş modeli servis etmeli; tabloda olmayan aksiyon hata sayılır.
+ACTION_TABLES = {
+    "combat": tuple(range(MockCombatEnv.ACTION_FLANK + 1)),
+    "calypso": tuple(action.value for action in CalypsoAction)
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test Bot AI gRPC Server")
+
+    parser.add_argument(
+        "--target", type=str, default="localhost:50051",
+        help="Server address (grpc transport)"
+    )
+    parser.add_argument(
+        "--transport", type=str, default="grpc", choices=["grpc", "inprocess"],
+        help="grpc: real channel to target, inprocess: call BotAIServicer directly"
+    )
+    parser.add_argument(
+        "--rpc", type=str, default="batch", choices=["single", "batch", "stream", "packed"],
+        help="single: GetAction per bot, batch: GetActionsBatch per tick, stream: StreamActions, "
+             "packed: GetActionsPacked per tick"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=4,
+        help="Number of simulated game-server connections (M)"
+    )
+    parser.add_argument(
+        "--bots", type=int, default=16,
+        help="Bots per connection (K)"
+    )
+    parser.add_argument(
+        "--tick-rate", type=float, default=10.0,
+        help="Ticks per second per connection"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0,
+        help="Test duration in seconds"
+    )
+    parser.add_argument(
+        "--env", type=str, default="combat", choices=["combat", "calypso"],
+        help="Environment generating the game states (calypso requires --rpc packed)"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=1.0,
+        help="Per-RPC timeout in seconds"
+    )
+    parser.add_argument(
+        "--model", type=str, default=None,
+        help="inprocess transport: PPO model to serve (default: RuleBasedAgent)"
+    )
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="Write JSON report to this path"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42,
+        help="Random seed"
+    )
+
+    args = parser.parse_args()
+    if args.env == "calypso" and args.rpc != "packed":
+        parser.error("--env calypso sends 96-dim observations and needs --rpc packed "
+                     "(the GameState codec carries 64 fields)")
+    if args.env == "calypso" and args.transport == "inprocess" and not args.model:
+        parser.error("--env calypso with --transport inprocess needs a 96-dim --model")
+    return args
+
+
+class GrpcTransport:
+    """Tek game server bağlantısı (kendi channel'ı ile)."""
+
+    def __init__(self, target: str, timeout: float):
+        try:
+            import grpc
+            from python_rl_server.server import bot_service_pb2, bot_service_pb2_grpc
+        except ImportError as e:
+            raise SystemExit(
+                f"gRPC stubs not found ({e}). Compile protos first (see README) "
+                f"or use --transport inprocess."
+            )
+
+        self.messages = bot_service_pb2
+        self.timeout = timeout
+        # Her bağlantı ayrı TCP bağlantısı açsın (paylaşılan subchannel yok)
+        self.channel = grpc.insecure_channel(target, options=[("grpc.use_local_subchannel_pool", 1)])
+        self.stub = bot_service_pb2_grpc.BotAIServiceStub(self.channel)
+        self._stream_requests = None
+        self._stream_responses = None
+
+    def get_action(self, state) -> int:
+        return int(self.stub.GetAction(state, timeout=self.timeout).action_type)
+
+    def get_actions_batch(self, states) -> List[int]:
+        response = self.stub.GetActionsBatch(
+            self.messages.BatchGameState(states=states), timeout=self.timeout
+        )
+        return [int(a.action_type) for a in response.actions]
+
+    def get_actions_packed(self, request: dict) -> List[int]:
+        response = self.stub.GetActionsPacked(
+            self.messages.PackedObservations(**request), timeout=self.timeout
+        )
+        return unpack_actions(response.actions)[0].tolist()
+
+    def stream(self, states, send_times: List[float]) -> List[int]:
+        if self._stream_responses is None:
+            import queue
+            self._stream_requests = queue.SimpleQueue()
+            self._stream_responses = self.stub.StreamActions(iter(self._stream_requests.get, None))
+
+        for state in states:
+            send_times.append(time.perf_counter())
+            self._stream_requests.put(state)
+        return [int(next(self._stream_responses).action_type) for _ in states]
+
+    def close(self) -> None:
+        if self._stream_requests is not None:
+            self._stream_requests.put(None)
+        self.channel.close()
+
+
+class InProcessTransport:
+    """gRPC olmadan paylaşılan BotAIServicer'ı çağırır."""
+
+    messages = None
+
+    def __init__(self, servicer):
+        self.servicer = servicer
+
+    def get_action(self, state) -> int:
+        return int(self.servicer.GetAction(state, None)["action_type"])
+
+    def get_actions_batch(self, states) -> List[int]:
+        response = self.servicer.GetActionsBatch(SimpleNamespace(states=states), None)
+        return [int(a["action_type"]) for a in response["actions"]]
+
+    def get_actions_packed(self, request: dict) -> List[int]:
+        response = self.servicer.GetActionsPacked(SimpleNamespace(**request), None)
+        return unpack_actions(response["actions"])[0].tolist()
+
+    def stream(self, states, send_times: List[float]) -> List[int]:
+        def requests():
+            for state in states:
+                send_times.append(time.perf_counter())
+                yield state
+        return [int(a["action_type"]) for a in self.servicer.StreamActions(requests(), None)]
+
+    def close(self) -> None:
+        pass
+
+
+class SimulatedGameServer(threading.Thread):
+    """K bot süren tek game server bağlantısı."""
+
+    def __init__(self, index: int, transport, args, stop_event: threading.Event):
+        super().__init__(name=f"GameServer-{index}", daemon=True)
+        self.index = index
+        self.transport = transport
+        self.args = args
+        self.stop_event = stop_event
+
+        env_class = CalypsoMockEnv if args.env == "calypso" else MockCombatEnv
+        self.envs = [env_class() for _ in range(args.bots)]
+        self.observations = [
+            env.reset(seed=args.seed + index * args.bots + i)[0]
+            for i, env in enumerate(self.envs)
+        ]
+        self.bot_ids = [f"gs{index}_bot{i}" for i in range(args.bots)]
+        self.action_table = ACTION_TABLES[args.env]
+        self.player_id = f"player_{index}"
+
+        self.latencies: List[float] = []
+        self.decisions = 0
+        self.rpcs = 0
+        self.errors: Dict[str, int] = collections.Counter()
+        self.ticks = 0
+        self.late_ticks = 0
+
+    def _states(self) -> list:
+        now_ms = int(time.time() * 1000)
+        return [
+            observation_to_game_state(
+                obs, bot_id=bot_id, player_id=self.player_id,
+                timestamp=now_ms, messages=self.transport.messages
+            )
+            for obs, bot_id in zip(self.observations, self.bot_ids)
+        ]
+
+    def _packed_request(self) -> dict:
+        payload, num_rows, obs_dim = pack_observations(np.stack(self.observations))
+        return dict(
+            schema_version=PACKED_SCHEMA_VERSION, num_rows=num_rows, obs_dim=obs_dim,
+            bot_ids=self.bot_ids, observations=payload,
+            timestamp=int(time.time() * 1000), player_id=self.player_id
+        )
+
+    def _apply_actions(self, actions: List[int]) -> None:
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            action = int(action)
+            if not 0 <= action < len(self.action_table):
+                # Server farklı aksiyon uzaylı bir model servis ediyor
+                self.errors["invalid_action"] += 1
+                action = 0
+            obs, _, terminated, truncated, _ = env.step(self.action_table[action])
+            if terminated or truncated:
+                obs, _ = env.reset()
+            self.observations[i] = obs
+
+    def _tick(self) -> None:
+        rpc = self.args.rpc
+        if rpc == "packed":
+            request = self._packed_request()
+            start = time.perf_counter()
+            actions = self.transport.get_actions_packed(request)
+            self.latencies.append(time.perf_counter() - start)
+            self.rpcs += 1
+            self.decisions += len(actions)
+            self._apply_actions(actions)
+            return
+
+        states = self._states()
+        if rpc == "single":
+            actions = []
+            for state in states:
+                start = time.perf_counter()
+                actions.append(self.transport.get_action(state))
+                self.latencies.append(time.perf_counter() - start)
+                self.rpcs += 1
+        elif rpc == "batch":
+            start = time.perf_counter()
+            actions = self.transport.get_actions_batch(states)
+            elapsed = time.perf_counter() - start
+            self.latencies.append(elapsed)
+            self.rpcs += 1
+        else:
+            send_times: List[float] = []
+            actions = []
+            for action in self.transport.stream(states, send_times):
+                actions.append(action)
+                self.latencies.append(time.perf_counter() - send_times[len(actions) - 1])
+            self.rpcs += len(states)
+
+        self.decisions += len(actions)
+        self._apply_actions(actions)
+
+    def run(self) -> None:
+        interval = 1.0 / self.args.tick_rate
+        next_tick = time.perf_counter()
+        while not self.stop_event.is_set():
+            try:
+                self._tick()
+            except Exception as e:
+                code = getattr(e, "code", None)
+                key = str(code()) if callable(code) else type(e).__name__
+                self.errors[key] += 1
+            self.ticks += 1
+
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self.stop_event.wait(delay)
+            else:
+                # Tick bütçesi aşıldı; birikmiş tick'leri atla
+                self.late_ticks += 1
+                next_tick = time.perf_counter()
+
+        self.transport.close()
+        for env in self.envs:
+            env.close()
+
+
+def build_report(servers: List[SimulatedGameServer], args, elapsed: float) -> Dict:
+    """Toplu sonuç raporu."""
+    latencies = np.array([lat for s in servers for lat in s.latencies], dtype=np.float64) * 1000
+    decisions = sum(s.decisions for s in servers)
+    rpcs = sum(s.rpcs for s in servers)
+    errors: Dict[str, int] = collections.Counter()
+    for s in servers:
+        errors.update(s.errors)
+    error_count = sum(errors.values())
+    ticks = sum(s.ticks for s in servers)
+
+    def pct(q):
+        return float(np.percentile(latencies, q)) if latencies.size else 0.0
+
+    return {
+        "config": {
+            "transport": args.transport,
+            "target": args.target,
+            "rpc": args.rpc,
+            "connections": args.connections,
+            "bots_per_connection": args.bots,
+            "tick_rate": args.tick_rate,
+            "env": args.env,
+            "duration_s": args.duration
+        },
+        "elapsed_s": elapsed,
+        "decisions": decisions,
+        "rpcs": rpcs,
+        "throughput_decisions_per_s": decisions / elapsed if elapsed > 0 else 0.0,
+        "throughput_rpcs_per_s": rpcs / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": float(latencies.mean()) if latencies.size else 0.0,
+            "p50": pct(50),
+            "p99": pct(99),
+            "p999": pct(99.9),
+            "max": float(latencies.max()) if latencies.size else 0.0
+        },
+        "errors": dict(errors),
+        "error_rate": error_count / max(ticks, 1),
+        "ticks": ticks,
+        "late_ticks": sum(s.late_ticks for s in servers)
+    }
+
+
+def make_inprocess_servicer(args):
+    """inprocess transport için BotAIServer ile aynı ayarlarda servicer."""
+    from python_rl_server.agents import RuleBasedAgent
+    from python_rl_server.server.grpc_server import BotAIServicer, load_ppo_agent
+
+    if args.model:
+        agent = load_ppo_agent(args.model)
+    else:
+        agent = RuleBasedAgent()
+    return BotAIServicer(agent, batch_inference=True)
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("TÜBİTAK İP-2 Bot AI Load Test")
+    print("=" * 60)
+    print(f"Transport: {args.transport} ({args.target if args.transport == 'grpc' else 'BotAIServicer'})")
+    print(f"RPC: {args.rpc}, connections: {args.connections}, bots/connection: {args.bots}, "
+          f"tick rate: {args.tick_rate} Hz, env: {args.env}")
+
+    servicer = make_inprocess_servicer(args) if args.transport == "inprocess" else None
+
+    stop_event = threading.Event()
+    servers = []
+    for i in range(args.connections):
+        transport = (InProcessTransport(servicer) if servicer is not None
+                     else GrpcTransport(args.target, args.timeout))
+        servers.append(SimulatedGameServer(i, transport, args, stop_event))
+
+    start = time.perf_counter()
+    for server in servers:
+        server.start()
+    try:
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        print("\nInterrupted, collecting results...")
+    stop_event.set()
+    for server in servers:
+        server.join(timeout=args.timeout + 5.0)
+    elapsed = time.perf_counter() - start
+
+    if servicer is not None:
+        servicer.stop()
+
+    report = build_report(servers, args, elapsed)
+
+    print("-" * 60)
+    print(f"Decisions/s: {report['throughput_decisions_per_s']:.1f} "
+          f"(RPCs/s: {report['throughput_rpcs_per_s']:.1f})")
+    lat = report["latency_ms"]
+    print(f"Latency ms: p50={lat['p50']:.2f} p99={lat['p99']:.2f} "
+          f"p999={lat['p999']:.2f} max={lat['max']:.2f}")
+    print(f"Errors: {report['errors'] or 0} (rate {report['error_rate']:.4f}), "
+          f"late ticks: {report['late_ticks']}/{report['ticks']}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
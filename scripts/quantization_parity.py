@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Quantization Parity Script
+TÜBİTAK İP-2 AI Bot System
+
+PPO politikasının float32 ve dinamik int8 export'larını aynı held-out
+observation seti üzerinde karşılaştırır:
+- aksiyon uyumu (deterministic argmax)
+- olasılık sapması (KL(float || int8), max |Δp|)
+- value tahmini hatası
+- batch 1/8/32/128 için latency ve throughput
+
+Held-out set verilmezse MockCombatEnv rollout'larından toplanır
+(float politika ile, stochastic).
+
+Usage:
+    python scripts/quantization_parity.py --model ./models/ppo_best.zip
+    python scripts/quantization_parity.py --model ./models/ppo_best.zip --observations ./logs/experience.npz
+    python scripts/quantization_parity.py --model ./models/ppo_best.zip --output ./logs/quantization.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+# Project root'u path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_rl_server.agents import PPOAgent, ServingAgent, export_policy
+from python_rl_server.environments import MockCombatEnv
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare float and int8 PPO policies")
+
+    parser.add_argument(
+        "--model", type=str, required=True,
+        help="Path to trained PPO model (.zip)"
+    )
+    parser.add_argument(
+        "--observations", type=str, default=None,
+        help="Held-out observations (.npz with an 'observations' array, e.g. ExperienceStore.export)"
+    )
+    parser.add_argument(
+        "--samples", type=int, default=5000,
+        help="Observations to collect from MockCombatEnv when --observations is not given"
+    )
+    parser.add_argument(
+        "--batch-sizes", type=str, default="1,8,32,128",
+        help="Comma-separated batch sizes for the latency comparison"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=500,
+        help="Timed forward passes per batch size"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=1,
+        help="torch intra-op threads during the benchmark"
+    )
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="Write the report as JSON"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42,
+        help="Random seed"
+    )
+
+    return parser.parse_args()
+
+
+def collect_observations(agent, n_samples: int, seed: int) -> np.ndarray:
+    """Politikanın kendi rollout'larından observation topla."""
+    env = MockCombatEnv(max_steps=500)
+    observations = np.zeros((n_samples, agent.observation_dim), dtype=np.float32)
+    obs, _ = env.reset(seed=seed)
+    for i in range(n_samples):
+        observations[i] = obs
+        action, _ = agent.select_action(obs)
+        obs, _, done, truncated, _ = env.step(action)
+        if done or truncated:
+            obs, _ = env.reset()
+    env.close()
+    return observations
+
+
+def _probabilities(agent, info: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.stack([info[f"prob_{agent.get_action_name(i)}"] for i in range(agent.action_dim)], axis=1)
+
+
+def compare(reference, candidate, observations: np.ndarray) -> Dict:
+    """Aksiyon uyumu ve olasılık/value sapması."""
+    ref_actions, ref_info = reference.select_actions(observations, deterministic=True)
+    actions, info = candidate.select_actions(observations, deterministic=True)
+
+    p = _probabilities(reference, ref_info).astype(np.float64)
+    q = _probabilities(candidate, info).astype(np.float64)
+    eps = 1e-12
+    kl = np.sum(p * (np.log(p + eps) - np.log(q + eps)), axis=1)
+    value_error = np.abs(ref_info["value_estimate"] - info["value_estimate"])
+
+    return {
+        "samples": len(observations),
+        "action_agreement": float(np.mean(actions == ref_actions)),
+        "kl_mean": float(kl.mean()),
+        "kl_p99": float(np.percentile(kl, 99)),
+        "kl_max": float(kl.max()),
+        "max_prob_diff": float(np.abs(p - q).max()),
+        "value_mae": float(value_error.mean()),
+        "value_max_error": float(value_error.max())
+    }
+
+
+def benchmark(agent, observations: np.ndarray, batch_sizes: List[int], iterations: int) -> Dict[int, Dict]:
+    """Batch boyutu başına forward latency (µs) ve throughput (obs/s)."""
+    results = {}
+    for batch_size in batch_sizes:
+        batch = observations[:batch_size]
+        if len(batch) < batch_size:
+            batch = np.resize(observations, (batch_size, observations.shape[1]))
+        for _ in range(20):
+            agent.select_actions(batch, deterministic=True)
+
+        latencies = np.zeros(iterations)
+        for i in range(iterations):
+            start = time.perf_counter()
+            agent.select_actions(batch, deterministic=True)
+            latencies[i] = time.perf_counter() - start
+
+        results[batch_size] = {
+            "p50_us": float(np.percentile(latencies, 50) * 1e6),
+            "p99_us": float(np.percentile(latencies, 99) * 1e6),
+            "throughput": float(batch_size / latencies.mean())
+        }
+    return results
+
+
+def main():
+    args = parse_args()
+    np.random.seed(args.seed)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+
+    agent = PPOAgent(verbose=0)
+    agent.load(args.model, inference_only=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        float_path = os.path.join(tmp, "float.pt")
+        int8_path = os.path.join(tmp, "int8.pt")
+        float_meta = export_policy(agent, float_path)
+        int8_meta = export_policy(agent, int8_path, quantize=True)
+        float_agent = ServingAgent(float_path, name="float32", num_threads=args.threads)
+        int8_agent = ServingAgent(int8_path, name="int8")
+        file_sizes = {"float32": os.path.getsize(float_path), "int8": os.path.getsize(int8_path)}
+
+    if args.observations:
+        observations = np.load(args.observations)["observations"].astype(np.float32)
+        source = args.observations
+    else:
+        observations = collect_observations(float_agent, args.samples, args.seed)
+        source = f"MockCombatEnv rollouts (seed {args.seed})"
+
+    parity = compare(float_agent, int8_agent, observations)
+    latency = {
+        "float32": benchmark(float_agent, observations, batch_sizes, args.iterations),
+        "int8": benchmark(int8_agent, observations, batch_sizes, args.iterations)
+    }
+
+    print(f"=" * 60)
+    print(f"Quantization Parity: {args.model}")
+    print(f"=" * 60)
+    print(f"  Observations:     {parity['samples']} from {source}")
+    print(f"  Param bytes:      {float_meta['param_bytes'] / 1024:.1f} KB -> {int8_meta['param_bytes'] / 1024:.1f} KB")
+    print(f"  File size:        {file_sizes['float32'] / 1024:.1f} KB -> {file_sizes['int8'] / 1024:.1f} KB")
+    print(f"  Action agreement: {parity['action_agreement'] * 100:.2f}%")
+    print(f"  KL mean/p99/max:  {parity['kl_mean']:.2e} / {parity['kl_p99']:.2e} / {parity['kl_max']:.2e}")
+    print(f"  Max |dp|:         {parity['max_prob_diff']:.4f}")
+    print(f"  Value MAE/max:    {parity['value_mae']:.4f} / {parity['value_max_error']:.4f}")
+    print("-" * 60)
+    print(f"  {'batch':>5}  {'float p50':>10}  {'int8 p50':>10}  {'float obs/s':>12}  {'int8 obs/s':>12}  {'speedup':>7}")
+    for batch_size in batch_sizes:
+        f, q = latency["float32"][batch_size], latency["int8"][batch_size]
+        print(f"  {batch_size:>5}  {f['p50_us']:>8.0f}us  {q['p50_us']:>8.0f}us  "
+              f"{f['throughput']:>12.0f}  {q['throughput']:>12.0f}  {f['p50_us'] / q['p50_us']:>6.2f}x")
+    print(f"=" * 60)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "model": args.model,
+                "observations": source,
+                "param_bytes": {"float32": float_meta["param_bytes"], "int8": int8_meta["param_bytes"]},
+                "file_bytes": file_sizes,
+                "parity": parity,
+                "latency": latency
+            }, f, indent=2)
+        print(f"Report written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
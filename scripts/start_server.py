@@ -9,6 +9,8 @@ Usage:
     python scripts/start_server.py --port 50051
     python scripts/start_server.py --model ./models/ppo_best.zip --port 50051
     python scripts/start_server.py --rule-based --port 50051
+    python scripts/start_server.py --rule-based --rule-table ./models/rule_table.npz
+    python scripts/start_server.py --model ./models/ppo_best.zip --processes 32
 """
 
 import argparse
@@ -20,7 +22,10 @@ import signal
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from python_rl_server.server import BotAIServer
-from python_rl_server.agents import PPOAgent, RuleBasedAgent
+from python_rl_server.server.grpc_server import (
+    NUMPY_MODEL_EXTENSIONS, SERVING_MODEL_EXTENSIONS, load_ppo_agent
+)
+from python_rl_server.agents import RuleBasedAgent, RuleDecisionTable
 from python_rl_server.utils import setup_logger
 
 
@@ -37,16 +42,76 @@ def parse_args():
     )
     parser.add_argument(
         "--model", type=str, default=None,
-        help="Path to trained PPO model"
+        help="Path to trained PPO model (.zip) or exported policy (.pt/.npz, see export_policy.py)"
+    )
+    parser.add_argument(
+        "--torch-threads", type=int, default=None,
+        help="torch intra-op threads for exported policies (default: torch default)"
+    )
+    parser.add_argument(
+        "--mmap-weights", action="store_true",
+        help="Memory-map PPO zip weights so worker processes share them"
     )
     parser.add_argument(
         "--rule-based", action="store_true",
         help="Use rule-based agent instead of PPO"
     )
+    parser.add_argument(
+        "--rule-table", type=str, default=None,
+        help="Compiled decision table for the rule-based agent (scripts/compile_rule_table.py)"
+    )
     parser.add_argument(
         "--workers", type=int, default=10,
         help="Number of worker threads"
     )
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="Number of inference worker processes (SO_REUSEPORT pre-fork mode)"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Prometheus metrics port (worker i uses port + i in multi-process mode)"
+    )
+    parser.add_argument(
+        "--level-model", action="append", default=[], metavar="LEVEL=PATH",
+        help="Per-difficulty PPO model (repeatable, e.g. --level-model 7=./models/ppo_l7.zip)"
+    )
+    parser.add_argument(
+        "--model-pool-mb", type=int, default=512,
+        help="Memory budget for per-difficulty models (MB)"
+    )
+    parser.add_argument(
+        "--warmup-batch-sizes", type=str, default="1,8,32",
+        help="Comma-separated batch sizes to warm up before reporting SERVING"
+    )
+    parser.add_argument(
+        "--no-warmup", action="store_true",
+        help="Skip model warm-up (Health reports SERVING immediately)"
+    )
+    parser.add_argument(
+        "--action-cache", action="store_true",
+        help="Enable quantized-observation action cache"
+    )
+    parser.add_argument(
+        "--cache-ttl-ms", type=float, default=500.0,
+        help="Action cache entry TTL in milliseconds"
+    )
+    parser.add_argument(
+        "--trace-sample-rate", type=float, default=0.0,
+        help="Fraction of requests to trace per stage (0 = off); SIGUSR2 dumps Chrome trace JSON"
+    )
+    parser.add_argument(
+        "--trace-capacity", type=int, default=4096,
+        help="Number of recent traces kept in the ring buffer"
+    )
+    parser.add_argument(
+        "--trace-dir", type=str, default="./logs/traces",
+        help="Directory for trace dumps"
+    )
+    parser.add_argument(
+        "--experience-capacity", type=int, default=0,
+        help="Collect live-play transitions from SendReward/EndEpisode into a store of this size (0 = off)"
+    )
     parser.add_argument(
         "--log-file", type=str, default="./logs/server.log",
         help="Log file path"
@@ -72,6 +137,65 @@ def main():
     print(f"TÜBİTAK İP-2 Bot AI Server")
     print(f"=" * 60)
 
+    level_models = {}
+    for spec in args.level_model:
+        level, path = spec.split("=", 1)
+        level_models[int(level)] = path
+    warmup_batch_sizes = None if args.no_warmup else tuple(
+        int(size) for size in args.warmup_batch_sizes.split(",") if size
+    )
+
+    # Multi-process mod: her worker kendi agent'ını yükler
+    if args.processes > 1:
+        from python_rl_server.server import WorkerSupervisor, WorkerConfig
+
+        supervisor = WorkerSupervisor(
+            num_workers=args.processes,
+            config=WorkerConfig(
+                model_path=args.model,
+                use_rule_based=args.rule_based,
+                host=args.host,
+                port=args.port,
+                max_workers=args.workers,
+                metrics_port=args.metrics_port,
+                mmap_weights=args.mmap_weights,
+                rule_table=args.rule_table,
+                torch_threads=args.torch_threads,
+                action_cache=args.action_cache,
+                cache_ttl_ms=args.cache_ttl_ms,
+                level_models=level_models or None,
+                model_pool_bytes=args.model_pool_mb * 1024 * 1024,
+                warmup_batch_sizes=warmup_batch_sizes,
+                trace_sample_rate=args.trace_sample_rate,
+                trace_capacity=args.trace_capacity,
+                trace_dir=args.trace_dir,
+                experience_capacity=args.experience_capacity or None
+            )
+        )
+
+        def supervisor_signal_handler(sig, frame):
+            print("\nShutting down workers...")
+            supervisor.stop()
+            sys.exit(0)
+
+        signal.signal(signal.SIGINT, supervisor_signal_handler)
+        signal.signal(signal.SIGTERM, supervisor_signal_handler)
+
+        print(f"\nServer configuration:")
+        print(f"  Host: {args.host}")
+        print(f"  Port: {args.port}")
+        print(f"  Processes: {args.processes}")
+        print(f"  Threads per process: {args.workers}")
+        print(f"  Agent: {'Rule-Based' if args.rule_based else 'PPO'}")
+        print(f"  Action cache: {'on' if args.action_cache else 'off'}")
+        print(f"  Trace sample rate: {args.trace_sample_rate} (kill -USR2 <worker pid> to dump)")
+        if level_models:
+            print(f"  Difficulty models: {sorted(level_models)}")
+        print("-" * 60)
+
+        supervisor.start(blocking=True)
+        return
+
     # Agent oluştur
     if args.rule_based:
         print("Using Rule-Based Agent")
@@ -80,28 +204,58 @@ def main():
             caution=0.5,
             team_focus=0.5
         )
+        if args.rule_table:
+            agent.set_decision_table(RuleDecisionTable.load(args.rule_table))
+            print(f"Using compiled decision table: {args.rule_table}")
+    elif args.model and args.model.endswith(SERVING_MODEL_EXTENSIONS + NUMPY_MODEL_EXTENSIONS):
+        # Çok process'li mod ve model havuzu ile aynı loader (.pt/.ts, .npz)
+        if args.torch_threads is not None and args.model.endswith(SERVING_MODEL_EXTENSIONS):
+            from python_rl_server.agents.serving_agent import set_torch_threads
+            set_torch_threads(args.torch_threads)
+        agent = load_ppo_agent(args.model)
+        print(f"Using exported policy ({type(agent).__name__})")
     else:
         print("Using PPO Agent")
+        from python_rl_server.agents import PPOAgent
         agent = PPOAgent(verbose=args.verbose)
 
         if args.model and os.path.exists(args.model):
             print(f"Loading model from: {args.model}")
-            # PPO için environment gerekli, mock env kullan
-            from python_rl_server.environments import MockCombatEnv
-            mock_env = MockCombatEnv()
-            agent.initialize(mock_env)
-            agent.load(args.model)
-            mock_env.close()
+            # Space'ler zip'ten okunur; env, rollout buffer ve optimizer gerekmez
+            agent.load(args.model, inference_only=True, mmap=args.mmap_weights)
         else:
             print("WARNING: No model specified. Agent will use random actions.")
             print("Train a model first or use --rule-based flag.")
 
+    action_cache = None
+    if args.action_cache:
+        from python_rl_server.server.action_cache import ActionCache
+        action_cache = ActionCache(ttl_seconds=args.cache_ttl_ms / 1000.0)
+
+    model_pool = None
+    if level_models:
+        import functools
+        from python_rl_server.server.model_pool import ModelPool
+        model_pool = ModelPool(
+            level_models, functools.partial(load_ppo_agent, mmap=args.mmap_weights),
+            max_bytes=args.model_pool_mb * 1024 * 1024
+        )
+
     # Server oluştur
     server = BotAIServer(
         agent=agent,
         host=args.host,
         port=args.port,
-        max_workers=args.workers
+        max_workers=args.workers,
+        metrics_port=args.metrics_port,
+        action_cache=action_cache,
+        model_pool=model_pool,
+        warmup_batch_sizes=warmup_batch_sizes,
+        trace_sample_rate=args.trace_sample_rate,
+        trace_capacity=args.trace_capacity,
+        trace_dir=args.trace_dir,
+        experience_capacity=args.experience_capacity or None,
+        mmap_weights=args.mmap_weights
     )
 
     # Graceful shutdown handler
@@ -113,11 +267,19 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    # kill -USR2 <pid>: trace buffer'ını Chrome trace JSON olarak dök
+    if hasattr(signal, "SIGUSR2"):
+        signal.signal(signal.SIGUSR2, lambda sig, frame: server.dump_traces())
+
     print(f"\nServer configuration:")
     print(f"  Host: {args.host}")
     print(f"  Port: {args.port}")
     print(f"  Workers: {args.workers}")
     print(f"  Agent: {'Rule-Based' if args.rule_based else 'PPO'}")
+    print(f"  Action cache: {'on' if action_cache is not None else 'off'}")
+    print(f"  Trace sample rate: {args.trace_sample_rate}")
+    if model_pool is not None:
+        print(f"  Difficulty models: {sorted(model_pool.model_paths)}")
     print(f"\nStarting server...")
     print(f"Press Ctrl+C to stop")
     print("-" * 60)